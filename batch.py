@@ -0,0 +1,171 @@
+"""
+Scores every resume in a directory against one job role without the Streamlit UI.
+
+    python batch.py resumes/ --role "Data Scientist" --workers 8 --output ranked.jsonl --csv ranked.csv
+
+Finished resumes are appended to a checkpoint file as they complete, so an interrupted run picks up where it
+stopped when started again with the same arguments.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from llm_clients import get_llm
+from llm_scheduler import BATCH, llm_priority
+from models import ScoredResume
+from output_repair import parse_stats
+from pdf_reader import extract_pdf
+from role_profile import get_role_profile
+from version2 import MODEL, extract_info, llm_scoring
+
+
+def score_resume(path: str, job_description: str, role_profile=None) -> ScoredResume:
+    """
+    Parses, extracts and scores a single resume. Rate limited and transient LLM failures are retried by the LLM
+    scheduler.
+    :param path: Path of the PDF.
+    :param job_description: Job role.
+    :param role_profile: RoleProfile shared by all resumes of the run.
+    :return: ScoredResume with the candidate details, the PDF backend used and the scores.
+    """
+    extraction = extract_pdf(path)
+    resume_text = extraction['text']
+    # Batch requests queue behind the interactive ones in the LLM scheduler.
+    with llm_priority(BATCH):
+        resume_info = extract_info(resume_text)
+        resume_scores = llm_scoring(llm=get_llm(MODEL), resume_text=resume_text, job_description=job_description,
+                                    role_profile=role_profile)
+    return ScoredResume.from_models(os.path.basename(path), job_description, extraction['backend'],
+                                    resume_info.personal_details, resume_scores)
+
+
+def load_checkpoint(path: str, job_description: str) -> dict:
+    """
+    Reads the results already stored in the checkpoint for this role.
+    :param path: Checkpoint path.
+    :param job_description: Job role.
+    :return: Dict of file name to ScoredResume.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted write.
+                continue
+            if record.get('role') == job_description:
+                done[record['file']] = ScoredResume.from_dict(record)
+    return done
+
+
+def rank(results) -> list:
+    """
+    Orders the results from best to worst overall score, breaking ties on the category scores.
+    :param results: Iterable of ScoredResume.
+    :return: List
+    """
+    return sorted(results, key=lambda r: (r.overall_score, r.experience_score, r.skills_score, r.projects_score,
+                                          r.education_score), reverse=True)
+
+
+def write_results(results: list, output: str, csv_output: str = None):
+    """
+    Writes the ranked results as JSONL and optionally as CSV.
+    :param results: Ranked ScoredResume rows.
+    :param output: JSONL path.
+    :param csv_output: CSV path.
+    :return: None
+    """
+    with open(output, 'w', encoding='utf-8') as f:
+        for position, record in enumerate(results, start=1):
+            f.write(json.dumps({'rank': position, **record._asdict()}) + '\n')
+
+    if csv_output and results:
+        with open(csv_output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['rank', *ScoredResume._fields])
+            writer.writeheader()
+            for position, record in enumerate(results, start=1):
+                writer.writerow({'rank': position, **record._asdict()})
+
+
+def run_batch(resume_dir: str, job_description: str, workers: int, output: str, csv_output: str = None,
+              checkpoint: str = None, max_retries: int = 5) -> list:
+    """
+    Scores all PDFs in a directory with a bounded number of concurrent workers.
+    :param resume_dir: Directory with the resumes.
+    :param job_description: Job role.
+    :param workers: Number of resumes processed concurrently.
+    :param output: Ranked JSONL path.
+    :param csv_output: Optional ranked CSV path.
+    :param checkpoint: Checkpoint path, defaults to `<output>.checkpoint`.
+    :param max_retries: Retries per LLM call.
+    :return: Ranked ScoredResume rows.
+    """
+    checkpoint = checkpoint or output + '.checkpoint'
+    files = sorted(name for name in os.listdir(resume_dir) if name.lower().endswith('.pdf'))
+    results = load_checkpoint(checkpoint, job_description)
+    todo = [name for name in files if name not in results]
+    print(f"{len(files)} resumes, {len(files) - len(todo)} already scored, {len(todo)} to go", file=sys.stderr)
+
+    llm = get_llm(MODEL)
+    # The scheduler retries every call of the client (see llm_chat.PooledChatOpenAI); the run shares one client.
+    llm.max_retries = max_retries
+    # Built once for the whole run (and persisted across runs) instead of once per resume.
+    with llm_priority(BATCH):
+        role_profile = get_role_profile(job_description, llm)
+
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor, open(checkpoint, 'a', encoding='utf-8') as ckpt:
+        futures = {executor.submit(score_resume, os.path.join(resume_dir, name), job_description, role_profile):
+                   name for name in todo}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[{completed}/{len(todo)}] {name}: failed ({type(e).__name__}: {e})", file=sys.stderr)
+                continue
+            results[name] = record
+            ckpt.write(json.dumps(record._asdict()) + '\n')
+            ckpt.flush()
+            print(f"[{completed}/{len(todo)}] {name}: {record.overall_score}/10", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    if todo:
+        print(f"Scored {len(todo) - failures} resumes in {elapsed:.1f}s "
+              f"({(len(todo) - failures) / elapsed * 60:.1f}/min), {failures} failed", file=sys.stderr)
+        # How often the LLM output needed repairs, and how often the extra LLM round-trip was made.
+        print(f"Output parsing: {parse_stats()}", file=sys.stderr)
+
+    ranked = rank(results[name] for name in files if name in results)
+    write_results(ranked, output, csv_output)
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("resume_dir", help="Directory containing the resume PDFs")
+    parser.add_argument("--role", required=True, help="Job role the resumes are scored against")
+    parser.add_argument("--workers", type=int, default=4, help="Number of resumes scored concurrently")
+    parser.add_argument("--output", default="ranked.jsonl", help="Ranked JSONL output")
+    parser.add_argument("--csv", dest="csv_output", help="Optional ranked CSV output")
+    parser.add_argument("--checkpoint", help="Checkpoint file (defaults to <output>.checkpoint)")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="Retries per LLM call on rate limits and transient errors")
+    args = parser.parse_args()
+
+    run_batch(args.resume_dir, args.role, args.workers, args.output, args.csv_output, args.checkpoint,
+              args.max_retries)
+
+
+if __name__ == '__main__':
+    main()
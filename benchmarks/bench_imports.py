@@ -0,0 +1,111 @@
+"""
+Measures the cold start of the entry points: the time to import each app module in a fresh interpreter, the time
+to import it again with only the libraries loaded (what a Streamlit code reload pays) and the time the deferred
+dependencies take on first use.
+
+    python benchmarks/bench_imports.py [--modules version2,check,main,enh,batch] [--repeat 5] [--top 0]
+        [--output results.jsonl]
+
+Every measurement runs in a new process, `--repeat` times, and the median is reported. The heavy dependencies
+found in sys.modules right after the import are listed, so a top-level import slipping back in shows up even when
+the timings are noisy. `--top N` prints the N slowest imports of one run, from `python -X importtime`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+MODULES = ("version2", "check", "main", "enh", "batch")
+# Dependencies the apps only import on first use.
+HEAVY = ("langchain", "openai", "matplotlib", "PyPDF2", "pandas", "st_aggrid", "unstructured")
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter() - start
+loaded = [name for name in sys.argv[2].split(',') if name in sys.modules]
+# A code reload imports the app's own modules again, the libraries stay loaded.
+for name, loaded_module in list(sys.modules.items()):
+    if (getattr(loaded_module, '__file__', None) or '').startswith(sys.argv[3]):
+        del sys.modules[name]
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+reloaded = time.perf_counter() - start
+from llm_clients import PRELOAD_MODULES
+start = time.perf_counter()
+for name in PRELOAD_MODULES:
+    importlib.import_module(name)
+first_use = time.perf_counter() - start
+print(json.dumps({'import_s': imported, 'reload_s': reloaded, 'first_use_s': first_use, 'loaded': loaded}))
+"""
+
+
+def environment():
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env["RESUMOID_LLM_CACHE"] = "0"
+    env["PYTHONPATH"] = ROOT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def probe(module):
+    """
+    Imports a module in a fresh interpreter.
+    :return: Dict with `import_s`, `reload_s`, `first_use_s` and the heavy modules `loaded` by the import.
+    """
+    output = subprocess.run([sys.executable, "-c", PROBE, module, ",".join(HEAVY), ROOT_DIR + os.sep], cwd=ROOT_DIR,
+                            env=environment(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(module, top):
+    """
+    :return: List of (cumulative seconds, module name) of the `top` slowest imports, from -X importtime.
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT_DIR,
+                            env=environment(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() != module:
+            rows.append((int(cumulative) / 1e6, name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="Print the N slowest imports of each module")
+    parser.add_argument("--output", help="JSONL file the results are appended to")
+    args = parser.parse_args()
+
+    for module in [name.strip() for name in args.modules.split(",") if name.strip()]:
+        runs = [probe(module) for _ in range(args.repeat)]
+        record = {
+            'module': module,
+            'repeat': args.repeat,
+            **{key: round(statistics.median(run[key] for run in runs), 3)
+               for key in ('import_s', 'reload_s', 'first_use_s')},
+            'loaded': sorted(set().union(*(run['loaded'] for run in runs))),
+        }
+        print(f"{module:<10} import {record['import_s']:6.3f}s  reload {record['reload_s']:6.3f}s  "
+              f"first use {record['first_use_s']:6.3f}s  heavy modules loaded: {', '.join(record['loaded']) or '-'}")
+        for seconds, name in slowest_imports(module, args.top) if args.top else ():
+            print(f"    {seconds:6.3f}s  {name}")
+        if args.output:
+            with open(args.output, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares the unstructured loading path that wrote every upload to ./resumes/<name> with the in-memory path.
+
+    python benchmarks/bench_pdf_loading.py path/to/pdfs [--sessions 4] [--repeat 3]
+
+Each simulated session loads every PDF under the same file name, as concurrent users uploading "resume.pdf"
+would. The parse cache is bypassed so only the loading path is measured.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from langchain.document_loaders import UnstructuredPDFLoader  # noqa: E402
+
+from pdf_reader import iter_unstructured_elements  # noqa: E402
+
+
+class Upload:
+    """Minimal stand-in for Streamlit's UploadedFile."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+    def getbuffer(self):
+        return memoryview(self._data)
+
+
+def legacy_load(file, directory):
+    """The former read_pdf_unstructured: write the upload to a shared directory, then load it from disk."""
+    tmp_location = os.path.join(directory, file.name)
+    with open(tmp_location, 'wb') as out:
+        out.write(file.getbuffer())
+    return "".join(doc.page_content for doc in UnstructuredPDFLoader(tmp_location, mode='elements').load())
+
+
+def in_memory_load(file):
+    return "".join(element['text'] for element in iter_unstructured_elements(file))
+
+
+def run(label, load, uploads, expected, sessions, repeat):
+    """
+    Loads every upload from `sessions` concurrent threads and checks the text against `expected`, the reference
+    texts computed before the timed runs.
+    """
+    latencies = []
+    mismatches = 0
+
+    def session(upload, reference):
+        start = time.perf_counter()
+        text = load(upload)
+        latencies.append(time.perf_counter() - start)
+        return text == reference
+
+    pairs = [(upload, reference) for upload, reference in zip(uploads, expected) for _ in range(sessions)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        for _ in range(repeat):
+            for ok in executor.map(session, *zip(*pairs)):
+                mismatches += not ok
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{label:<10} p50 {statistics.median(latencies) * 1000:8.1f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:8.1f} ms  "
+          f"total {elapsed:6.2f}s  wrong text {mismatches}/{len(latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf_dir")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions uploading the same name")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    uploads = []
+    for name in sorted(os.listdir(args.pdf_dir)):
+        if name.lower().endswith('.pdf'):
+            with open(os.path.join(args.pdf_dir, name), 'rb') as f:
+                uploads.append(Upload('resume.pdf', f.read()))
+    if not uploads:
+        sys.exit(f"No PDFs found in {args.pdf_dir}")
+
+    # Parsed once up front, so the reference texts do not add work to the timed runs.
+    expected = [in_memory_load(upload) for upload in uploads]
+    with tempfile.TemporaryDirectory() as directory:
+        run("disk", lambda upload: legacy_load(upload, directory), uploads, expected, args.sessions, args.repeat)
+    run("in-memory", in_memory_load, uploads, expected, args.sessions, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+End-to-end latency benchmark of the main.py, version2.py and check.py analysis pipelines, fully offline.
+
+    python benchmarks/bench_pipelines.py [--pipelines version2,check,main] [--count 12] [--pages 1]
+        [--sessions 4] [--base-latency 0.3] [--latency-per-token 0.01] [--output results.jsonl]
+
+A corpus of resume PDFs is generated from the fixture resumes (or read from `--corpus`, a directory written by
+make_corpus.py) and every PDF is analysed by the pipeline as the app would, `--sessions` analyses at a time. The
+LLM is the fake OpenAI server answering with the recorded responses under benchmarks/fixtures/responses, so the
+real clients, scheduler, parsers and PDF extraction all run, with only the model replaced by a configurable delay.
+
+Each pipeline runs in its own process and reports the import time, the p50/p95/p99 wall time of every stage and
+of the whole analysis, requests and tokens per prompt, and peak RSS. Streamed stages are timed until their last
+token has been consumed. Streamlit rendering and the response caches are not part of the measurement. With
+`--output` one JSON record per pipeline is appended, to compare runs before and after a change.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from make_corpus import fixture_resumes, make_corpus  # noqa: E402
+
+PIPELINES = ("version2", "check", "main")
+RESPONSES_DIR = os.path.join(BENCH_DIR, "fixtures", "responses")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def first_job(resume):
+    # The first job tells the resumes apart.
+    lines = [line.strip() for line in resume.splitlines()]
+    return lines[lines.index("EXPERIENCE") + 1]
+
+
+def recorded_rules():
+    """
+    Builds the fake server rules from the recorded responses.
+    :return: List of (substrings, response) rules and a dict of substrings to prompt label.
+    """
+    with open(os.path.join(RESPONSES_DIR, "extract_info.json")) as f:
+        resume_info = json.load(f)
+    with open(os.path.join(RESPONSES_DIR, "llm_scoring.json")) as f:
+        scores = json.load(f)["expected"]
+    with open(os.path.join(RESPONSES_DIR, "pipelines.json")) as f:
+        responses = json.load(f)
+
+    rules, labels = [], {}
+
+    def add(label, patterns, response):
+        rules.append((patterns, response))
+        labels[patterns] = label
+
+    for name, resume in fixture_resumes().items():
+        info = resume_info[name]
+        candidate = info["personal_details"]["name"]
+        add("extract_info", (candidate, "Extract all the relevant sections"), json.dumps(info))
+        # main.py reads the sections as plain text.
+        sections = {
+            "personal_details": info["personal_details"],
+            "education": "\n".join(f"{e['degree']} {e['field_of_study']}, {e['university']}"
+                                   for e in info["education"]),
+            "experience": "\n".join(f"{e['job_role']}, {e['company_name']} ({e['duration']})\n" +
+                                    "\n".join(f"- {task['task']}" for task in e["tasks"])
+                                    for e in info["experience"]),
+        }
+        add("extract_section", (candidate, "Extract the section from the resume"), json.dumps(sections))
+        add("llm_scoring", (first_job(resume), '"experience_score"'), json.dumps(scores[name]))
+    add("feedback_jobdesc", ("Your job is to give feedback on the resume",), responses["feedback_jobdesc"])
+    add("suggestions", ("re write the work tasks",), json.dumps(responses["suggestions"]))
+    add("experience_evaluation", ("It has already been scored on the criteria below",),
+        json.dumps(responses["experience_evaluation"]))
+    add("role_skills", ("most important skills for a",), responses["role_skills"])
+    labels[()] = "unmatched"
+    return rules, labels
+
+
+def analyse(module, name, data, job_description):
+    """
+    Runs one analysis the way the app does and times its stages.
+    :return: Dict of stage name to seconds, with the whole analysis under `total`, and the failed stage if any.
+    """
+    from pipeline import Stage, run_stages
+    from streaming import TokenStream
+
+    started, timings = {}, {}
+
+    def timed(stage):
+        def func(**kwargs):
+            started[stage.name] = time.perf_counter()
+            result = stage.func(**kwargs)
+            if not isinstance(result, TokenStream):
+                timings[stage.name] = time.perf_counter() - started[stage.name]
+            return result
+        return Stage(stage.name, func, stage.depends_on)
+
+    start = time.perf_counter()
+    try:
+        if name == "version2":
+            stages = module.analysis_stages(data, job_description)
+        else:
+            resume = module.extract_pdf(io.BytesIO(data))['text']
+            timings["parse"] = time.perf_counter() - start
+            stages = module.analysis_stages(resume, job_description)
+        for stage, result in run_stages([timed(stage) for stage in stages]):
+            if isinstance(result, TokenStream):
+                result.result()
+                timings[stage] = time.perf_counter() - started[stage]
+    except Exception as e:
+        return timings, f"{type(e).__name__}: {e}"
+    timings["total"] = time.perf_counter() - start
+    return timings, None
+
+
+def run_pipeline(name, args):
+    server = FakeOpenAIServer(rpm=args.rpm, tpm=args.tpm, base_latency=args.base_latency,
+                              latency_per_token=args.latency_per_token, default_response="")
+    server.rules, labels = recorded_rules()
+    server.start()
+
+    # The clients read their configuration when imported.
+    os.environ["OPENAI_API_BASE"] = server.url
+    os.environ["RESUMOID_LLM_RPM"] = str(args.rpm)
+    os.environ["RESUMOID_LLM_TPM"] = str(args.tpm)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = importlib.import_module(name)
+    import_time = time.perf_counter() - start
+    import openai
+    import output_repair
+    openai.api_base = server.url
+
+    if args.corpus:
+        paths = sorted(os.path.join(args.corpus, f) for f in os.listdir(args.corpus) if f.endswith(".pdf"))
+    else:
+        paths = make_corpus(tempfile.mkdtemp(prefix="resumoid-corpus-"), args.count, args.pages)
+    corpus = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            corpus.append(f.read())
+
+    timings, errors = [], []
+    lock = threading.Lock()
+
+    def session(data):
+        result, error = analyse(module, name, data, args.role)
+        with lock:
+            timings.append(result)
+            if error:
+                errors.append(error)
+
+    start = time.perf_counter()
+    # The scripts print progress, keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        list(executor.map(session, corpus * args.repeat))
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    stages = {}
+    for result in timings:
+        for stage, seconds in result.items():
+            stages.setdefault(stage, []).append(seconds)
+    usage = {}
+    for rule, (requests, prompt_tokens, completion_tokens) in server.usage.items():
+        label = labels.get(rule, "unmatched")
+        total = usage.setdefault(label, [0, 0, 0])
+        for i, value in enumerate((requests, prompt_tokens, completion_tokens)):
+            total[i] += value
+
+    record = {
+        'pipeline': name,
+        'analyses': len(timings),
+        'failed': len(errors),
+        'sessions': args.sessions,
+        'base_latency': args.base_latency,
+        'latency_per_token': args.latency_per_token,
+        'wall_s': round(elapsed, 3),
+        'import_s': round(import_time, 3),
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS.
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss /
+                             (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+        'stages': {stage: {'p50': round(percentile(values, 0.5), 3), 'p95': round(percentile(values, 0.95), 3),
+                           'p99': round(percentile(values, 0.99), 3)} for stage, values in stages.items()},
+        'tokens': {label: {'requests': requests, 'prompt': prompt_tokens, 'completion': completion_tokens}
+                   for label, (requests, prompt_tokens, completion_tokens) in usage.items()},
+        'parse_outcomes': output_repair.parse_stats(),
+    }
+    report(record, errors)
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def report(record, errors):
+    print(f"== {record['pipeline']}: {record['analyses']} analyses, {record['failed']} failed, "
+          f"{record['sessions']} at a time, {record['wall_s']:.1f}s wall, import {record['import_s']:.2f}s, "
+          f"peak RSS {record['peak_rss_mb']:.0f} MB")
+    for stage, values in sorted(record['stages'].items(), key=lambda item: (item[0] == 'total', item[1]['p50'])):
+        print(f"   {stage:<22} p50 {values['p50']:7.3f}s  p95 {values['p95']:7.3f}s  p99 {values['p99']:7.3f}s")
+    for label, usage in sorted(record['tokens'].items()):
+        print(f"   {label:<22} {usage['requests']:5d} requests  {usage['prompt']:8d} prompt tok  "
+              f"{usage['completion']:7d} completion tok")
+    print(f"   parse outcomes {record['parse_outcomes']}")
+    for error in sorted(set(errors))[:5]:
+        print(f"   error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pipelines", default=",".join(PIPELINES))
+    parser.add_argument("--corpus", help="Directory of PDFs written by make_corpus.py")
+    parser.add_argument("--count", type=int, default=12, help="Number of PDFs to generate")
+    parser.add_argument("--pages", type=int, default=1, help="Minimum pages per generated PDF")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--sessions", type=int, default=4, help="Analyses running at the same time")
+    parser.add_argument("--role", default="Machine Learning Engineer")
+    parser.add_argument("--base-latency", type=float, default=0.3, help="Seconds of overhead per LLM request")
+    parser.add_argument("--latency-per-token", type=float, default=0.01, help="Seconds per completion token")
+    parser.add_argument("--rpm", type=int, default=100000)
+    parser.add_argument("--tpm", type=int, default=10000000)
+    parser.add_argument("--output", help="JSONL file the results are appended to")
+    args = parser.parse_args()
+
+    pipelines = [name.strip() for name in args.pipelines.split(",") if name.strip()]
+    unknown = set(pipelines) - set(PIPELINES)
+    if unknown:
+        parser.error(f"unknown pipelines: {', '.join(sorted(unknown))}")
+
+    # Every pipeline gets a fresh process, so imports, caches and peak RSS are its own.
+    os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY") or "sk-benchmark"
+    os.environ["RESUMOID_LLM_CACHE"] = "0"
+    if len(pipelines) == 1:
+        os.environ["RESUMOID_PDF_CACHE_DIR"] = tempfile.mkdtemp(prefix="resumoid-pdf-")
+        os.environ["RESUMOID_ROLE_CACHE_DIR"] = tempfile.mkdtemp(prefix="resumoid-roles-")
+        run_pipeline(pipelines[0], args)
+        return
+    for name in pipelines:
+        subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--pipelines", name], check=True)
+
+
+if __name__ == "__main__":
+    main()
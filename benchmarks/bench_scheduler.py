@@ -0,0 +1,99 @@
+"""
+Compares sending chat completions straight through ChatOpenAI (its own retry loop) with sending them through
+the LLM scheduler, against the rate limited fake server.
+
+    python benchmarks/bench_scheduler.py [--requests 150] [--workers 32] [--rpm 1200] [--tpm 120000]
+
+A mix of interactive and batch requests is sent from `--workers` threads. Reports throughput against the quota,
+the 429s the server returned and the latency of each priority.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["RESUMOID_LLM_CACHE"] = "0"
+
+import openai  # noqa: E402
+from langchain.chat_models import ChatOpenAI  # noqa: E402
+
+import llm_chat  # noqa: E402
+from benchmarks.fake_openai_server import FakeOpenAIServer  # noqa: E402
+from llm_chat import PooledChatOpenAI  # noqa: E402
+from llm_scheduler import BATCH, INTERACTIVE, LLMScheduler, llm_priority  # noqa: E402
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def run(label, llm, server, args):
+    server.reset()
+    latencies = {INTERACTIVE: [], BATCH: []}
+    failures = []
+    lock = threading.Lock()
+    prompt = "Rate this resume. " + "Experienced engineer with Python and SQL. " * (args.prompt_chars // 42)
+
+    def send(i):
+        priority = INTERACTIVE if i % round(1 / args.interactive_share) == 0 else BATCH
+        start = time.perf_counter()
+        try:
+            with llm_priority(priority):
+                llm.predict(prompt)
+        except Exception as e:
+            with lock:
+                failures.append(type(e).__name__)
+            return
+        with lock:
+            latencies[priority].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    done = len(latencies[INTERACTIVE]) + len(latencies[BATCH])
+    # Whichever of the two quotas binds first for requests of this size.
+    ceiling = min(args.rpm, args.tpm / (server.tokens_served / max(server.served, 1)))
+    print(f"{label:<10} {done / elapsed * 60:7.0f} req/min ({done / elapsed * 60 / ceiling:4.0%} of quota)  "
+          f"{server.tokens_served / elapsed * 60:8.0f} tok/min  429s {server.rate_limited:4d}  "
+          f"failed {len(failures):3d}  total {elapsed:6.1f}s")
+    for priority, name in ((INTERACTIVE, "interactive"), (BATCH, "batch")):
+        values = latencies[priority]
+        if values:
+            print(f"{'':<10} {name:<12} p50 {statistics.median(values):6.2f}s  p95 {percentile(values, 0.95):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--rpm", type=int, default=1200)
+    parser.add_argument("--tpm", type=int, default=120000)
+    parser.add_argument("--prompt-chars", type=int, default=2000)
+    parser.add_argument("--interactive-share", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(rpm=args.rpm, tpm=args.tpm)
+    openai.api_base = server.start()
+    try:
+        run("direct", ChatOpenAI(model="gpt-3.5-turbo", max_retries=6), server, args)
+        # PooledChatOpenAI sends through the scheduler of its own module.
+        llm_chat.scheduler = LLMScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                                          max_in_flight=args.workers)
+        run("scheduler", PooledChatOpenAI(model="gpt-3.5-turbo", max_retries=6), server, args)
+        print(f"{'':<10} scheduler {llm_chat.scheduler.stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
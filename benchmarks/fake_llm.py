@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from langchain.callbacks.manager import CallbackManagerForLLMRun
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import ChatResult
+from langchain.schema.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain.schema.output import ChatGeneration, ChatGenerationChunk
+
+
+_counter_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Rough token estimate used by the fake model (about four characters per token).
+    :param text: Text
+    :return: Integer
+    """
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for ChatOpenAI. Each rule is a tuple of substrings and a recorded response; the first
+    rule whose substrings all occur in the prompt wins. Latency is simulated as a fixed overhead plus a delay per
+    completion token, and token usage is counted so benchmarks can report it.
+    """
+
+    rules: List[Tuple[Sequence[str], str]] = []
+    default_response: str = ""
+    model_name: str = "fake-gpt"
+    base_latency: float = 0.05
+    latency_per_token: float = 0.002
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "resumoid-fake-chat-model"
+
+    @property
+    def _identifying_params(self):
+        return {'model_name': self.model_name}
+
+    def _respond(self, messages: List[BaseMessage]) -> Tuple[str, int]:
+        prompt = "\n".join(message.content for message in messages)
+        response = self.default_response
+        for patterns, recorded in self.rules:
+            if all(pattern in prompt for pattern in patterns):
+                response = recorded
+                break
+        prompt_tokens = count_tokens(prompt)
+        with _counter_lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += count_tokens(response)
+        return response, prompt_tokens
+
+    def reset(self):
+        """Resets the call and token counters."""
+        with _counter_lock:
+            self.calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response, prompt_tokens = self._respond(messages)
+        completion_tokens = count_tokens(response)
+        time.sleep(self.base_latency + self.latency_per_token * completion_tokens)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=response))],
+                          llm_output={'token_usage': usage, 'model_name': self.model_name})
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        response, _ = self._respond(messages)
+        time.sleep(self.base_latency)
+        # Stream roughly one token (four characters) at a time.
+        for i in range(0, len(response), 4):
+            time.sleep(self.latency_per_token)
+            chunk = response[i:i + 4]
+            if run_manager:
+                run_manager.on_llm_new_token(chunk)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
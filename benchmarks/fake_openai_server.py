@@ -0,0 +1,217 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint with provider style rate limits.
+
+    python benchmarks/fake_openai_server.py [--port 8765] [--rpm 600] [--tpm 60000]
+
+Point the client at it with `openai.api_base = "http://127.0.0.1:8765/v1"`. Requests over the requests or tokens
+per minute quota get a 429 with a Retry-After header, like the real API. Both plain and streamed
+(`"stream": true`) completions are supported. Latency is simulated as a fixed overhead plus a delay per
+completion token.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Sequence, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_llm import count_tokens  # noqa: E402
+
+
+class Quota:
+    """Token bucket refilled at `per_minute` per minute, holding `burst_seconds` worth of quota."""
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def shortfall(self, amount: float) -> float:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server answering chat completions. Each rule is a tuple of substrings and a response; the first
+    rule whose substrings all occur in the prompt wins, otherwise `default_response` is returned. Requests and
+    tokens served are counted per rule in `usage`, keyed by the rule's substrings (`()` for the default).
+    """
+
+    def __init__(self, port: int = 0, rpm: int = 600, tpm: int = 60000, burst_seconds: float = 6.0,
+                 default_response: str = "Score: 7, Feedback: Looks good.",
+                 rules: Optional[List[Tuple[Sequence[str], str]]] = None,
+                 base_latency: float = 0.05, latency_per_token: float = 0.001):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst_seconds = burst_seconds
+        self.requests = Quota(rpm, burst_seconds)
+        self.tokens = Quota(tpm, burst_seconds)
+        self.default_response = default_response
+        self.rules = rules or []
+        self.base_latency = base_latency
+        self.latency_per_token = latency_per_token
+        self.served = 0
+        self.rate_limited = 0
+        self.tokens_served = 0
+        self.usage = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset(self):
+        """Refills the quota and resets the counters."""
+        with self._lock:
+            self.requests = Quota(self.rpm, self.burst_seconds)
+            self.tokens = Quota(self.tpm, self.burst_seconds)
+            self.served = 0
+            self.rate_limited = 0
+            self.tokens_served = 0
+            self.usage = {}
+
+    def _respond(self, prompt: str) -> Tuple[Tuple[str, ...], str]:
+        for patterns, response in self.rules:
+            if all(pattern in prompt for pattern in patterns):
+                return tuple(patterns), response
+        return (), self.default_response
+
+    def _admit(self, tokens: int) -> float:
+        # Returns 0 when the request is admitted, otherwise the seconds until it would be.
+        with self._lock:
+            wait = max(self.requests.shortfall(1), self.tokens.shortfall(tokens))
+            if wait > 0:
+                self.rate_limited += 1
+                return wait
+            self.requests.level -= 1
+            self.tokens.level -= tokens
+            self.served += 1
+            self.tokens_served += tokens
+            return 0.0
+
+    def _count(self, rule: Tuple[str, ...], prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            requests, prompt, completion = self.usage.get(rule, (0, 0, 0))
+            self.usage[rule] = (requests + 1, prompt + prompt_tokens, completion + completion_tokens)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if not self.path.endswith('/chat/completions'):
+                    self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+                    return
+
+                prompt = "\n".join(message.get('content') or '' for message in request.get('messages', []))
+                rule, response = server._respond(prompt)
+                prompt_tokens = count_tokens(prompt)
+                completion_tokens = count_tokens(response)
+                wait = server._admit(prompt_tokens + completion_tokens)
+                if wait:
+                    self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                                    'code': 'rate_limit_exceeded'}},
+                                    {'Retry-After': str(math.ceil(wait))})
+                    return
+                server._count(rule, prompt_tokens, completion_tokens)
+
+                model = request.get('model', 'gpt-3.5-turbo')
+                completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+                time.sleep(server.base_latency)
+                if request.get('stream'):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Connection', 'close')
+                    self.end_headers()
+                    for i in range(0, len(response), 4):
+                        time.sleep(server.latency_per_token)
+                        chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'model': model,
+                                 'choices': [{'index': 0, 'delta': {'content': response[i:i + 4]},
+                                              'finish_reason': None}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    last = {'id': completion_id, 'object': 'chat.completion.chunk', 'model': model,
+                            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+                    self.wfile.write(f"data: {json.dumps(last)}\n\ndata: [DONE]\n\n".encode())
+                    self.close_connection = True
+                    return
+
+                time.sleep(server.latency_per_token * completion_tokens)
+                self._send_json(200, {
+                    'id': completion_id,
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': response},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                              'total_tokens': prompt_tokens + completion_tokens},
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=600, help="Requests per minute before 429s")
+    parser.add_argument("--tpm", type=int, default=60000, help="Tokens per minute before 429s")
+    parser.add_argument("--response", default="Score: 7, Feedback: Looks good.", help="Completion returned")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(port=args.port, rpm=args.rpm, tpm=args.tpm, default_response=args.response)
+    print(f"Serving fake chat completions on {server.url}", file=sys.stderr)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
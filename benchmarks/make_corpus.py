@@ -0,0 +1,115 @@
+"""
+Generates a corpus of resume PDFs from the fixture resumes, for the end-to-end benchmarks.
+
+    python benchmarks/make_corpus.py out_dir [--count 30] [--pages 1]
+
+The PDFs are written with a minimal built-in PDF writer (one Helvetica text layer per page), so no PDF library
+is needed. The corpus cycles through the fixture resumes; each copy gets a different document id, so the parse
+cache sees distinct files while the recorded LLM responses still match. `--pages` pads every resume with filler
+lines up to that many pages, to simulate long CVs.
+"""
+import argparse
+import os
+import sys
+from typing import List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESUMES_DIR = os.path.join(BENCH_DIR, "fixtures", "resumes")
+
+LINES_PER_PAGE = 50
+FILLER = "Volunteered at the local coding club, teaching Python basics to high school students ({})."
+
+
+def _escape(line: str) -> str:
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(text: str, doc_id: int = 0, pages: int = 1) -> bytes:
+    """
+    Writes the text into a PDF, one line of text per line of the input.
+    :param text: Resume text.
+    :param doc_id: Number written into the document id, to make the bytes of identical resumes differ.
+    :param pages: Minimum number of pages, filled up with filler lines.
+    :return: PDF bytes
+    """
+    lines = text.splitlines()
+    if pages > 1:
+        # Distinct lines, so the prompt compression does not fold them away.
+        lines += [FILLER.format(f"term {i + 1}") for i in range(pages * LINES_PER_PAGE - len(lines))]
+    page_lines = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream for each page.
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                      b"/Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for chunk in page_lines:
+        content = "BT /F1 10 Tf 14 TL 50 800 Td\n" + "".join(f"({_escape(line)}) Tj T*\n" for line in chunk) + "ET"
+        data = content.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data))
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> >> >>" % content_id)
+        kids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids),
+                                                              len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /ID [<%032x> <%032x>] >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, doc_id, doc_id, xref)
+    return bytes(out)
+
+
+def fixture_resumes():
+    """
+    :return: Dict of fixture name to resume text, sorted by name.
+    """
+    resumes = {}
+    for name in sorted(os.listdir(RESUMES_DIR)):
+        if name.endswith(".txt"):
+            with open(os.path.join(RESUMES_DIR, name)) as f:
+                resumes[name[:-4]] = f.read()
+    return resumes
+
+
+def make_corpus(directory: str, count: int = 30, pages: int = 1) -> List[str]:
+    """
+    Writes `count` resume PDFs into a directory.
+    :param directory: Output directory, created when missing.
+    :param count: Number of PDFs.
+    :param pages: Minimum number of pages per PDF.
+    :return: Paths of the PDFs.
+    """
+    os.makedirs(directory, exist_ok=True)
+    resumes = list(fixture_resumes().items())
+    paths = []
+    for i in range(count):
+        name, text = resumes[i % len(resumes)]
+        path = os.path.join(directory, f"{i:04d}_{name}.pdf")
+        with open(path, 'wb') as f:
+            f.write(make_pdf(text, doc_id=i, pages=pages))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--count", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = make_corpus(args.directory, args.count, args.pages)
+    print(f"Wrote {len(paths)} PDFs to {args.directory}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Replays recorded llm_scoring responses through version2.llm_scoring and checks the parsed scores.
+
+    python benchmarks/replay_llm_scoring.py
+
+The fake model only answers with the recorded response when the prompt carries the ResumeScores JSON schema, so
+the replay fails if the schema is dropped from the prompt. Every case must be scored in a single LLM call, with
+the parse outcome recorded next to the response (direct, repaired or lines), never through the LLM fallback.
+A case may override some of the expected fields of its resume, e.g. feedback with apostrophes, and responses that
+are valid JSON must come out of repair_json unchanged. Exits with status 1 on any mismatch.
+"""
+import json
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["RESUMOID_LLM_CACHE"] = "0"
+os.environ["RESUMOID_ROLE_CACHE_DIR"] = tempfile.mkdtemp(prefix="resumoid-roles-")
+
+import output_repair  # noqa: E402
+import version2  # noqa: E402
+from fake_llm import FakeChatModel  # noqa: E402
+
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+
+
+def load_fixtures():
+    with open(os.path.join(FIXTURES, "responses", "llm_scoring.json")) as f:
+        recorded = json.load(f)
+    resumes = {}
+    for name in recorded["expected"]:
+        with open(os.path.join(FIXTURES, "resumes", name + ".txt")) as f:
+            resumes[name] = f.read()
+    return resumes, recorded
+
+
+def replay(case, resume, recorded):
+    """
+    Scores one resume against its recorded response.
+    :return: List of mismatch descriptions, empty when the case passes.
+    """
+    # The first job tells the resumes apart.
+    lines = [line.strip() for line in resume.splitlines()]
+    first_job = lines[lines.index("EXPERIENCE") + 1]
+    llm = FakeChatModel(rules=[((first_job, '"experience_score"'), case["response"])],
+                        base_latency=0, latency_per_token=0)
+    before = output_repair.parse_stats().get("ResumeScores", {}).get(case["outcome"], 0)
+    try:
+        scores = version2.llm_scoring(llm, resume, recorded["job_description"])
+    except Exception as e:
+        return [f"{type(e).__name__}: {e}"]
+
+    errors = []
+    try:
+        json.loads(case["response"])
+    except ValueError:
+        pass
+    else:
+        if output_repair.repair_json(case["response"]) != case["response"]:
+            errors.append("valid JSON changed by repair_json")
+    if llm.calls != 1:
+        errors.append(f"{llm.calls} LLM calls, expected 1")
+    after = output_repair.parse_stats().get("ResumeScores", {}).get(case["outcome"], 0)
+    if after != before + 1:
+        errors.append(f"not parsed as {case['outcome']}")
+    expected = {**recorded["expected"][case["resume"]], **case.get("expected", {})}
+    for field, value in expected.items():
+        if getattr(scores, field) != value:
+            errors.append(f"{field} is {getattr(scores, field)!r}, expected {value!r}")
+    return errors
+
+
+def main():
+    resumes, recorded = load_fixtures()
+    failed = 0
+    for case in recorded["cases"]:
+        errors = replay(case, resumes[case["resume"]], recorded)
+        failed += bool(errors)
+        print(f"{'FAIL' if errors else 'ok':<5} {case['resume']:<14} {case['variant']}")
+        for error in errors:
+            print(f"      {error}")
+
+    stats = output_repair.parse_stats().get("ResumeScores", {})
+    print(f"{len(recorded['cases']) - failed}/{len(recorded['cases'])} passed, outcomes {stats}")
+    if stats.get(output_repair.LLM_FALLBACK) or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import io
+from functools import lru_cache
+
+from lazy_imports import load
+from tracing import traced
+
+# Scores are integers between 0 and 10, so every gauge a page can show is one of these images.
+SCORE_RANGE = range(0, 11)
+STYLES = ('score', 'overall')
+
+
+def _clamp(value) -> int:
+    return min(max(int(round(float(value))), SCORE_RANGE.start), SCORE_RANGE.stop - 1)
+
+
+@lru_cache(maxsize=None)
+def render_gauge(value: int, style: str = 'score', fmt: str = 'png') -> bytes:
+    """
+    Renders a donut gauge to image bytes. Figures are built with the object oriented API instead of pyplot, so
+    they are never registered in pyplot's global figure manager and are freed once rendered; the bytes are
+    memoized, so each (value, style, format) is only drawn once per process.
+    :param value: Integer score between 0 and 10.
+    :param style: 'score' for the red/green category gauge out of 10, 'overall' for the blue gauge out of 100.
+    :param fmt: 'png' or 'svg'.
+    :return: Image bytes.
+    """
+    # matplotlib is imported by the first chart drawn, not with the page.
+    Figure = load('matplotlib.figure').Figure
+    Circle = load('matplotlib.patches').Circle
+
+    if style == 'overall':
+        fig = Figure(figsize=(3, 3))
+        ax = fig.subplots()
+
+        value = value * 10
+        sizes = [100 - value, value]
+
+        # Define colors (blue for the score, silver for the remaining)
+        colors = ['silver', 'blue']
+
+        # Define explode parameters to separate the score section slightly
+        explode = (0, 0.1)
+
+        # Create a pie chart with shadows for a 3D effect
+        ax.pie(sizes, explode=explode, colors=colors, startangle=90, shadow=True)
+
+        # Draw a white circle in the center
+        ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+        ax.text(0, 0, f'{value}/100', horizontalalignment='center', verticalalignment='center')
+
+        # Equal aspect ratio ensures that pie is drawn as a circle
+        ax.axis('equal')
+    elif style == 'score':
+        fig = Figure()
+        ax = fig.subplots()
+
+        sizes = [10 - value, value]
+
+        # Create a pie chart
+        ax.pie(sizes, colors=['red', 'green'], startangle=90)
+
+        # Draw a white circle in the center
+        ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+        ax.text(0, 0, f'{value}/10', horizontalalignment='center', verticalalignment='center')
+    else:
+        raise ValueError(f"Unknown gauge style '{style}', expected one of {', '.join(STYLES)}")
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches='tight', dpi=200)
+    return buffer.getvalue()
+
+
+def prerender_gauges(fmt: str = 'png'):
+    """
+    Renders every gauge up front, e.g. when a server process starts, so no request does matplotlib work.
+    :param fmt: 'png' or 'svg'.
+    :return: None
+    """
+    for style in STYLES:
+        for value in SCORE_RANGE:
+            render_gauge(value, style, fmt)
+
+
+@traced("chart overall")
+def create_chart_overall(value: int) -> bytes:
+    """
+    Return the overall relevance gauge as PNG bytes, for st.image.
+    :param value: Integer value.
+    :return: Bytes
+    """
+    return render_gauge(_clamp(value), 'overall', 'png')
+
+
+@traced("chart score")
+def create_chart(value: int) -> bytes:
+    """
+    Return the category score gauge as PNG bytes, for st.image.
+    :param value: Integer value.
+    :return: Bytes
+    """
+    return render_gauge(_clamp(value), 'score', 'png')
+
+
+def render_waterfall(spans, depths=None, fmt: str = 'png') -> bytes:
+    """
+    Renders the spans of a trace as a waterfall, one bar per span from its start to its end.
+    :param spans: Span dicts with `span_id`, `name`, `start`, `duration` and `status`, in start order.
+    :param depths: Dict of span id to nesting depth, used to indent the labels.
+    :param fmt: 'png' or 'svg'.
+    :return: Image bytes.
+    """
+    Figure = load('matplotlib.figure').Figure
+
+    depths = depths or {}
+    origin = min(span['start'] for span in spans)
+    # Spans too short to see still get a sliver of the total width.
+    min_width = (max(span['start'] + span['duration'] for span in spans) - origin) / 200
+    fig = Figure(figsize=(8, 0.8 + 0.3 * len(spans)))
+    ax = fig.subplots()
+    for i, span in enumerate(spans):
+        color = 'red' if span['status'] == 'error' else 'tab:blue' if span['name'].startswith('llm') else 'silver'
+        ax.barh(i, max(span['duration'], min_width), left=span['start'] - origin, color=color)
+    ax.set_yticks(range(len(spans)))
+    # Tick labels are right aligned, so the nesting is shown with leading dots rather than spaces.
+    ax.set_yticklabels(["· " * depths.get(span['span_id'], 0) + span['name'] for span in spans], fontsize=8)
+    ax.invert_yaxis()
+    ax.set_xlabel('seconds')
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches='tight', dpi=100)
+    return buffer.getvalue()
@@ -1,115 +1,28 @@
 import streamlit as st
 from typing import List, Dict
 import re
-import PyPDF2
 import base64
-import pandas as pd
-from st_aggrid import AgGrid, GridOptionsBuilder
-from st_aggrid.shared import GridUpdateMode, DataReturnMode, JsCode, walk_gridOptions, ColumnsAutoSizeMode, AgGridTheme, \
-    ExcelExportMode
-import matplotlib.pyplot as plt
-from langchain.chains import ConversationChain
-from langchain.chat_models import ChatOpenAI
-from langchain.output_parsers import PydanticOutputParser, OutputFixingParser
-from pydantic import BaseModel, Field
-from langchain.chains.conversation.memory import ConversationBufferMemory
+import hashlib
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from models2 import *
+from models import Resume, ResumeScores, Suggestion
+from charts import create_chart, create_chart_overall
+from llm_clients import get_llm, preload
+from output_repair import parse_score_lines, repairing_parser
+from pdf_cache import file_bytes
+from pdf_reader import extract_pdf
+from pipeline import Stage, run_stages
+from role_profile import get_role_profile
+from sections import FEEDBACK_BUDGET, FEEDBACK_SECTIONS, SCORING_BUDGET, SCORING_SECTIONS, relevant_text
+from skills import normalize_role
+from streaming import StreamRenderer, TokenStream
+from tracing import render_trace, span
 
-# Defining LLM
-llm = ChatOpenAI(model="gpt-3.5-turbo")
-
-
-def read_pdf(file):
-    """
-    Reads a resume in PDF file and extract text from it.
-    :param file: File object
-    :return: String
-    """
-    reader = PyPDF2.PdfReader(file)
-    num_pages = len(reader.pages)
-    text = ""
-    for i in range(num_pages):
-        page = reader.pages[i]
-        text += page.extract_text()
-    return text
-
-
-# def create_chart_overall(value: int):
-#     """
-#     Return matplotlib.pyplot figure.
-#     :param value: Intger value.
-#     :return:
-#     """
-#     fig, ax = plt.subplots(3,3)
-
-#     value = value*10
-
-#     sizes = [10 - value, value]
-
-#     # Create a pie chart
-#     ax.pie(sizes, colors=['red', 'blue'], startangle=90)
-
-#     # Draw a white circle in the center
-#     centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-#     ax.add_artist(centre_circle)
-#     ax.text(0, 0, f'{value}/100', horizontalalignment='center', verticalalignment='center')
-
-#     return fig
-
-def create_chart_overall(value: int):
-    """
-    Return matplotlib.pyplot figure.
-    :param value: Integer value.
-    :return:
-    """
-    fig, ax = plt.subplots(figsize=(3, 3))
-
-    value = value * 10
-    sizes = [100 - value, value]
-
-    # Define colors (blue for the score, silver for the remaining)
-    colors = ['silver', 'blue']
-
-    # Define explode parameters to separate the score section slightly
-    explode = (0, 0.1)
-
-    # Create a pie chart with shadows for a 3D effect
-    ax.pie(sizes, explode=explode, colors=colors, startangle=90, shadow=True)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/100', horizontalalignment='center', verticalalignment='center')
-
-    # Equal aspect ratio ensures that pie is drawn as a circle
-    ax.axis('equal')
-
-    return fig
-
-
-def create_chart(value: int):
-    """
-    Return matplotlib.pyplot figure.
-    :param value: Intger value.
-    :return:
-    """
-    fig, ax = plt.subplots()
-
-    sizes = [10 - value, value]
-
-    # Create a pie chart
-    ax.pie(sizes, colors=['red', 'green'], startangle=90)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/10', horizontalalignment='center', verticalalignment='center')
-
-    return fig
+# Model of every prompt. The client is created on first use (see llm_clients.get_llm), so importing this
+# module does not load langchain.
+MODEL = "gpt-3.5-turbo"
 
 
 def extract_info(resume: str):
@@ -118,7 +31,8 @@ def extract_info(resume: str):
     :param resume:
     :return:
     """
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=Resume), llm=llm)
+    llm = get_llm(MODEL)
+    parser = repairing_parser(Resume, llm)
     format_instructions = parser.get_format_instructions()
     resume_text = llm.predict(
         f"Given a resume {resume} \n Extract all the relevant sections.  \n {format_instructions}")
@@ -139,11 +53,20 @@ def extract_info(resume: str):
 # print(resume_info.experience)
 # print(type(resume_info.experience))
 
-def description_evaluation(resume, job_description):
+def description_evaluation(resume, job_description, stream=False):
+    """
+    Gives markdown feedback on the resume for the job description.
+    :param resume: Resume text.
+    :param job_description: Job role.
+    :param stream: Return a TokenStream instead of waiting for the whole completion.
+    :return: String or TokenStream
+    """
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume, FEEDBACK_SECTIONS, FEEDBACK_BUDGET)
     prompt_template = f'''You are an Resume Expert. Your job is to give feedback on the resume based on the provided job description.
     Be specific about the points.
     
-    Resume: {resume}
+    Resume: {resume_sections}
     
     Job Description: {job_description}
     
@@ -163,16 +86,25 @@ def description_evaluation(resume, job_description):
     ONLY QUOTE THE INFORMATION PROVIDED IN THE RESUME. DO NOT MAKE UP INFORMATION WHICH IS NOT EXPLICITLY PROVIDED IN RESUME.
     RETURN THE RESPONSE IN MARKDOWN FORMAT IN BULLET POINTS.
     '''
+    llm = get_llm(MODEL)
+    if stream:
+        return TokenStream(llm, prompt_template)
     output = llm.predict(prompt_template)
     return output
 
 
-def llm_scoring(llm, resume_text, job_description):
-    # Define the prompt
-    prompt = f"""
-    Given the following resume for the job role '{job_description}', please evaluate and provide a score between 1 to 10 (where 1 is the lowest and 10 is the highest), and provide feedback for each category and the overall resume:
+def llm_scoring(llm, resume_text, job_description, role_profile=None):
+    role_profile = role_profile or get_role_profile(job_description, llm)
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume_text, SCORING_SECTIONS, SCORING_BUDGET)
+    # The ResumeScores schema is part of the prompt, so the first response parses as is.
+    parser = repairing_parser(ResumeScores, llm, fallbacks=[parse_score_lines])
+    format_instructions = parser.get_format_instructions()
+    # Define the prompt. The role profile goes first, it is the same for every candidate of the role.
+    prompt = role_profile.prompt_prefix + f"""
+    Given the following resume for the role above, please evaluate and provide a score between 1 to 10 (where 1 is the lowest and 10 is the highest), and provide feedback for each category and the overall resume:
 
-    {resume_text}
+    {resume_sections}
 
     Categories:
     1. Relevant Experience
@@ -180,28 +112,24 @@ def llm_scoring(llm, resume_text, job_description):
     3. Skills
     4. Projects
 
-    Please provide the scores and feedback to the candidate in the following format:
+    Please provide the scores and feedback to the candidate as JSON in the following format:
 
-    Relevant Experience: {{score_experience}}, Feedback: {{feedback_experience}}
-    Education: {{score_education}}, Feedback: {{feedback_education}}
-    Skills: {{score_skills}}, Feedback: {{feedback_skills}}
-    Projects: {{score_projects}}, Feedback: {{feedback_projects}}
-    Overall Score: {{score_overall}}, Feedback: {{feedback_overall}}
+    {format_instructions}
     """
     # Ask the LLM to score the resume and provide feedback
     response = llm.predict(prompt)
 
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=ResumeScores), llm=llm)
-    format_instructions = parser.get_format_instructions()
-
+    # The score lines are still understood, for responses cached before the prompt asked for JSON.
     resume_scores = parser.parse(response)
 
     return resume_scores
 
 
-def suggest_improvements(llm, experience, job_description):
-    # Define the prompt
-    prompt = f""" Given the following resume for the job role, please evaluate and re write the work tasks
+def suggest_improvements(llm, experience, job_description, stream=False, role_profile=None):
+    role_profile = role_profile or get_role_profile(job_description, llm)
+    # Define the prompt. The role profile goes first, it is the same for every candidate of the role.
+    prompt = role_profile.prompt_prefix + f"""
+    Given the following resume for the role above, please evaluate and re write the work tasks
     using the below hints: 
     HINTS: Usage of quantification of work, usage of strong action works, overall impact made through the work. 
     {experience}
@@ -209,18 +137,21 @@ def suggest_improvements(llm, experience, job_description):
     INSTRUCTION:
     - Select any 4 to 10 work tasks and reframe it for better results.
     - Re write the work tasks so that the chances for the candidate for getting hired becomes more.
-    - Consider the following job description and frame the work tasks according to it.
-    
-    JOB DESCRIPTION:
-    {job_description}
+    - Frame the work tasks according to the required skills and seniority of the role.
 
     """
+    parser = repairing_parser(Suggestion, llm)
+    format_instructions = parser.get_format_instructions()
+    # Without the schema in the prompt the output never parses and every call ends in the LLM fallback.
+    prompt += f"{format_instructions}\n"
+
+    if stream:
+        # The suggestions are parsed once the stream completes.
+        return TokenStream(llm, prompt, parse=parser.parse)
+
     # Ask the LLM to score the resume and provide feedback
     response = llm.predict(prompt)
 
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=Suggestion), llm=llm)
-    format_instructions = parser.get_format_instructions()
-
     suggestions = parser.parse(response)
 
     return suggestions
@@ -256,135 +187,281 @@ color_cell_js = """
    """
 
 
-def main():
-    st.set_page_config(layout="wide")
-    st.title("Welcome to Resumoid 🤖")
-    st.header("Your personal AI ATS!")
+def render_candidate_details(container, resume_info):
+    """
+    Renders the personal details extracted from the resume.
+    :param container: Streamlit placeholder to draw into.
+    :param resume_info: Resume returned by extract_info.
+    :return: None
+    """
+    with container.container():
+        # name = resume_info.personal_details.name
+        st.markdown("**Name:** " + resume_info.personal_details.name)
+        st.markdown("**Email:** " + resume_info.personal_details.email)
+        st.markdown("**Contact Number:** " + resume_info.personal_details.contact_num)
+        st.markdown("**University:** " + resume_info.education[0].university)
+        st.markdown("**Current Job Role:** " + resume_info.experience[0].company_name)
+        st.markdown("**Company:** " + resume_info.experience[0].job_role)
 
-    st.markdown("📄 Upload your resume and job role to get feedback")
 
-    resume_pdf = st.file_uploader("Upload your resume", type=['pdf'], label_visibility='collapsed')
-    job_description = st.text_input("Enter the role for which you are applying")
+def render_scores(overall_container, columns, resume_scores):
+    """
+    Renders the overall relevance score and the per category evaluation.
+    :param overall_container: Streamlit placeholder for the overall score.
+    :param columns: The four evaluation columns.
+    :param resume_scores: ResumeScores returned by llm_scoring.
+    :return: None
+    """
+    with overall_container.container():
+        st.image(create_chart_overall(resume_scores.overall_score))
+        st.markdown(resume_scores.overall_feedback)
+
+    # st.markdown("**Experience Score:** " + str(resume_scores.experience_score))
+    # st.markdown("**Experience Feedback:** " + resume_scores.experience_feedback)
+    # st.markdown("**Education Score:** " + str(resume_scores.education_score))
+    # st.markdown("**Education Feedback:** " + resume_scores.education_feedback)
+
+    col1, col2, col3, col4 = columns
+    # Column 1
+    col1.markdown("### Experience \n\n\n")
+    col1.image(create_chart(resume_scores.experience_score))
+    col1.markdown(resume_scores.experience_feedback)
+
+    # Column 2
+    col2.markdown("### Education \n\n\n")
+    col2.image(create_chart(resume_scores.education_score))
+    col2.markdown(resume_scores.education_feedback)
+
+    # Column 3
+    col3.markdown("### Skills \n\n\n\n")
+    col3.image(create_chart(resume_scores.skills_score))
+    col3.markdown(resume_scores.skills_feedback)
+
+    # Column 4
+    col4.markdown("### Projects \n\n\n\n")
+    col4.image(create_chart(resume_scores.projects_score))
+    col4.markdown(resume_scores.projects_feedback)
+
+
+def render_suggestions(container, suggestions):
+    """
+    Renders the original work tasks next to the suggested rewrites.
+    :param container: Streamlit placeholder to draw into.
+    :param suggestions: Suggestion returned by suggest_improvements.
+    :return: None
+    """
+    original_tasks = suggestions.original_task
+    improvised_tasks = suggestions.reframed
 
-    submit = st.button("Submit")
+    work_tasks = ""
+    improved = ""
 
-    if resume_pdf and job_description and submit:
-        resume_text = read_pdf(resume_pdf)
-        resume_info = extract_info(resume_text)
-        gpt4_model = ChatOpenAI(model='gpt-3.5-turbo')
-        resume_scores = llm_scoring(llm=gpt4_model, resume_text=resume_text, job_description=job_description)
+    for task, suggestion in zip(original_tasks, improvised_tasks):
+        work_tasks += f"- :red[{task}]\n"
+        improved += f"""- :green[{suggestion}]\n"""
 
+    with container.container():
         st.divider()
 
-        st.markdown("### Candidate Details")
+        col4, col5 = st.columns(2)
 
-        # st.text(resume_info)
-        # st.write(resume_info)
-        # print(resume_info)
-        # name, phone, email
+        col4.markdown("### Your Points")
+        col4.markdown(work_tasks)
 
-        # name = resume_info.personal_details.name
-        # st.markdown("### Candidate Details")
-        st.markdown("**Name:** " + resume_info.personal_details.name)
-        # st.markdown("**Name:** " + name)
-        st.markdown("**Email:** " + resume_info.personal_details.email)
-        st.markdown("**Contact Number:** " + resume_info.personal_details.contact_num)
-        st.markdown("**University:** " + resume_info.education[0].university)
-        st.markdown("**Current Job Role:** " + resume_info.experience[0].company_name)
-        st.markdown("**Company:** " + resume_info.experience[0].job_role)
+        col5.markdown("### Suggested Improvement")
+        col5.markdown(improved)
 
-        st.divider()
 
-        ocol1, ocol2, ocol3 = st.columns(3)
+def analysis_key(resume_pdf, job_description) -> str:
+    """
+    Identifies an analysis by the PDF contents and the normalized role, so results are reused until either
+    changes.
+    :param resume_pdf: Uploaded PDF.
+    :param job_description: Job role.
+    :return: Hex digest
+    """
+    digest = hashlib.sha256(file_bytes(resume_pdf))
+    digest.update(f"\0{normalize_role(job_description)}".encode())
+    return digest.hexdigest()
 
-        ocol2.markdown("### Relevance Score \n\n\n\n")
-        ocol2.pyplot(create_chart_overall(resume_scores.overall_score))
-        ocol2.markdown(resume_scores.overall_feedback)
 
-        st.divider()
+def render_layout(job_description):
+    """
+    Draws the result page headings and returns the placeholders the results are drawn into.
+    :param job_description: Job role.
+    :return: Dict of placeholders.
+    """
+    st.divider()
 
-        st.markdown("### Evaluation")
+    st.markdown("### Candidate Details")
+    details_section = st.empty()
 
-        st.text(f"Here is the evaluation of your resume for the {job_description} role.")
+    st.divider()
 
-        # st.markdown("**Experience Score:** " + str(resume_scores.experience_score))
-        # st.markdown("**Experience Feedback:** " + resume_scores.experience_feedback)
-        # st.markdown("**Education Score:** " + str(resume_scores.education_score))
-        # st.markdown("**Education Feedback:** " + resume_scores.education_feedback)
+    ocol1, ocol2, ocol3 = st.columns(3)
+    ocol2.markdown("### Relevance Score \n\n\n\n")
+    overall_section = ocol2.empty()
 
-        col1, col2, col3, col4 = st.columns(4)
-        # Column 1
-        col1.markdown("### Experience \n\n\n")
-        col1.pyplot(create_chart(resume_scores.experience_score))
-        col1.markdown(resume_scores.experience_feedback)
+    st.divider()
 
-        # Column 2
-        col2.markdown("### Education \n\n\n")
-        col2.pyplot(create_chart(resume_scores.education_score))
-        col2.markdown(resume_scores.education_feedback)
+    st.markdown("### Evaluation")
 
-        # Column 3
-        col3.markdown("### Skills \n\n\n\n")
-        col3.pyplot(create_chart(resume_scores.skills_score))
-        col3.markdown(resume_scores.skills_feedback)
+    st.text(f"Here is the evaluation of your resume for the {job_description} role.")
 
-        # Column 4
-        col4.markdown("### Projects \n\n\n\n")
-        col4.pyplot(create_chart(resume_scores.projects_score))
-        col4.markdown(resume_scores.projects_feedback)
+    evaluation_columns = st.columns(4)
 
-        st.divider()
+    st.divider()
 
-        st.markdown("### Detailed Comments")
-        feedback_jobdesc = description_evaluation(resume_text, job_description)
-        st.markdown(feedback_jobdesc)
+    st.markdown("### Detailed Comments")
+    feedback_section = st.empty()
 
-        st.markdown("### Suggestions")
-        output = suggest_improvements(llm, resume_info.experience, job_description)
+    st.markdown("### Suggestions")
+    suggestions_section = st.empty()
 
-        original_tasks = output.original_task
-        improvised_tasks = output.reframed
+    return {
+        'details': details_section,
+        'overall': overall_section,
+        'evaluation': evaluation_columns,
+        'feedback': feedback_section,
+        'suggestions': suggestions_section,
+    }
 
-        work_tasks = ""
-        improved = ""
 
-        st.divider()
+def render_results(sections, results):
+    """
+    Redraws stored analysis results without calling the LLM.
+    :param sections: Placeholders returned by render_layout.
+    :param results: Dict with `resume_info`, `resume_scores`, `feedback_jobdesc` and `suggestions`.
+    :return: None
+    """
+    render_candidate_details(sections['details'], results['resume_info'])
+    render_scores(sections['overall'], sections['evaluation'], results['resume_scores'])
+    sections['feedback'].markdown(results['feedback_jobdesc'])
+    render_suggestions(sections['suggestions'], results['suggestions'])
 
-        for task, suggestion in zip(original_tasks, improvised_tasks):
-            work_tasks += f"- :red[{task}]\n"
-            improved += f"""- :green[{suggestion}]\n"""
 
-        col4, col5 = st.columns(2)
+def analysis_stages(resume_text, job_description):
+    """
+    Builds the pipeline of one analysis. The extraction, the role profile and the feedback start together, the
+    scores as soon as the role profile is ready and the suggestions once the experience has been extracted. The
+    feedback and suggestions stages return token streams that are drawn while the completion arrives.
+    :param resume_text: Resume text.
+    :param job_description: Job role.
+    :return: List of Stage
+    """
+    llm = get_llm(MODEL)
+    return [
+        Stage("resume_info", lambda: extract_info(resume_text)),
+        Stage("role_profile", lambda: get_role_profile(job_description, llm)),
+        Stage("resume_scores", lambda role_profile: llm_scoring(llm=llm, resume_text=resume_text,
+                                                                job_description=job_description,
+                                                                role_profile=role_profile),
+              depends_on=("role_profile",)),
+        Stage("feedback_jobdesc", lambda: description_evaluation(resume_text, job_description, stream=True)),
+        Stage("suggestions", lambda resume_info, role_profile: suggest_improvements(
+            llm, resume_info.experience, job_description, stream=True, role_profile=role_profile),
+              depends_on=("resume_info", "role_profile")),
+    ]
+
+
+def run_analysis(sections, resume_pdf, job_description):
+    """
+    Runs the analysis, drawing each result as soon as it is ready.
+    :param sections: Placeholders returned by render_layout.
+    :param resume_pdf: Uploaded PDF.
+    :param job_description: Job role.
+    :return: Dict with `resume_info`, `role_profile`, `resume_scores`, `feedback_jobdesc` and `suggestions`.
+    """
+    resume_text = extract_pdf(resume_pdf)['text']
+    results = {}
+
+    def store_feedback(feedback):
+        results['feedback_jobdesc'] = feedback
+
+    def draw_suggestions(suggestions):
+        render_suggestions(sections['suggestions'], suggestions)
+        results['suggestions'] = suggestions
+
+    # The streams are drawn between the other results instead of holding them back until they are complete.
+    renderer = StreamRenderer()
+    for name, result in run_stages(analysis_stages(resume_text, job_description), on_idle=renderer.refresh):
+        if name == "resume_info":
+            render_candidate_details(sections['details'], result)
+        elif name == "resume_scores":
+            render_scores(sections['overall'], sections['evaluation'], result)
+        elif name == "feedback_jobdesc":
+            renderer.add(sections['feedback'], result, on_done=store_feedback)
+            continue
+        elif name == "suggestions":
+            renderer.add(sections['suggestions'], result, markdown=False, on_done=draw_suggestions)
+            continue
+        results[name] = result
+    renderer.finish()
+    return results
 
-        col4.markdown("### Your Points")
-        col4.markdown(work_tasks)
 
-        col5.markdown("### Suggested Improvement")
-        col5.markdown(improved)
+def main():
+    st.set_page_config(layout="wide")
+    st.title("Welcome to Resumoid 🤖")
+    st.header("Your personal AI ATS!")
 
-        # AgGrid Table
-        # improvisations_json = dict()
-        # improvisations_json['Original Tasks'] = original_tasks
-        # improvisations_json['Improved Tasks'] = improvised_tasks
-        # df = pd.DataFrame(improvisations_json)
-        #
-        # go = GridOptionsBuilder.from_dataframe(df)
-        # go.configure_column('Original Tasks', cellStyle=JsCode(
-        # color_cell_js))
-        # AgGrid(df, gridOptions=go.build(),allow_unsafe_jscode=True, heights=10,
-        # columns_auto_size_mode=ColumnsAutoSizeMode.FIT_CONTENTS) st.table(improvisations_json)
-
-        if "expert_chat" not in st.session_state:
-            st.session_state.expert_chat = False
-
-        if st.button("Ask an Expert"):
-            st.session_state.expert_chat = True
-
-        if st.session_state.expert_chat:
-            query = st.text_input("Enter your query", placeholder="enter your query", label_visibility="collapsed")
-            if query:
-                # st.write(query)
-                st.write("Expert Chat coming soon!")
+    st.markdown("📄 Upload your resume and job role to get feedback")
+
+    resume_pdf = st.file_uploader("Upload your resume", type=['pdf'], label_visibility='collapsed')
+    job_description = st.text_input("Enter the role for which you are applying")
+
+    submit = st.button("Submit")
+    preload()
+
+    if not (resume_pdf and job_description):
+        return
+
+    # Results are kept in the session for the current PDF and role. Widget interactions rerun the script, they
+    # are redrawn from memory instead of calling the LLM again, and a new PDF or role drops them.
+    key = analysis_key(resume_pdf, job_description)
+    analysis = st.session_state.get("analysis")
+    if analysis is not None and analysis['key'] != key:
+        del st.session_state["analysis"]
+        st.session_state.expert_chat = False
+        analysis = None
+
+    if analysis is None and not submit:
+        return
+
+    sections = render_layout(job_description)
+    if analysis is None:
+        with span("analysis", role=job_description) as root:
+            results = run_analysis(sections, resume_pdf, job_description)
+        analysis = st.session_state.analysis = {'key': key, 'results': results, 'trace': root.trace.to_dicts()}
+    else:
+        render_results(sections, analysis['results'])
+
+    if st.sidebar.checkbox("Show trace"):
+        render_trace(st.expander("Trace of the analysis", expanded=True), analysis['trace'])
+
+    # AgGrid Table
+    # improvisations_json = dict()
+    # improvisations_json['Original Tasks'] = original_tasks
+    # improvisations_json['Improved Tasks'] = improvised_tasks
+    # df = pd.DataFrame(improvisations_json)
+    #
+    # go = GridOptionsBuilder.from_dataframe(df)
+    # go.configure_column('Original Tasks', cellStyle=JsCode(
+    # color_cell_js))
+    # AgGrid(df, gridOptions=go.build(),allow_unsafe_jscode=True, heights=10,
+    # columns_auto_size_mode=ColumnsAutoSizeMode.FIT_CONTENTS) st.table(improvisations_json)
+
+    if "expert_chat" not in st.session_state:
+        st.session_state.expert_chat = False
+
+    if st.button("Ask an Expert"):
+        st.session_state.expert_chat = True
+
+    if st.session_state.expert_chat:
+        query = st.text_input("Enter your query", placeholder="enter your query", label_visibility="collapsed")
+        if query:
+            # st.write(query)
+            st.write("Expert Chat coming soon!")
 
 
 if __name__ == '__main__':
@@ -1,93 +1,24 @@
 import streamlit as st
 from typing import List, Dict
 import re
-import PyPDF2
 import base64
-import pandas as pd
-from st_aggrid import AgGrid, GridOptionsBuilder
-from st_aggrid.shared import GridUpdateMode, DataReturnMode, JsCode, walk_gridOptions, ColumnsAutoSizeMode, AgGridTheme, \
-    ExcelExportMode
-import matplotlib.pyplot as plt
-from langchain.chains import ConversationChain
-from langchain.chat_models import ChatOpenAI
-from langchain.output_parsers import PydanticOutputParser, OutputFixingParser
-from pydantic import BaseModel, Field
-from langchain.chains.conversation.memory import ConversationBufferMemory
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from models2 import *
+from models import Resume, ResumeScores, Suggestion
+from charts import create_chart, create_chart_overall
+from llm_clients import get_llm, preload
+from output_repair import parse_score_lines, repairing_parser
+from pdf_reader import extract_pdf
+from pipeline import Stage, run_stages
+from role_profile import get_role_profile
+from sections import FEEDBACK_BUDGET, FEEDBACK_SECTIONS, SCORING_BUDGET, SCORING_SECTIONS, relevant_text
+from streaming import StreamRenderer, TokenStream
 
-# Defining LLM
-llm = ChatOpenAI(model="gpt-3.5-turbo-16k")
-
-
-def read_pdf(file):
-    """
-    Reads a resume in PDF file and extract text from it.
-    :param file: File object
-    :return: String
-    """
-    reader = PyPDF2.PdfReader(file)
-    num_pages = len(reader.pages)
-    text = ""
-    for i in range(num_pages):
-        page = reader.pages[i]
-        text += page.extract_text()
-    return text
-
-
-def create_chart_overall(value: int):
-    """
-    Return matplotlib.pyplot figure.
-    :param value: Integer value.
-    :return:
-    """
-    fig, ax = plt.subplots(figsize=(3, 3))
-
-    value = value * 10
-    sizes = [100 - value, value]
-
-    # Define colors (blue for the score, silver for the remaining)
-    colors = ['silver', 'blue']
-
-    # Define explode parameters to separate the score section slightly
-    explode = (0, 0.1)
-
-    # Create a pie chart with shadows for a 3D effect
-    ax.pie(sizes, explode=explode, colors=colors, startangle=90, shadow=True)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/100', horizontalalignment='center', verticalalignment='center')
-
-    # Equal aspect ratio ensures that pie is drawn as a circle
-    ax.axis('equal')
-
-    return fig
-
-
-def create_chart(value: int):
-    """
-    Return matplotlib.pyplot figure.
-    :param value: Intger value.
-    :return:
-    """
-    fig, ax = plt.subplots()
-
-    sizes = [10 - value, value]
-
-    # Create a pie chart
-    ax.pie(sizes, colors=['red', 'green'], startangle=90)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/10', horizontalalignment='center', verticalalignment='center')
-
-    return fig
+# Model of every prompt. The client is created on first use (see llm_clients.get_llm), so importing this
+# module does not load langchain.
+MODEL = "gpt-3.5-turbo"
 
 
 def extract_info(resume: str):
@@ -96,7 +27,8 @@ def extract_info(resume: str):
     :param resume:
     :return:
     """
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=Resume), llm=llm)
+    llm = get_llm(MODEL)
+    parser = repairing_parser(Resume, llm)
     format_instructions = parser.get_format_instructions()
     resume_text = llm.predict(
         f"Given a resume {resume} \n Extract all the relevant sections.  \n {format_instructions}")
@@ -104,11 +36,20 @@ def extract_info(resume: str):
     return resume_info
 
 
-def description_evaluation(resume, job_description):
+def description_evaluation(resume, job_description, stream=False):
+    """
+    Gives markdown feedback on the resume for the job description.
+    :param resume: Resume text.
+    :param job_description: Job role.
+    :param stream: Return a TokenStream instead of waiting for the whole completion.
+    :return: String or TokenStream
+    """
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume, FEEDBACK_SECTIONS, FEEDBACK_BUDGET)
     prompt_template = f'''You are an Resume Expert. Your job is to give feedback on the resume based on the provided job description.
     Be specific about the points.
 
-    Resume: {resume}
+    Resume: {resume_sections}
 
     Job Description: {job_description}
 
@@ -128,16 +69,25 @@ def description_evaluation(resume, job_description):
     ONLY QUOTE THE INFORMATION PROVIDED IN THE RESUME. DO NOT MAKE UP INFORMATION WHICH IS NOT EXPLICITLY PROVIDED IN RESUME.
     RETURN THE RESPONSE IN MARKDOWN FORMAT IN BULLET POINTS.
     '''
+    llm = get_llm(MODEL)
+    if stream:
+        return TokenStream(llm, prompt_template)
     output = llm.predict(prompt_template)
     return output
 
 
-def llm_scoring(llm, resume_text, job_description):
-    # Define the prompt
-    prompt = f"""
-    Given the following resume for the job role '{job_description}', please evaluate and provide a score between 1 to 10 (where 1 is the lowest and 10 is the highest), and provide feedback for each category and the overall resume:
+def llm_scoring(llm, resume_text, job_description, role_profile=None):
+    role_profile = role_profile or get_role_profile(job_description, llm)
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume_text, SCORING_SECTIONS, SCORING_BUDGET)
+    # The ResumeScores schema is part of the prompt, so the first response parses as is.
+    parser = repairing_parser(ResumeScores, llm, fallbacks=[parse_score_lines])
+    format_instructions = parser.get_format_instructions()
+    # Define the prompt. The role profile goes first, it is the same for every candidate of the role.
+    prompt = role_profile.prompt_prefix + f"""
+    Given the following resume for the role above, please evaluate and provide a score between 1 to 10 (where 1 is the lowest and 10 is the highest), and provide feedback for each category and the overall resume:
 
-    {resume_text}
+    {resume_sections}
 
     Categories:
     1. Relevant Experience
@@ -155,26 +105,20 @@ def llm_scoring(llm, resume_text, job_description):
     - Skills and Projects should be evaluated in conjuction with applied role. Give a low score (<6) if there are no relevant projects.
     - Score should be integers between 1 to 10. 
 
-    Take a deep breath. Read the above instructions clearly before giving the scores.
+    Take a deep breath. Read the above instructions clearly before giving the scores as JSON in the following format:
 
-    Relevant Experience: {{score_experience}}, Feedback: {{feedback_experience}}
-    Education: {{score_education}}, Feedback: {{feedback_education}}
-    Skills: {{score_skills}}, Feedback: {{feedback_skills}}
-    Projects: {{score_projects}}, Feedback: {{feedback_projects}}
-    Overall Score: {{score_overall}}, Feedback: {{feedback_overall}}
+    {format_instructions}
     """
     # Ask the LLM to score the resume and provide feedback
     response = llm.predict(prompt)
 
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=ResumeScores), llm=llm)
-    format_instructions = parser.get_format_instructions()
-
+    # The score lines are still understood, for responses cached before the prompt asked for JSON.
     resume_scores = parser.parse(response)
 
     return resume_scores
 
 
-def suggest_improvements(llm, experience):
+def suggest_improvements(llm, experience, stream=False):
     # Define the prompt
     prompt = f"""
     Given the following resume for the job role, please evaluate and provide improvements to the work tasks using the below hints:
@@ -186,12 +130,18 @@ def suggest_improvements(llm, experience):
     Select any 4 to 10 work tasks and reframe it for better results.
 
     """
+    parser = repairing_parser(Suggestion, llm)
+    format_instructions = parser.get_format_instructions()
+    # Without the schema in the prompt the output never parses and every call ends in the LLM fallback.
+    prompt += f"{format_instructions}\n"
+
+    if stream:
+        # The suggestions are parsed once the stream completes.
+        return TokenStream(llm, prompt, parse=parser.parse)
+
     # Ask the LLM to score the resume and provide feedback
     response = llm.predict(prompt)
 
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=Suggestion), llm=llm)
-    format_instructions = parser.get_format_instructions()
-
     suggestions = parser.parse(response)
 
     return suggestions
@@ -227,6 +177,86 @@ color_cell_js = """
    """
 
 
+def render_candidate_details(container, resume_info):
+    """
+    Renders the personal details extracted from the resume.
+    :param container: Streamlit placeholder to draw into.
+    :param resume_info: Resume returned by extract_info.
+    :return: None
+    """
+    with container.container():
+        # name = resume_info.personal_details.name
+        st.markdown("**Name:** " + resume_info.personal_details.name)
+        st.markdown("**Email:** " + resume_info.personal_details.email)
+        st.markdown("**Contact Number:** " + resume_info.personal_details.contact_num)
+        st.markdown("**University:** " + resume_info.education[0].university)
+        st.markdown("**Current Job Role:** " + resume_info.experience[0].company_name)
+        st.markdown("**Company:** " + resume_info.experience[0].job_role)
+
+
+def render_scores(overall_container, columns, resume_scores):
+    """
+    Renders the overall relevance score and the per category evaluation.
+    :param overall_container: Streamlit placeholder for the overall score.
+    :param columns: The four evaluation columns.
+    :param resume_scores: ResumeScores returned by llm_scoring.
+    :return: None
+    """
+    with overall_container.container():
+        st.image(create_chart_overall(resume_scores.overall_score))
+        st.markdown(resume_scores.overall_feedback)
+
+    col1, col2, col3, col4 = columns
+    # Column 1
+    col1.markdown("### Experience \n\n\n")
+    col1.image(create_chart(resume_scores.experience_score))
+    col1.markdown(resume_scores.experience_feedback)
+
+    # Column 2
+    col2.markdown("### Education \n\n\n")
+    col2.image(create_chart(resume_scores.education_score))
+    col2.markdown(resume_scores.education_feedback)
+
+    # Column 3
+    col3.markdown("### Skills \n\n\n\n")
+    col3.image(create_chart(resume_scores.skills_score))
+    col3.markdown(resume_scores.skills_feedback)
+
+    # Column 4
+    col4.markdown("### Projects \n\n\n\n")
+    col4.image(create_chart(resume_scores.projects_score))
+    col4.markdown(resume_scores.projects_feedback)
+
+
+def render_suggestions(container, suggestions):
+    """
+    Renders the original work tasks next to the suggested rewrites.
+    :param container: Streamlit placeholder to draw into.
+    :param suggestions: Suggestion returned by suggest_improvements.
+    :return: None
+    """
+    original_tasks = suggestions.original_task
+    improvised_tasks = suggestions.reframed
+
+    with container.container():
+        col4, col5 = st.columns(2)
+        col4.markdown("#### Your Points")
+        col5.markdown("#### Suggested Improvement")
+
+        # for task, suggestion in zip(original_tasks, improvised_tasks):
+        #     x1, x2 = st.columns(2)
+        #     x1.markdown(task)
+        #     x2.markdown(suggestion)
+        #     # st.divider()
+        #     st.markdown("---------------")
+
+        for task, suggestion in zip(original_tasks, improvised_tasks):
+            x1, x2 = st.columns(2)
+            x1.markdown(f"- :red[{task}]")
+            x2.markdown(f"- :green[{suggestion}]")
+            st.markdown("---------------")
+
+
 def main():
     st.set_page_config(layout="wide")
     st.title("Welcome to Resumoid 🤖")
@@ -243,39 +273,22 @@ def main():
     job_description = st.text_input("Enter the role for which you are applying")
 
     submit = st.button("Submit")
+    preload()
 
     if resume_pdf and job_description and submit:
-        resume_text = read_pdf(resume_pdf)
-        resume_info = extract_info(resume_text)
-        gpt4_model = ChatOpenAI(model='gpt-3.5-turbo-16k')
-        resume_scores = llm_scoring(llm=gpt4_model, resume_text=resume_text, job_description=job_description)
+        resume_text = extract_pdf(resume_pdf)['text']
+        llm = get_llm(MODEL)
 
         st.divider()
 
         st.markdown("### Candidate Details")
-
-        # st.text(resume_info)
-        # st.write(resume_info)
-        # print(resume_info)
-        # name, phone, email
-
-        # name = resume_info.personal_details.name
-        # st.markdown("### Candidate Details")
-        st.markdown("**Name:** " + resume_info.personal_details.name)
-        # st.markdown("**Name:** " + name)
-        st.markdown("**Email:** " + resume_info.personal_details.email)
-        st.markdown("**Contact Number:** " + resume_info.personal_details.contact_num)
-        st.markdown("**University:** " + resume_info.education[0].university)
-        st.markdown("**Current Job Role:** " + resume_info.experience[0].company_name)
-        st.markdown("**Company:** " + resume_info.experience[0].job_role)
+        details_section = st.empty()
 
         st.divider()
 
         ocol1, ocol2, ocol3 = st.columns(3)
-
         ocol2.markdown("### Relevance Score \n\n\n\n")
-        ocol2.pyplot(create_chart_overall(resume_scores.overall_score))
-        ocol2.markdown(resume_scores.overall_feedback)
+        overall_section = ocol2.empty()
 
         st.divider()
 
@@ -283,26 +296,7 @@ def main():
 
         st.text(f"Here is the evaluation of your resume for the {job_description} role.")
 
-        col1, col2, col3, col4 = st.columns(4)
-        # Column 1
-        col1.markdown("### Experience \n\n\n")
-        col1.pyplot(create_chart(resume_scores.experience_score))
-        col1.markdown(resume_scores.experience_feedback)
-
-        # Column 2
-        col2.markdown("### Education \n\n\n")
-        col2.pyplot(create_chart(resume_scores.education_score))
-        col2.markdown(resume_scores.education_feedback)
-
-        # Column 3
-        col3.markdown("### Skills \n\n\n\n")
-        col3.pyplot(create_chart(resume_scores.skills_score))
-        col3.markdown(resume_scores.skills_feedback)
-
-        # Column 4
-        col4.markdown("### Projects \n\n\n\n")
-        col4.pyplot(create_chart(resume_scores.projects_score))
-        col4.markdown(resume_scores.projects_feedback)
+        evaluation_columns = st.columns(4)
 
         st.divider()
 
@@ -311,34 +305,30 @@ def main():
         # st.markdown(feedback_jobdesc)
 
         # st.markdown("### Suggestions")
-        output = suggest_improvements(llm, resume_info.experience)
-
-        original_tasks = output.original_task
-        improvised_tasks = output.reframed
-
-        # work_tasks = ""
-        # improved = ""
-
-        # for task, suggestion in zip(original_tasks, improvised_tasks):
-        #     work_tasks += f"- :red[{task}]\n"
-        #     improved += f"""- :green[{suggestion}]\n"""
-
-        col4, col5 = st.columns(2)
-        col4.markdown("#### Your Points")
-        col5.markdown("#### Suggested Improvement")
-
-        # for task, suggestion in zip(original_tasks, improvised_tasks):
-        #     x1, x2 = st.columns(2)
-        #     x1.markdown(task)
-        #     x2.markdown(suggestion)
-        #     # st.divider()
-        #     st.markdown("---------------")
-
-        for task, suggestion in zip(original_tasks, improvised_tasks):
-            x1, x2 = st.columns(2)
-            x1.markdown(f"- :red[{task}]")
-            x2.markdown(f"- :green[{suggestion}]")
-            st.markdown("---------------")
+        suggestions_section = st.empty()
+
+        # Scoring runs alongside the extraction, and the suggestions start as soon as the experience section is
+        # available.
+        stages = [
+            Stage("resume_info", lambda: extract_info(resume_text)),
+            Stage("role_profile", lambda: get_role_profile(job_description, llm)),
+            Stage("resume_scores", lambda role_profile: llm_scoring(llm=llm, resume_text=resume_text,
+                                                                    job_description=job_description,
+                                                                    role_profile=role_profile),
+                  depends_on=("role_profile",)),
+            Stage("suggestions", lambda resume_info: suggest_improvements(llm, resume_info.experience, stream=True),
+                  depends_on=("resume_info",)),
+        ]
+        renderer = StreamRenderer()
+        for name, result in run_stages(stages, on_idle=renderer.refresh):
+            if name == "resume_info":
+                render_candidate_details(details_section, result)
+            elif name == "resume_scores":
+                render_scores(overall_section, evaluation_columns, result)
+            elif name == "suggestions":
+                renderer.add(suggestions_section, result, markdown=False,
+                             on_done=lambda suggestions: render_suggestions(suggestions_section, suggestions))
+        renderer.finish()
 
         st.divider()
 
@@ -348,21 +338,6 @@ def main():
 
         Reach out to me at satvik@buildfastwithai.com""")
 
-        # col4.markdown("### Your Points")
-        # col4.markdown(work_tasks)
-
-        # col5.markdown("### Suggested Improvement")
-        # col5.markdown(improved)
-
-        # print(original_tasks)
-
-        # print(improvised_tasks)
-
-        # print(improved)
-        # print(type(improved))
-        # print(work_tasks)
-        # print(type(work_tasks))
-
         # if "expert_chat" not in st.session_state:
         #     st.session_state.expert_chat = False
 
@@ -375,7 +350,6 @@ def main():
         #     if query:
         #         # st.write(query)
         #         st.write("Expert Chat coming soon!")
-        print(resume_info)
 
 
 if __name__ == '__main__':
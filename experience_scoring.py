@@ -0,0 +1,164 @@
+import re
+from collections import Counter
+from typing import List
+
+from models import Recommendation, RecommendationList
+
+# The criteria scored for the experience section, in display order.
+EXPERIENCE_CRITERIA = [
+    "Quantification evidence of impact",
+    "Less repetition and Unique Action Word",
+    "Weak Action Verbs",
+    "Avoided Responsibility-oriented Words",
+    "Buzzwords & Clichés",
+]
+
+WEAK_VERBS = {
+    'helped', 'help', 'assisted', 'assist', 'worked', 'work', 'handled', 'did', 'made', 'used', 'participated',
+    'involved', 'tried', 'got', 'was', 'were', 'supported', 'contributed', 'dealt', 'went', 'saw', 'attended',
+}
+RESPONSIBILITY_PHRASES = [
+    'responsible for', 'responsibilities included', 'duties included', 'tasked with', 'in charge of',
+    'accountable for', 'role involved', 'duties were', 'my role was', 'job was to',
+]
+BUZZWORDS = [
+    'synergy', 'synergies', 'go-getter', 'team player', 'hard worker', 'hardworking', 'detail-oriented',
+    'detail oriented', 'results-driven', 'results driven', 'think outside the box', 'self-starter', 'self starter',
+    'dynamic', 'passionate', 'motivated', 'best of breed', 'proven track record', 'go-to person', 'value add',
+    'thought leader', 'rockstar', 'ninja', 'guru', 'strategic thinker', 'seasoned', 'out of the box',
+]
+# Words that make a number next to them a measure of impact ("40 engineers", "200ms", "3 weeks"). Years and months
+# are left out, so durations and dates do not pass for quantification.
+METRIC_UNITS = [
+    'k', 'm', 'mm', 'bn', 'million', 'billion', 'thousand', 'lakh', 'lakhs', 'crore', 'crores', 'usd', 'eur', 'inr',
+    'dollars', 'rupees', 'ms', 'milliseconds', 'seconds', 'secs', 'minutes', 'mins', 'hours', 'hrs', 'days', 'weeks',
+    'kb', 'mb', 'gb', 'tb', 'pb', 'qps', 'rps', 'tps', 'users', 'customers', 'clients', 'requests', 'transactions',
+    'records', 'rows', 'events', 'servers', 'nodes', 'engineers', 'developers', 'members', 'people', 'employees',
+    'interns', 'students', 'projects', 'applications', 'apps', 'services', 'microservices', 'reports', 'dashboards',
+    'pipelines', 'models', 'teams', 'countries', 'markets', 'stores', 'sites', 'tickets', 'incidents', 'bugs',
+    'features', 'releases', 'pages', 'downloads', 'orders', 'leads', 'accounts',
+]
+# Verbs and prepositions that make the number after them a result ("reduced by 30", "grew to 500").
+METRIC_VERBS = [
+    'by', 'to', 'of', 'over', 'under', 'than', 'reduced', 'increased', 'decreased', 'cut', 'grew', 'improved',
+    'saved', 'boosted', 'raised', 'lowered', 'managed', 'led', 'mentored', 'trained', 'hired', 'served',
+    'processed', 'generated', 'delivered', 'built', 'launched', 'shipped', 'migrated', 'automated', 'resolved',
+    'closed', 'onboarded', 'supported', 'scaled',
+]
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'to', 'in', 'for', 'on', 'with', 'by', 'at', 'from', 'as', 'is', 'was', 'were',
+    'be', 'that', 'this', 'it', 'its', 'or', 'into', 'using', 'over', 'per', 'our', 'their', 'team', 'new',
+}
+
+_BULLET = re.compile(r'^\s*(?:[-•*▪●◦‣>]|\d+[.)])\s*')
+# A number, not part of a date such as "06/2021".
+_NUMBER = r'(?<![\d/])\d+(?:[.,]\d+)*\+?(?![\d/])'
+# A number that is not a year either: after a verb, "2021" dates a job ("moved to 2021 ...") rather than measures it.
+_QUANTITY = r'(?<![\d/])(?!(?:19|20)\d\d\b)\d+(?:[.,]\d+)*\+?(?![\d/])'
+_METRIC = re.compile('|'.join([
+    r'%', r'\bpercent\b', r'[$€£₹]\s*\d',
+    _NUMBER + r'\s*[x×](?![a-z])',
+    _NUMBER + r'\s*(?:' + '|'.join(METRIC_UNITS) + r')\b',
+    r'\b(?:' + '|'.join(METRIC_VERBS) + r')\s+(?:(?:about|around|approximately|nearly|over|~)\s*)?' + _QUANTITY,
+    r'\b(?:million|billion|thousand|double[sd]?|triple[sd]?|half|halved)\b',
+]), re.I)
+_WORD = re.compile(r"[a-z][a-z'-]*")
+_BUZZWORD = re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in BUZZWORDS) + r')\b')
+
+
+def split_statements(experience: str) -> List[str]:
+    """
+    Splits an experience section into its work statements: bullet lines when the section uses bullets,
+    otherwise sentences.
+    :param experience: Experience section text.
+    :return: List of statements.
+    """
+    lines = [line for line in experience.splitlines() if line.strip()]
+    bullets = [_BULLET.sub('', line).strip() for line in lines if _BULLET.match(line)]
+    if bullets:
+        return bullets
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n', experience) if len(s.split()) >= 3]
+
+
+def _clamp(score: float) -> int:
+    return int(min(max(round(score), 1), 10))
+
+
+def _quote(statements: List[str], limit: int = 3) -> str:
+    return "; ".join(f'"{s[:80]}"' for s in statements[:limit])
+
+
+def score_quantification(statements: List[str]) -> Recommendation:
+    quantified = [s for s in statements if _METRIC.search(s)]
+    missing = [s for s in statements if not _METRIC.search(s)]
+    score = _clamp(10 * len(quantified) / len(statements)) if statements else 1
+    suggestion = f"{len(quantified)} of {len(statements)} statements quantify their impact."
+    if missing:
+        suggestion += f" Add numbers (%, time saved, users, revenue) to: {_quote(missing)}."
+    return Recommendation(score=score, suggestion=suggestion)
+
+
+def score_repetition(statements: List[str]) -> Recommendation:
+    first_words = [words[0] for words in (_WORD.findall(s.lower()) for s in statements) if words]
+    repeated_openers = [word for word, count in Counter(first_words).items() if count > 1]
+    words = [w for s in statements for w in _WORD.findall(s.lower()) if w not in STOPWORDS and len(w) > 3]
+    overused = [word for word, count in Counter(words).most_common(5) if count > 2]
+
+    unique_ratio = len(set(first_words)) / len(first_words) if first_words else 0
+    score = _clamp(10 * unique_ratio - len(overused))
+    suggestion = f"{len(set(first_words))} unique opening words across {len(first_words)} statements."
+    if repeated_openers:
+        suggestion += f" Vary the repeated openers: {', '.join(repeated_openers)}."
+    if overused:
+        suggestion += f" Overused words: {', '.join(overused)}."
+    return Recommendation(score=score, suggestion=suggestion)
+
+
+def score_weak_verbs(statements: List[str]) -> Recommendation:
+    weak = [s for s in statements if WEAK_VERBS.intersection(_WORD.findall(s.lower())[:3])]
+    score = _clamp(10 - 10 * len(weak) / len(statements)) if statements else 1
+    if weak:
+        suggestion = f"Replace weak verbs with strong action verbs (led, built, delivered) in: {_quote(weak)}."
+    else:
+        suggestion = "Statements open with strong action verbs."
+    return Recommendation(score=score, suggestion=suggestion)
+
+
+def score_responsibility_words(experience: str) -> Recommendation:
+    text = experience.lower()
+    found = [phrase for phrase in RESPONSIBILITY_PHRASES if phrase in text]
+    count = sum(text.count(phrase) for phrase in found)
+    score = _clamp(10 - 3 * count)
+    if found:
+        suggestion = f"Describe achievements rather than duties, avoid: {', '.join(found)}."
+    else:
+        suggestion = "Statements describe achievements rather than responsibilities."
+    return Recommendation(score=score, suggestion=suggestion)
+
+
+def score_buzzwords(experience: str) -> Recommendation:
+    text = experience.lower()
+    found = sorted(set(_BUZZWORD.findall(text)))
+    score = _clamp(10 - 2 * len(found))
+    if found:
+        suggestion = f"Replace clichés with concrete evidence: {', '.join(found)}."
+    else:
+        suggestion = "No buzzwords or clichés found."
+    return Recommendation(score=score, suggestion=suggestion)
+
+
+def score_experience(experience: str) -> RecommendationList:
+    """
+    Scores the experience section on the five criteria with word lists, regexes and counts, without an LLM.
+    The suggestions are short, rule based findings that the LLM suggestions can replace later.
+    :param experience: Experience section text.
+    :return: RecommendationList ordered like EXPERIENCE_CRITERIA.
+    """
+    statements = split_statements(experience)
+    return RecommendationList(recommendationsList=[
+        score_quantification(statements),
+        score_repetition(statements),
+        score_weak_verbs(statements),
+        score_responsibility_words(experience),
+        score_buzzwords(experience),
+    ])
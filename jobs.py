@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, List, Optional
+
+from pipeline import Stage, run_stages
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Number of analyses run at the same time across all sessions, and how long finished jobs are kept around for
+# the sessions polling them. Can be overridden through the environment.
+JOB_WORKERS = int(os.getenv("RESUMOID_JOB_WORKERS", "4"))
+JOB_TTL = int(os.getenv("RESUMOID_JOB_TTL", "3600"))
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Job:
+    """
+    An analysis submitted to the job queue. Stage statuses and results are filled in by the worker thread while
+    the job runs, sessions read them through snapshot().
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.id = uuid.uuid4().hex
+        self.created = time.time()
+        self.finished = None
+        self.status = PENDING
+        self.error = None
+        self.stage_status = {stage.name: PENDING for stage in stages}
+        self.results = {}
+        self.trace = None
+        self._lock = threading.Lock()
+
+    def _set(self, stage: str, status: str, result=None):
+        with self._lock:
+            self.stage_status[stage] = status
+            if status == DONE:
+                self.results[stage] = result
+
+    def snapshot(self) -> Dict:
+        """
+        Returns a consistent copy of the job state.
+        :return: Dict with `id`, `status`, `error`, `stages` (name to status), `results` (finished stages only),
+        `progress` (fraction of finished stages) and `trace` (the finished spans of the analysis).
+        """
+        with self._lock:
+            done = sum(status == DONE for status in self.stage_status.values())
+            return {
+                'id': self.id,
+                'status': self.status,
+                'error': self.error,
+                'stages': dict(self.stage_status),
+                'results': dict(self.results),
+                'progress': done / len(self.stage_status) if self.stage_status else 1.0,
+                'trace': self.trace.to_dicts() if self.trace else [],
+            }
+
+
+class JobQueue:
+    """
+    In-process queue running analyses on a bounded thread pool. Streamlit sessions submit a job, keep its id and
+    poll it on later reruns, so no script thread is held while the LLM calls run.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, ttl: int = JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='resumoid-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, stages: List[Stage]) -> str:
+        """
+        Queues an analysis.
+        :param stages: Pipeline stages of the analysis.
+        :return: Job id.
+        """
+        job = Job(stages)
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+        # The job runs in the submitter's context, e.g. with its LLM priority.
+        self._executor.submit(copy_context().run, self._run, job, stages)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Returns the state of a job, or None when it is unknown or expired.
+        :param job_id: Job id.
+        :return: Dict as returned by Job.snapshot.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def _run(self, job: Job, stages: List[Stage]):
+        def tracked(stage):
+            def func(**kwargs):
+                job._set(stage.name, RUNNING)
+                try:
+                    result = stage.func(**kwargs)
+                except Exception:
+                    job._set(stage.name, FAILED)
+                    raise
+                job._set(stage.name, DONE, result)
+                return result
+            return Stage(stage.name, func, stage.depends_on)
+
+        job.status = RUNNING
+        try:
+            with span("analysis", job_id=job.id) as root:
+                job.trace = root.trace
+                for _ in run_stages([tracked(stage) for stage in stages]):
+                    pass
+            job.status = DONE
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            with job._lock:
+                job.error = f"{type(e).__name__}: {e}"
+                # Stages waiting on the failed one never run.
+                for name, status in job.stage_status.items():
+                    if status == PENDING:
+                        job.stage_status[name] = FAILED
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def _expire(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and now - job.finished > self.ttl]:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue()
@@ -0,0 +1,23 @@
+import importlib
+import sys
+import threading
+
+# langchain's modules import each other in cycles. When two threads import them for the first time at once, one
+# of them can get a half initialized module ("cannot import name ... from partially initialized module"), so the
+# first import of every dependency the apps defer goes through one lock.
+_lock = threading.RLock()
+_loaded = set()
+
+
+def load(name: str):
+    """
+    Imports a module on first use, one thread at a time. Use it instead of an import statement for the
+    dependencies that are not imported with the apps (langchain, matplotlib, llm_chat, ...).
+    :param name: Module name, e.g. 'langchain.output_parsers'.
+    :return: Module
+    """
+    if name not in _loaded:
+        with _lock:
+            importlib.import_module(name)
+            _loaded.add(name)
+    return sys.modules[name]
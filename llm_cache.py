@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import langchain
+from langchain.load.dump import dumps
+from langchain.load.load import loads
+from langchain.schema.cache import RETURN_VAL_TYPE, BaseCache
+
+from tracing import set_attribute
+
+# Location and limits of the response cache. Can be overridden through the environment.
+CACHE_PATH = os.getenv("RESUMOID_LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite"))
+TTL_SECONDS = float(os.getenv("RESUMOID_LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+MAX_ENTRIES = int(os.getenv("RESUMOID_LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapses whitespace so prompts that only differ in indentation share a cache entry.
+    :param prompt: Prompt string.
+    :return: String
+    """
+    return " ".join(prompt.split())
+
+
+class ResponseCache(BaseCache):
+    """
+    SQLite backed LLM response cache shared by every prompt function. Entries are keyed on the normalized prompt
+    and the serialized model parameters (model name, temperature, ...), expire after `ttl` seconds and the least
+    recently used entries are evicted once there are more than `max_entries`.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{normalize_prompt(prompt)}\0{llm_string}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up based on prompt and llm_string."""
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            generations = None
+            if row is not None and now - row[1] <= self.ttl:
+                try:
+                    generations = [loads(generation) for generation in json.loads(row[0])]
+                except Exception:
+                    # Written by another langchain version or damaged: a miss, replaced by the next update.
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            if generations is None:
+                self.misses += 1
+                set_attribute('cache_hit', False)
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        set_attribute('cache_hit', True)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Update cache based on prompt and llm_string."""
+        key = self._key(prompt, llm_string)
+        response = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self, **kwargs: Any) -> None:
+        """Clear cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the hit/miss counters of this process and the number of stored entries.
+        :return: Dict
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+        }
+
+
+def enable_llm_cache() -> Optional[ResponseCache]:
+    """
+    Installs the response cache as langchain's global LLM cache, which every `llm.predict` call consults before
+    hitting the API. Set RESUMOID_LLM_CACHE=0 to disable it.
+    :return: The active cache, or None when disabled.
+    """
+    if os.getenv("RESUMOID_LLM_CACHE", "1") == "0":
+        return None
+    if not isinstance(langchain.llm_cache, ResponseCache):
+        langchain.llm_cache = ResponseCache()
+    return langchain.llm_cache
@@ -0,0 +1,84 @@
+import logging
+from typing import Any
+from uuid import UUID
+
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.chat_models import ChatOpenAI
+
+from llm_scheduler import scheduler
+from tokens import count_message_tokens, count_tokens, estimate_cost, fit_model
+from tracing import end_span, set_attribute, start_span
+
+logger = logging.getLogger(__name__)
+
+
+class PooledChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI that sends every request through the process-wide LLMScheduler, which bounds the requests in
+    flight, keeps them under the provider quota and retries rate limited ones. It replaces the client's own
+    retry loop, so a 429 is seen by the scheduler instead of being retried blindly.
+
+    The prompt is counted before sending and the request goes to the cheapest model of the client's family whose
+    context window holds it (see tokens.fit_model), so short prompts never pay for a long context model and long
+    ones do not fail with a context length error.
+    """
+
+    def completion_with_retry(self, run_manager=None, **kwargs: Any) -> Any:
+        model = kwargs.get('model', self.model_name)
+        prompt_tokens = count_message_tokens(kwargs.get('messages', []), model)
+        fitted = fit_model(model, prompt_tokens, kwargs.get('max_tokens'))
+        if fitted != model:
+            logger.info("Sending a %d token prompt to %s instead of %s", prompt_tokens, fitted, model)
+            kwargs = {**kwargs, 'model': fitted}
+        cost = estimate_cost(fitted, prompt_tokens, kwargs.get('max_tokens') or round(scheduler.completion_tokens))
+        logger.debug("LLM request to %s: %d prompt tokens, about $%.4f", fitted, prompt_tokens, cost or 0.0)
+        set_attribute('model', fitted)
+        set_attribute('prompt_tokens', prompt_tokens)
+        set_attribute('cost_estimate', cost)
+        send = scheduler.stream if kwargs.get('stream') else scheduler.call
+        return send(lambda: self.client.create(**kwargs), prompt_tokens, kwargs.get('max_tokens'), self.max_retries)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records every LLM call as an `llm` span under the current span, with the model, the prompt and completion
+    tokens and their cost. Tokens are the ones the API reports, or counts for streamed and cached responses that
+    come without usage. Response cache hits, scheduler retries and the model picked for the prompt size are
+    added to the span by the cache, the scheduler and PooledChatOpenAI, which run inside it.
+    """
+
+    def __init__(self):
+        self._spans = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> Any:
+        params = kwargs.get('invocation_params') or {}
+        self._spans[run_id] = start_span(
+            "llm", model=params.get('model_name') or params.get('model'),
+            prompt_tokens=sum(count_tokens(message.content) for batch in messages for message in batch))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> Any:
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        usage = (response.llm_output or {}).get('token_usage')
+        if usage:
+            span.set_attribute('prompt_tokens', usage.get('prompt_tokens'))
+            span.set_attribute('completion_tokens', usage.get('completion_tokens'))
+        else:
+            span.set_attribute('completion_tokens', sum(count_tokens(generation.text)
+                                                        for generations in response.generations
+                                                        for generation in generations))
+            span.set_attribute('tokens_estimated', True)
+        if not span.attributes.get('cache_hit'):
+            span.set_attribute('cost', estimate_cost(span.attributes.get('model'),
+                                                     span.attributes.get('prompt_tokens') or 0,
+                                                     span.attributes.get('completion_tokens') or 0))
+        end_span(span)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> Any:
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            end_span(span, error)
+
+
+tracing_callbacks = TracingCallbackHandler()
@@ -0,0 +1,85 @@
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from charts import prerender_gauges
+from lazy_imports import load
+from llm_scheduler import MAX_IN_FLIGHT
+
+if TYPE_CHECKING:
+    from llm_chat import PooledChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Size of the HTTP connection pool kept open to the API. Can be overridden through the environment.
+POOL_SIZE = int(os.getenv("RESUMOID_HTTP_POOL_SIZE", str(max(MAX_IN_FLIGHT, 10))))
+# Modules an analysis needs that take seconds to import (langchain alone takes about two). The apps import them on
+# first use through lazy_imports.load, and preload() imports them in the background once the page is drawn.
+PRELOAD_MODULES = ('llm_chat', 'llm_cache', 'langchain.output_parsers', 'matplotlib.figure')
+
+
+def _warm_up(session: requests.Session):
+    openai = load('openai')
+    try:
+        session.head(openai.api_base, timeout=5)
+    except requests.RequestException as e:
+        logger.debug("Could not pre-open a connection to %s: %s", openai.api_base, e)
+
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session used by the openai client. Its keep-alive connection pool is sized for
+    MAX_IN_FLIGHT concurrent requests, and the first connection is opened in the background so the TLS handshake
+    is not paid by the first request.
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    threading.Thread(target=_warm_up, args=(session,), daemon=True).start()
+    return session
+
+
+@st.cache_resource
+def get_llm(model: str, temperature: float = 0.7) -> 'PooledChatOpenAI':
+    """
+    Returns the shared client of a model. Clients are created once per process and reused by every rerun and
+    session, and they all send their requests through the pooled HTTP session. The first call loads langchain
+    and installs the response cache (see llm_cache.enable_llm_cache).
+    :param model: Model name.
+    :param temperature: Sampling temperature.
+    :return: PooledChatOpenAI
+    """
+    llm_chat = load('llm_chat')
+    load('llm_cache').enable_llm_cache()
+    load('openai').requestssession = http_session()
+    return llm_chat.PooledChatOpenAI(model=model, temperature=temperature, callbacks=[llm_chat.tracing_callbacks])
+
+
+def _preload():
+    for name in PRELOAD_MODULES:
+        try:
+            load(name)
+        except ImportError as e:
+            logger.warning("Could not preload %s: %s", name, e)
+    try:
+        prerender_gauges()
+    except ImportError as e:
+        logger.warning("Could not prerender the score gauges: %s", e)
+
+
+@st.cache_resource
+def preload():
+    """
+    Imports PRELOAD_MODULES and renders the score gauges in a background thread, once per process, so the first
+    analysis does not wait for them. Call it after the page is drawn.
+    :return: None
+    """
+    threading.Thread(target=_preload, name="preload", daemon=True).start()
@@ -0,0 +1,280 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from tracing import add_event, set_attribute
+
+logger = logging.getLogger(__name__)
+
+# Provider quota of the API key and the concurrency ceiling. Can be overridden through the environment.
+REQUESTS_PER_MINUTE = int(os.getenv("RESUMOID_LLM_RPM", "3500"))
+TOKENS_PER_MINUTE = int(os.getenv("RESUMOID_LLM_TPM", "90000"))
+MAX_IN_FLIGHT = int(os.getenv("RESUMOID_MAX_IN_FLIGHT", "8"))
+# Providers enforce per minute quotas over shorter windows, so the buckets only hold a few seconds of quota.
+BURST_SECONDS = float(os.getenv("RESUMOID_LLM_BURST_SECONDS", "6"))
+# Completion tokens reserved for a request that does not set max_tokens, until real completions have been seen.
+DEFAULT_COMPLETION_TOKENS = 500
+
+INTERACTIVE = 0
+BATCH = 1
+
+# Errors worth retrying: provider rate limits, timeouts and transient server errors.
+RETRYABLE_ERRORS = {
+    "RateLimitError", "Timeout", "APITimeoutError", "APIConnectionError", "ServiceUnavailableError",
+    "InternalServerError", "APIError", "TryAgain",
+}
+
+_priority: ContextVar[int] = ContextVar("resumoid_llm_priority", default=INTERACTIVE)
+
+
+def retry_after(error) -> float:
+    """
+    Returns the delay requested by the provider through the Retry-After header, or 0 when absent.
+    :param error: Exception raised by the OpenAI client.
+    :return: Seconds
+    """
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def is_rate_limit(error) -> bool:
+    return type(error).__name__ == "RateLimitError" or getattr(error, 'http_status', None) == 429
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """
+    Runs the LLM calls made inside the block, on this thread, with the given priority.
+    :param priority: INTERACTIVE or BATCH.
+    :return: Context manager
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units per minute up to `capacity`. Not thread safe, LLMScheduler guards it.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until `amount` units are available. Requests larger than the bucket wait for a full bucket.
+        """
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= amount
+
+
+class LLMScheduler:
+    """
+    Admission control for every request sent to the LLM provider. A request waits until it is first in line
+    (interactive requests go before batch ones, then arrival order), a concurrency slot is free and both the
+    request and the token bucket can pay for it.
+
+    The concurrency limit adapts: it grows by one after a limit's worth of successful requests and is halved on
+    a rate limit error, which also pauses all requests for the Retry-After delay or an exponential backoff. One
+    slot is kept for interactive requests whenever the limit allows it, so a batch run never locks users out.
+
+    A request reserves its prompt tokens plus max_tokens, or the running average of the completions seen so far,
+    and the difference with the usage the provider reports is settled when it finishes.
+    """
+
+    def __init__(self, requests_per_minute: int = REQUESTS_PER_MINUTE, tokens_per_minute: int = TOKENS_PER_MINUTE,
+                 max_in_flight: int = MAX_IN_FLIGHT, burst_seconds: float = BURST_SECONDS,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_in_flight = max_in_flight
+        self.limit = max_in_flight
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self.completed = 0
+        self.completion_tokens = float(DEFAULT_COMPLETION_TOKENS)
+        self._successes = 0
+        self._consecutive_limits = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _slots(self, priority: int) -> int:
+        reserve = 1 if priority == BATCH and self.limit > 1 else 0
+        return self.limit - reserve
+
+    def acquire(self, tokens: int, priority: Optional[int] = None):
+        """
+        Blocks until the request may be sent, then takes its slot and quota.
+        :param tokens: Estimated tokens of the request.
+        :param priority: INTERACTIVE or BATCH, defaults to the priority set with llm_priority.
+        :return: None
+        """
+        priority = _priority.get() if priority is None else priority
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == ticket and self.in_flight < self._slots(priority):
+                        now = time.monotonic()
+                        timeout = max(self.paused_until - now, self.requests.wait_time(1, now),
+                                      self.tokens.wait_time(tokens, now))
+                        if timeout <= 0:
+                            self.requests.take(1, now)
+                            self.tokens.take(tokens, now)
+                            self.in_flight += 1
+                            return
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def reservation(self, prompt_tokens: int, max_tokens: Optional[int] = None) -> int:
+        """
+        Tokens reserved for a request.
+        :param prompt_tokens: Estimated prompt tokens.
+        :param max_tokens: max_tokens of the request, if set.
+        :return: Integer
+        """
+        return prompt_tokens + (max_tokens or round(self.completion_tokens))
+
+    def release(self, reserved: int, usage: Optional[Dict] = None, error: Optional[BaseException] = None):
+        """
+        Returns the slot of a finished request and adapts the concurrency limit to its outcome.
+        :param reserved: Tokens reserved in acquire.
+        :param usage: Token usage the provider reported. The difference with the reservation is given back to
+            (or taken from) the bucket.
+        :param error: Exception of a failed request.
+        :return: None
+        """
+        with self._condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if usage:
+                self.tokens.take(usage.get('total_tokens', reserved) - reserved, now)
+                if usage.get('completion_tokens') is not None:
+                    self.completion_tokens = 0.8 * self.completion_tokens + 0.2 * usage['completion_tokens']
+
+            if error is not None and is_rate_limit(error):
+                self.rate_limited += 1
+                # Requests already in flight when the quota ran out fail together, only the first one of them
+                # halves the limit and extends the backoff.
+                if now >= self.paused_until:
+                    self._consecutive_limits += 1
+                    self.limit = max(1, self.limit // 2)
+                    backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive_limits - 1))
+                    delay = max(retry_after(error), backoff * random.uniform(1.0, 1.5))
+                    self.paused_until = now + delay
+                    logger.info("Rate limited, concurrency limit %d, pausing %.1fs", self.limit, delay)
+            elif error is None:
+                self.completed += 1
+                self._consecutive_limits = 0
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_in_flight:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def _send(self, func: Callable, tokens: int, max_retries: int, priority: Optional[int]):
+        # Returns the response with its slot still held, the caller releases it.
+        waited = 0.0
+        for attempt in range(max_retries + 1):
+            start = time.perf_counter()
+            self.acquire(tokens, priority)
+            waited += time.perf_counter() - start
+            set_attribute('queue_wait', round(waited, 3))
+            try:
+                return func()
+            except Exception as e:
+                self.release(tokens, error=e)
+                if attempt == max_retries or type(e).__name__ not in RETRYABLE_ERRORS:
+                    raise
+                add_event('retry', attempt=attempt + 1, error=type(e).__name__)
+                set_attribute('retries', attempt + 1)
+                # Rate limited retries wait in acquire, until the pause is over.
+                if not is_rate_limit(e):
+                    time.sleep(min(self.max_backoff, self.base_backoff * 2 ** attempt) * random.uniform(1.0, 1.5))
+
+    def call(self, func: Callable, prompt_tokens: int, max_tokens: Optional[int] = None, max_retries: int = 6,
+             priority: Optional[int] = None):
+        """
+        Sends a request through the scheduler, retrying rate limited and transient failures.
+        :param func: Callable without arguments sending the request.
+        :param prompt_tokens: Estimated prompt tokens of the request.
+        :param max_tokens: max_tokens of the request, if set.
+        :param max_retries: Number of retries before giving up.
+        :param priority: INTERACTIVE or BATCH, defaults to the priority set with llm_priority.
+        :return: Result of `func`.
+        """
+        tokens = self.reservation(prompt_tokens, max_tokens)
+        response = self._send(func, tokens, max_retries, priority)
+        self.release(tokens, usage=response.get('usage') if isinstance(response, dict) else None)
+        return response
+
+    def stream(self, func: Callable, prompt_tokens: int, max_tokens: Optional[int] = None, max_retries: int = 6,
+               priority: Optional[int] = None) -> Iterator:
+        """
+        Like call, for a request returning an iterator of chunks. The slot is held until the last chunk has
+        arrived, and only the opening of the stream is retried.
+        :param func: Callable without arguments opening the stream.
+        :param prompt_tokens: Estimated prompt tokens of the request.
+        :param max_tokens: max_tokens of the request, if set.
+        :param max_retries: Number of retries before giving up.
+        :param priority: INTERACTIVE or BATCH, defaults to the priority set with llm_priority.
+        :return: Iterator of chunks.
+        """
+        tokens = self.reservation(prompt_tokens, max_tokens)
+        chunks = self._send(func, tokens, max_retries, priority)
+        try:
+            yield from chunks
+        except BaseException as e:
+            self.release(tokens, error=e)
+            raise
+        self.release(tokens)
+
+    def stats(self) -> Dict:
+        """
+        :return: Dict with the current concurrency limit, requests in flight and waiting, and counters.
+        """
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'waiting': len(self._waiting),
+                'completed': self.completed,
+                'rate_limited': self.rate_limited,
+            }
+
+
+scheduler = LLMScheduler()
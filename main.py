@@ -1,78 +1,22 @@
 import streamlit as st
-from typing import List, Dict
-import PyPDF2
 import base64
-import matplotlib.pyplot as plt
-from langchain.chains import ConversationChain
-from langchain.chat_models import ChatOpenAI
-from langchain.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
-from langchain.chains.conversation.memory import ConversationBufferMemory
 from dotenv import load_dotenv
+from charts import create_chart
+from llm_clients import get_llm, preload
+from experience_scoring import EXPERIENCE_CRITERIA, score_experience
+from models import CriteriaSuggestions, EducationList, Recommendation, RecommendationList, Sections
+from output_repair import repairing_parser
+from pdf_reader import extract_pdf
+from pipeline import Stage, run_stages
+from sections import FEEDBACK_BUDGET, FEEDBACK_SECTIONS, relevant_text, segment_resume
+from streaming import StreamRenderer, TokenStream
 
 load_dotenv()
 
 
-class PersonalDetails(BaseModel):
-    name: str = Field(description="Name of the person")
-    email: str = Field(description="Email id of the person")
-    contact_num: str = Field(description="Phone Number of the person")
-
-
-class Sections(BaseModel):
-    personal_details: PersonalDetails = Field(description="Personal Details ")
-    education: str = Field(description="Education section")
-    experience: str = Field(description="Experience section")
-
-
-class Education(BaseModel):
-    text: str = Field(description="Education section and details")
-
-
-class EducationList(BaseModel):
-    educationList: List[Education] = Field(description="List of education")
-
-
-class Projects(BaseModel):
-    projectname: str = Field(description="Title of the project")
-    description: str = Field(description="Description of the project")
-
-
-class ProjectsList(BaseModel):
-    projects: List[Projects] = Field(description="List of projects")
-
-
-class accTasks(BaseModel):
-    workDone: str = Field(description="Work accomplished or tasks done at the job.")
-
-
-class Experience(BaseModel):
-    companyName: str = Field(description="Name of the company")
-    duration: str = Field(description="Duration of the internship/job.")
-    jobRole: str = Field(description="Name of the role.")
-    tasksList: List[accTasks] = Field(description="Tasks or work done at the company.")
-
-
-class ExperiencesList(BaseModel):
-    experiences: List[Experience] = Field(description="List of the experiences")
-
-
-class Recommendation(BaseModel):
-    score: int = Field(description="Score given under the criteria")
-    suggestion: str = Field(description="Suggestion for improvement on the given criteria.")
-
-
-class RecommendationList(BaseModel):
-    recommendationsList: List[Recommendation] = Field(description="List of recommendation given under each criteria")
-
-
-class ExperienceEvaluation(BaseModel):
-    experience: List[Experience] = Field(description="Details about the job/intern at a company")
-    suggestionList: List[Recommendation] = Field(description="List of recommendation for the given experience.")
-
-
-# Defining LLM
-llm = ChatOpenAI(model = "gpt-4")
+# Model of every prompt. The client is created on first use (see llm_clients.get_llm), so importing this
+# module does not load langchain.
+MODEL = "gpt-4"
 
 
 def extract_section(resume: str):
@@ -81,7 +25,8 @@ def extract_section(resume: str):
     :param resume:
     :return:
     """
-    parser = PydanticOutputParser(pydantic_object=Sections)
+    llm = get_llm(MODEL)
+    parser = repairing_parser(Sections)
     format_instructions = parser.get_format_instructions()
     section_text = llm.predict(
         f"Given a resume {resume} \n Extract the section from the resume. \n {format_instructions}")
@@ -95,7 +40,8 @@ def analyse_education_section(text: str):
     :param text: Resume Text
     :return:
     """
-    parser = PydanticOutputParser(pydantic_object=EducationList)
+    llm = get_llm(MODEL)
+    parser = repairing_parser(EducationList)
     format_instructions = parser.get_format_instructions()
     output_education_section = llm.predict(
         f"Given an education section from a resume: {text}. \n Extract the degrees and colleges from where the user "
@@ -104,53 +50,42 @@ def analyse_education_section(text: str):
     return listofEducation
 
 
-def analyse_experience_section(experience: str):
+def analyse_experience_section(experience: str, experience_scores: RecommendationList = None):
     """
-    Analyses and recommends suggestions for experience section.
-    :param experience:
-    :return:
+    Analyses and recommends suggestions for experience section. The criteria are scored locally, the LLM is only
+    asked for the free-text suggestions.
+    :param experience: Experience section text.
+    :param experience_scores: Scores from score_experience, computed when not given.
+    :return: RecommendationList
     """
-    parser = PydanticOutputParser(pydantic_object=RecommendationList)
+    experience_scores = experience_scores or score_experience(experience)
+    findings = "\n".join(
+        f"    Criteria {i} - {name}: scored {recommendation.score}/10. {recommendation.suggestion}"
+        for i, (name, recommendation) in enumerate(zip(EXPERIENCE_CRITERIA, experience_scores.recommendationsList),
+                                                   start=1))
+    parser = repairing_parser(CriteriaSuggestions)
     format_instructions = parser.get_format_instructions()
     prompt_template = f"""Given is a experience profile of a person. 
-    {experience} Based on the criteria below. First score the resume for each given criteria out of 10 and then suggest 
-    improvements to the resume based on the criteria. 
+    {experience} It has already been scored on the criteria below. Suggest improvements to the resume for each 
+    criteria, in the same order. 
     Important Instruction: 
     1. Be specific about teach suggestion. 
     2. Suggestion should be according to the given experience. 
     
-    Criteria 1 - Quantification evidence of impact 
- 
-    Criteria 2 - Less repetition and Unique Action Word.
-    
-    Criteria 3 - Weak Action Verbs
-    
-    Criteria 4 - Avoided Responsibility-oriented Words
- 
-    Criteria 5 - Buzzwords & Clichés
+{findings}
  
     \n
     {format_instructions}
     """
 
-    evaluated_output = llm.predict(prompt_template)
-    structured_output = parser.parse(evaluated_output)
-    return structured_output
-
-
-def read_pdf(file):
-    """
-    Reads a resume in PDF file and extract text from it.
-    :param file: File object
-    :return: String
-    """
-    reader = PyPDF2.PdfReader(file)
-    num_pages = len(reader.pages)
-    text = ""
-    for i in range(num_pages):
-        page = reader.pages[i]
-        text += page.extract_text()
-    return text
+    evaluated_output = get_llm(MODEL).predict(prompt_template)
+    suggestions = parser.parse(evaluated_output).suggestions
+    return RecommendationList(recommendationsList=[
+        # Keep the local finding for any criteria the LLM skipped.
+        Recommendation(score=recommendation.score,
+                       suggestion=suggestions[i] if i < len(suggestions) else recommendation.suggestion)
+        for i, recommendation in enumerate(experience_scores.recommendationsList)
+    ])
 
 
 def displayPDF(file):
@@ -173,32 +108,20 @@ def displayPDF(file):
     st.markdown(pdf_display, unsafe_allow_html=True)
 
 
-def create_chart(value: int):
+def description_evaluation(resume, job_description, stream=False):
     """
-    Return matplotlib.pyplot figure.
-    :param value: Intger value.
-    :return:
+    Gives markdown feedback on the resume for the job description.
+    :param resume: Resume text.
+    :param job_description: Job role.
+    :param stream: Return a TokenStream instead of waiting for the whole completion.
+    :return: String or TokenStream
     """
-    fig, ax = plt.subplots()
-
-    sizes = [10 - value, value]
-
-    # Create a pie chart
-    ax.pie(sizes, colors=['red', 'green'], startangle=90)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/10', horizontalalignment='center', verticalalignment='center')
-
-    return fig
-
-
-def description_evaluation(resume, job_description):
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume, FEEDBACK_SECTIONS, FEEDBACK_BUDGET)
     prompt_template = f'''You are an Resume Expert. Your job is to give feedback on the resume based on the provided job description.
     Be specific about the points.
     
-    Resume: {resume}
+    Resume: {resume_sections}
     
     Job Description: {job_description}
     
@@ -218,10 +141,77 @@ def description_evaluation(resume, job_description):
     ONLY QUOTE THE INFORMATION PROVIDED IN THE RESUME. DO NOT MAKE UP INFORMATION WHICH IS NOT EXPLICITLY PROVIDED IN RESUME.
     RETURN THE RESPONSE IN MARKDOWN FORMAT IN BULLET POINTS.
     '''
+    llm = get_llm(MODEL)
+    if stream:
+        return TokenStream(llm, prompt_template)
     output = llm.predict(prompt_template)
     return output
 
 
+def render_sections(container, resume_sections):
+    """
+    Renders the personal details, education and experience sections.
+    :param container: Streamlit placeholder to draw into.
+    :param resume_sections: Sections returned by extract_section.
+    :return: None
+    """
+    details = resume_sections.personal_details
+    with container.container():
+        st.markdown(f"""
+        ### Name - {details.name}
+        ### Phone Number - {details.contact_num}
+        ### Email Address - {details.email}
+        """)
+        section1, section2 = st.columns(2)
+        section1.markdown(f"""# Education \n{resume_sections.education}""")
+        section2.markdown(f"""# Experience \n{resume_sections.experience}""")
+
+
+def render_experience_scores(columns, experience_scores):
+    """
+    Renders the score of each experience criteria with its local finding.
+    :param columns: The five analysis columns.
+    :param experience_scores: RecommendationList returned by score_experience.
+    :return: One placeholder per criteria holding its suggestion.
+    """
+    headers = [
+        "### Quantification evidence of impace\n\n\n",
+        "### Less repetition and Unique Action Word.\n\n\n",
+        "### Weak Action Verbs\n\n\n\n",
+        "### Avoided Responsibility-oriented Words\n\n\n\n",
+        "### Buzzwords & Clichés\n\n\n\n\n",
+    ]
+    suggestions = []
+    for column, header, recommendation in zip(columns, headers, experience_scores.recommendationsList):
+        column.markdown(header)
+        column.image(create_chart(recommendation.score))
+        suggestion = column.empty()
+        suggestion.markdown(recommendation.suggestion)
+        suggestions.append(suggestion)
+    return suggestions
+
+
+def analysis_stages(resume, job_description):
+    """
+    Builds the pipeline of one analysis. The experience scores are computed locally from the experience section
+    found by segment_resume (the whole resume when it has none), so they are drawn right away, and the job
+    description feedback only needs the raw resume; both run while the sections are extracted. The LLM then
+    writes the suggestions that replace the local findings.
+    :param resume: Resume text.
+    :param job_description: Job role.
+    :return: List of Stage
+    """
+    return [
+        Stage("resume_sections", lambda: extract_section(resume)),
+        Stage("experience_scores", lambda: score_experience(segment_resume(resume).get('experience') or resume)),
+        Stage("experience_evaluation",
+              lambda resume_sections, experience_scores: analyse_experience_section(resume_sections.experience,
+                                                                                    experience_scores),
+              depends_on=("resume_sections", "experience_scores")),
+        Stage("feedback_jobdesc", lambda: description_evaluation(resume, job_description, stream=True)),
+    ]
+
+
 def main():
     st.set_page_config(layout="wide")
     st.title("Welcome to Resumoid 🤖")
@@ -233,58 +223,36 @@ def main():
     job_description = st.text_input("Enter the role for which you are applying")
 
     submit = st.button("Submit")
+    preload()
 
     if resume_pdf and job_description and submit:
         displayPDF(resume_pdf)
         st.divider()
-        resume = read_pdf(resume_pdf)
-        resume_sections = extract_section(resume)
-        details = resume_sections.personal_details
-        education = resume_sections.education
-        experience = resume_sections.experience
-        experience_evaluation = analyse_experience_section(experience)
-        st.markdown(f"""
-        ### Name - {details.name}
-        ### Phone Number - {details.contact_num}
-        ### Email Address - {details.email}
-        """)
-        section1, section2 = st.columns(2)
-        section1.markdown(f"""# Education \n{education}""")
-        section2.markdown(f"""# Experience \n{experience}""")
+        resume = extract_pdf(resume_pdf)['text']
+        sections_placeholder = st.empty()
 
         st.divider()
         st.markdown("## Detailed Analysis")
-
-        col1, col2, col3, col4, col5 = st.columns(5)
-        # Column 1
-        col1.markdown("### Quantification evidence of impace\n\n\n")
-        col1.pyplot(create_chart(experience_evaluation.recommendationsList[0].score))
-        col1.markdown(experience_evaluation.recommendationsList[0].suggestion)
-
-        # Column 2
-        col2.markdown("### Less repetition and Unique Action Word.\n\n\n")
-        col2.pyplot(create_chart(experience_evaluation.recommendationsList[1].score))
-        col2.markdown(experience_evaluation.recommendationsList[1].suggestion)
-
-        # Column 3
-        col3.markdown("### Weak Action Verbs\n\n\n\n")
-        col3.pyplot(create_chart(experience_evaluation.recommendationsList[2].score))
-        col3.markdown(experience_evaluation.recommendationsList[2].suggestion)
-
-        # Column 4
-        col4.markdown("### Avoided Responsibility-oriented Words\n\n\n\n")
-        col4.pyplot(create_chart(experience_evaluation.recommendationsList[3].score))
-        col4.markdown(experience_evaluation.recommendationsList[3].suggestion)
-
-        # Column 5
-        col5.markdown("### Buzzwords & Clichés\n\n\n\n\n")
-        col5.pyplot(create_chart(experience_evaluation.recommendationsList[4].score))
-        col5.markdown(experience_evaluation.recommendationsList[4].suggestion)
+        analysis_columns = st.columns(5)
 
         st.divider()
         st.markdown("## Feedback on the resume based on job description!")
-        feedback_jobdesc = description_evaluation(resume, job_description)
-        st.markdown(feedback_jobdesc)
+        feedback_placeholder = st.empty()
+
+        suggestion_placeholders = []
+        # The feedback streams in while the other stages are still drawn as they finish.
+        renderer = StreamRenderer()
+        for name, result in run_stages(analysis_stages(resume, job_description), on_idle=renderer.refresh):
+            if name == "resume_sections":
+                render_sections(sections_placeholder, result)
+            elif name == "experience_scores":
+                suggestion_placeholders = render_experience_scores(analysis_columns, result)
+            elif name == "experience_evaluation":
+                for placeholder, recommendation in zip(suggestion_placeholders, result.recommendationsList):
+                    placeholder.markdown(recommendation.suggestion)
+            elif name == "feedback_jobdesc":
+                renderer.add(feedback_placeholder, result)
+        renderer.finish()
 
     with st.sidebar:
         if resume_pdf and job_description:
@@ -1,48 +1,92 @@
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Type
+
 from pydantic import BaseModel, Field
 
+from lazy_imports import load
+
+
 class PersonalDetails(BaseModel):
     name: str = Field(description="Name of the person")
     email: str = Field(description="Email id of the person")
     contact_num: str = Field(description="Phone Number of the person")
 
 
-class Sections(BaseModel):
-    personal_details: PersonalDetails = Field(description="Personal Details ")
-    education: str = Field(description="Education section")
-    experience: str = Field(description="Experience section")
-
+# Structured resume extracted in one call (version2.py, check.py, enh.py and batch.py).
 
 class Education(BaseModel):
-    text: str = Field(description="Education section and details")
-
-
-class EducationList(BaseModel):
-    educationList: List[Education] = Field(description="List of education")
+    university: str = Field(description="Name of the university")
+    degree: str = Field(description="Degree obtained")
+    year_of_passing: Optional[str] = Field(description="Year of passing")
+    field_of_study: Optional[str] = Field(description="Field of study")
+    grade: Optional[str] = Field(description="Grade obtained")
 
 
-class Projects(BaseModel):
-    projectname: str = Field(description="Title of the project")
+class Project(BaseModel):
+    project_name: str = Field(description="Title of the project")
     description: str = Field(description="Description of the project")
 
 
-class ProjectsList(BaseModel):
-    projects: List[Projects] = Field(description="List of projects")
+class Skill(BaseModel):
+    skill_name: str = Field(description="Name of the skill")
+    proficiency_level: Optional[str] = Field(description="Proficiency level of the skill")
 
 
-class accTasks(BaseModel):
-    workDone: str = Field(description="Work accomplished or tasks done at the job.")
+class WorkTask(BaseModel):
+    task: str = Field(description="Task performed at the job")
 
 
 class Experience(BaseModel):
-    companyName: str = Field(description="Name of the company")
-    duration: str = Field(description="Duration of the internship/job.")
-    jobRole: str = Field(description="Name of the role.")
-    tasksList: List[accTasks] = Field(description="Tasks or work done at the company.")
+    company_name: str = Field(description="Name of the company")
+    job_role: str = Field(description="Job role at the company")
+    duration: str = Field(description="Duration of the job")
+    tasks: List[WorkTask] = Field(description="List of tasks performed at the job")
+
+
+class Resume(BaseModel):
+    personal_details: PersonalDetails
+    education: List[Education]
+    experience: List[Experience]
+    skills: List[Skill]
+    projects: List[Project]
+
+
+class ResumeScores(BaseModel):
+    experience_score: int = Field(..., ge=1, le=10, description="Score of the Relevant Experience, from 1 to 10")
+    experience_feedback: str = Field(description="Feedback on the Relevant Experience")
+    education_score: int = Field(..., ge=1, le=10, description="Score of the Education, from 1 to 10")
+    education_feedback: str = Field(description="Feedback on the Education")
+    skills_score: int = Field(..., ge=1, le=10, description="Score of the Skills, from 1 to 10")
+    skills_feedback: str = Field(description="Feedback on the Skills")
+    projects_score: int = Field(..., ge=1, le=10, description="Score of the Projects, from 1 to 10")
+    projects_feedback: str = Field(description="Feedback on the Projects")
+    overall_score: int = Field(..., ge=1, le=10, description="Overall score of the resume, from 1 to 10")
+    overall_feedback: str = Field(description="Feedback on the overall resume")
 
 
-class ExperiencesList(BaseModel):
-    experiences: List[Experience] = Field(description="List of the experiences")
+class Suggestion(BaseModel):
+    original_task: List = Field(description="List of original work task mentioned in experience.")
+    reframed: List = Field(description="List of corresponding reframed work task")
+
+
+class SuggestionList(BaseModel):
+    suggestionList: List[Suggestion]
+
+
+# Resume sections kept as text and the experience criteria (main.py).
+
+class Sections(BaseModel):
+    personal_details: PersonalDetails = Field(description="Personal Details ")
+    education: str = Field(description="Education section")
+    experience: str = Field(description="Experience section")
+
+
+class EducationText(BaseModel):
+    text: str = Field(description="Education section and details")
+
+
+class EducationList(BaseModel):
+    educationList: List[EducationText] = Field(description="List of education")
 
 
 class Recommendation(BaseModel):
@@ -54,6 +98,54 @@ class RecommendationList(BaseModel):
     recommendationsList: List[Recommendation] = Field(description="List of recommendation given under each criteria")
 
 
-class ExperienceEvaluation(BaseModel):
-    experience: List[Experience] = Field(description="Details about the job/intern at a company")
-    suggestionList: List[Recommendation] = Field(description="List of recommendation for the given experience.")
\ No newline at end of file
+class CriteriaSuggestions(BaseModel):
+    suggestions: List[str] = Field(description="One suggestion for each criteria, in the order of the criteria")
+
+
+@lru_cache(maxsize=None)
+def format_instructions(schema: Type[BaseModel]) -> str:
+    """
+    Returns the instructions asking the LLM for JSON matching a model. They only depend on the model, so they are
+    built once per model and process, on first use; building them at import would load langchain with the apps.
+    :param schema: Pydantic model.
+    :return: String
+    """
+    parser = load('langchain.output_parsers').PydanticOutputParser(pydantic_object=schema)
+    return parser.get_format_instructions()
+
+
+class ScoredResume(NamedTuple):
+    """
+    One row of a batch run: the candidate details and the ResumeScores fields. A plain tuple instead of the
+    pydantic models, so runs over thousands of resumes keep their results in a fraction of the memory.
+    """
+    file: str
+    role: str
+    extractor: str
+    name: str
+    email: str
+    contact_num: str
+    experience_score: int
+    experience_feedback: str
+    education_score: int
+    education_feedback: str
+    skills_score: int
+    skills_feedback: str
+    projects_score: int
+    projects_feedback: str
+    overall_score: int
+    overall_feedback: str
+
+    @classmethod
+    def from_models(cls, file: str, role: str, extractor: str, details: PersonalDetails,
+                    scores: ResumeScores) -> 'ScoredResume':
+        return cls(file, role, extractor, details.name, details.email, details.contact_num, **scores.dict())
+
+    @classmethod
+    def from_dict(cls, record: dict) -> 'ScoredResume':
+        """
+        Builds a row from a record written by `_asdict`, e.g. a checkpoint line. Unknown keys are ignored.
+        :param record: Dict
+        :return: ScoredResume
+        """
+        return cls(**{field: record.get(field) for field in cls._fields})
@@ -0,0 +1,204 @@
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from lazy_imports import load
+from models import format_instructions
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# How each parse ended, per schema: parsed as is, parsed after the local repairs, read from score lines, fixed by
+# the LLM fallback, or failed.
+DIRECT = 'direct'
+REPAIRED = 'repaired'
+LINES = 'lines'
+LLM_FALLBACK = 'llm_fallback'
+FAILED = 'failed'
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+# A double quoted JSON string. The repairs below match it first and keep it as is, so they never touch the text of
+# a value ("the candidate's work, None of it ...").
+_STRING = r'"(?:[^"\\]|\\.)*"'
+_DOUBLE_QUOTED_KEY = re.compile(_STRING + r"\s*:")
+_TRAILING_COMMA = re.compile(_STRING + r"|,\s*([}\]])")
+_SINGLE_QUOTED = re.compile(r"(?<=[{\[,:])(\s*)'((?:[^'\\]|\\.)*)'(?=\s*[:,}\]])")
+_PYTHON_LITERAL = re.compile(_STRING + r"|(?<=[:\[,])(\s*)(True|False|None)\b")
+_JSON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+# "Relevant Experience: 7, Feedback: ..." lines the free text scoring prompts ask for.
+_SCORE_LINE = re.compile(
+    r"^[\s*#\-\d.]*(relevant experience|experience|education|skills|projects|overall score|overall)\s*\**\s*:"
+    r"\s*\{?\s*(\d+)\s*(?:/\s*10)?\s*\}?\s*,?\s*feedback\s*:\s*(.+?)\s*$", re.I | re.M)
+_SCORE_FIELDS = {
+    'relevant experience': 'experience', 'experience': 'experience', 'education': 'education',
+    'skills': 'skills', 'projects': 'projects', 'overall score': 'overall', 'overall': 'overall',
+}
+
+
+def _record(schema: str, outcome: str):
+    with _metrics_lock:
+        _metrics[(schema, outcome)] += 1
+
+
+def parse_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns how often each schema was parsed directly, repaired locally, read from score lines, sent to the LLM
+    fallback or failed.
+    :return: Dict of schema name to outcome counts.
+    """
+    with _metrics_lock:
+        stats = {}
+        for (schema, outcome), count in _metrics.items():
+            stats.setdefault(schema, {})[outcome] = count
+        return stats
+
+
+def _json_literal(match) -> str:
+    if match.group(2) is None:
+        return match.group(0)
+    return match.group(1) + _JSON_LITERALS[match.group(2)]
+
+
+def repair_json(text: str) -> str:
+    """
+    Fixes the usual format slips of LLM JSON: code fences, prose around the object, single quoted strings,
+    Python literals and trailing commas. Valid JSON is returned as is, and single quotes are only read as string
+    delimiters when no key is double quoted, since they are apostrophes otherwise.
+    :param text: LLM output.
+    :return: String, not guaranteed to be valid JSON.
+    """
+    fence = _FENCE.search(text)
+    if fence:
+        text = fence.group(1)
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if starts:
+        start = min(starts)
+        end = text.rfind('}' if text[start] == '{' else ']')
+        if end > start:
+            text = text[start:end + 1]
+    try:
+        json.loads(text)
+        return text
+    except ValueError:
+        pass
+    if not _DOUBLE_QUOTED_KEY.search(text):
+        text = _SINGLE_QUOTED.sub(lambda m: m.group(1) + json.dumps(m.group(2).replace("\\'", "'")), text)
+    text = _PYTHON_LITERAL.sub(_json_literal, text)
+    return _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(0), text)
+
+
+def parse_score_lines(text: str) -> Optional[Dict]:
+    """
+    Reads the "Category: score, Feedback: text" lines of the free text scoring prompts into ResumeScores fields.
+    :param text: LLM output.
+    :return: Dict of ResumeScores fields, or None unless all five categories were found.
+    """
+    fields = {}
+    for label, score, feedback in _SCORE_LINE.findall(text):
+        name = _SCORE_FIELDS[label.lower()]
+        fields.setdefault(f"{name}_score", min(max(int(score), 1), 10))
+        fields.setdefault(f"{name}_feedback", feedback.strip().strip('{}').strip())
+    return fields if len(fields) == 10 else None
+
+
+class RepairingParser:
+    """
+    Parses LLM output into a pydantic model, trying cheap local fixes before the OutputFixingParser round-trip:
+    the output as is, then repair_json, then the schema specific fallbacks (e.g. parse_score_lines). Only when
+    all of them fail is the LLM asked to fix the output. Every outcome is counted, see parse_stats. langchain is
+    imported when the first parser is built, not with this module.
+    """
+
+    def __init__(self, pydantic_object: Type[BaseModel], llm=None,
+                 fallbacks: Optional[List[Callable[[str], Optional[Dict]]]] = None):
+        PydanticOutputParser = load('langchain.output_parsers').PydanticOutputParser
+
+        self.pydantic_object = pydantic_object
+        self.parser = PydanticOutputParser(pydantic_object=pydantic_object)
+        self.llm = llm
+        self.fallbacks = fallbacks or []
+        self._fixing_parser = None
+
+    def get_format_instructions(self) -> str:
+        return format_instructions(self.pydantic_object)
+
+    def _local(self, text: str):
+        OutputParserException = load('langchain.schema').OutputParserException
+
+        try:
+            return DIRECT, self.parser.parse(text)
+        except OutputParserException:
+            pass
+        try:
+            return REPAIRED, self.pydantic_object.parse_obj(json.loads(repair_json(text)))
+        except (ValueError, ValidationError):
+            pass
+        for fallback in self.fallbacks:
+            fields = fallback(text)
+            if fields is not None:
+                try:
+                    return LINES, self.pydantic_object.parse_obj(fields)
+                except ValidationError:
+                    continue
+        return None, None
+
+    def parse(self, text: str):
+        """
+        :param text: LLM output.
+        :return: Instance of the pydantic model.
+        """
+        schema = self.pydantic_object.__name__
+        with span("parse", schema=schema) as current:
+            outcome, result = self._local(text)
+            if outcome is None:
+                outcome, result = self._fix(schema, text)
+            current.set_attribute('outcome', outcome)
+            _record(schema, outcome)
+            return result
+
+    def _fix(self, schema: str, text: str):
+        OutputFixingParser = load('langchain.output_parsers').OutputFixingParser
+        OutputParserException = load('langchain.schema').OutputParserException
+
+        if self.llm is None:
+            _record(schema, FAILED)
+            raise OutputParserException(f"Could not parse {schema} from the LLM output", llm_output=text)
+
+        logger.info("Local repair of %s failed, asking the LLM to fix the output", schema)
+        if self._fixing_parser is None:
+            self._fixing_parser = OutputFixingParser.from_llm(parser=self.parser, llm=self.llm)
+        try:
+            return LLM_FALLBACK, self._fixing_parser.parse(text)
+        except OutputParserException:
+            _record(schema, FAILED)
+            raise
+
+
+_parsers: Dict = {}
+_parsers_lock = threading.Lock()
+
+
+def repairing_parser(pydantic_object: Type[BaseModel], llm=None,
+                     fallbacks: Optional[List[Callable[[str], Optional[Dict]]]] = None) -> RepairingParser:
+    """
+    Returns the parser of a model, built once per model and fallback LLM.
+    :param pydantic_object: Pydantic model the output is parsed into.
+    :param llm: Chat model used as the last resort, None to never make the extra call.
+    :param fallbacks: Callables turning the raw output into model fields, tried after repair_json.
+    :return: RepairingParser
+    """
+    key = (pydantic_object, id(llm), tuple(fallbacks or ()))
+    with _parsers_lock:
+        parser = _parsers.get(key)
+        if parser is None:
+            parser = _parsers[key] = RepairingParser(pydantic_object, llm, fallbacks)
+        return parser
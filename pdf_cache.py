@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tracing import set_attribute
+
+# Location and limits of the parsed resume cache. Can be overridden through the environment.
+CACHE_DIR = os.getenv("RESUMOID_PDF_CACHE_DIR", os.path.join(".cache", "resumes"))
+MAX_ENTRIES = int(os.getenv("RESUMOID_PDF_CACHE_MAX_ENTRIES", "512"))
+MAX_BYTES = int(os.getenv("RESUMOID_PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def file_bytes(file) -> bytes:
+    """
+    Returns the raw bytes of an uploaded file, a file object or a path.
+    :param file: Streamlit UploadedFile, binary file object or path.
+    :return: Bytes
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            return f.read()
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    position = file.tell()
+    data = file.read()
+    file.seek(position)
+    return data
+
+
+class ParsedResumeCache:
+    """
+    On-disk cache of the text extracted from resume PDFs. Entries are addressed by the SHA-256 of the PDF bytes
+    together with the parser name and version, so re-analysing the same resume never parses it again while a
+    parser upgrade invalidates the old entries. Least recently used entries are evicted once the number of
+    entries or their total size goes over the limits.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes, parser: str, version: str) -> str:
+        """
+        Builds the cache key of a PDF.
+        :param data: PDF bytes.
+        :param parser: Name of the parser.
+        :param version: Version of the parser.
+        :return: Hex digest
+        """
+        digest = hashlib.sha256(data)
+        digest.update(f"\0{parser}\0{version}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Returns the cached entry, or None on a miss.
+        :param key: Cache key.
+        :return: Dict with `text` and `elements`.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Refresh the modification time, it is used as the LRU clock.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, text: str, elements: List[Dict]):
+        """
+        Stores the parsed text and elements of a PDF.
+        :param key: Cache key.
+        :param text: Extracted text.
+        :param elements: List of extracted elements (pages or layout elements).
+        :return: None
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'text': text, 'elements': elements}, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith('.json'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                _, size, path = entries.pop(0)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def get_or_parse(self, file, parser: str, version: str, parse: Callable[[], Tuple[str, List[Dict]]]) -> Dict:
+        """
+        Returns the cached parse of a PDF, parsing and storing it on a miss.
+        :param file: Streamlit UploadedFile, binary file object or path.
+        :param parser: Name of the parser.
+        :param version: Version of the parser.
+        :param parse: Callable returning the extracted text and elements.
+        :return: Dict with `text` and `elements`.
+        """
+        key = self.key(file_bytes(file), parser, version)
+        entry = self.get(key)
+        set_attribute('cache_hit', entry is not None)
+        if entry is None:
+            text, elements = parse()
+            self.put(key, text, elements)
+            entry = {'text': text, 'elements': elements}
+        return entry
+
+
+resume_cache = ParsedResumeCache()
@@ -0,0 +1,201 @@
+import io
+import logging
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from lazy_imports import load
+from pdf_cache import file_bytes, resume_cache
+from tracing import set_attribute, span, traced
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds on how much of a PDF is read. A resume rarely runs past a few pages, these only stop scanned
+# portfolios or very long CVs from blowing up memory and the prompt size.
+MAX_PAGES = int(os.getenv("RESUMOID_MAX_PDF_PAGES", "10"))
+MAX_CHARS = int(os.getenv("RESUMOID_MAX_PDF_CHARS", "40000"))
+
+
+def iter_pdf_pages(file) -> Iterator[Dict]:
+    """
+    Lazily extracts the text of each page with PyPDF2. Pages are only decoded when the iterator reaches them.
+    :param file: File object or path.
+    :return: Iterator of dicts with `page` and `text`.
+    """
+    reader = load('PyPDF2').PdfReader(file)
+    for i, page in enumerate(reader.pages):
+        yield {'page': i, 'text': page.extract_text()}
+
+
+def iter_unstructured_elements(file) -> Iterator[Dict]:
+    """
+    Extracts the layout elements (titles, list items, narrative text, ...) with the unstructured loader. The PDF
+    is partitioned straight from the upload bytes, so nothing is written to disk and concurrent sessions
+    uploading files with the same name cannot overwrite each other.
+    :param file: Streamlit UploadedFile, binary file object or path.
+    :return: Iterator of dicts with `page`, `text` and `category`.
+    """
+    # Only loaded when a PDF needs the fallback; langchain and unstructured are slow to import.
+    UnstructuredFileIOLoader = load('langchain.document_loaders').UnstructuredFileIOLoader
+    loader = UnstructuredFileIOLoader(io.BytesIO(file_bytes(file)), mode='elements', content_type='application/pdf')
+    for doc in loader.load():
+        # unstructured numbers pages from 1.
+        page = doc.metadata.get('page_number', 1) - 1
+        yield {'page': page, 'text': doc.page_content, 'category': doc.metadata.get('category')}
+
+
+def collect_text(chunks: Iterable[Dict], max_pages: Optional[int] = MAX_PAGES,
+                 max_chars: Optional[int] = MAX_CHARS, separator: str = "\n") -> Tuple[str, List[Dict]]:
+    """
+    Consumes text chunks until the page or character budget is reached and joins them once.
+    :param chunks: Iterable of dicts with `page` and `text`, e.g. from iter_pdf_pages.
+    :param max_pages: Stop before the first chunk past this many pages. None for no limit.
+    :param max_chars: Stop once this many characters were collected, cutting the last chunk. None for no limit.
+    :param separator: String placed between chunks.
+    :return: The joined text and the chunks that were kept.
+    """
+    kept = []
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if max_pages is not None and chunk['page'] >= max_pages:
+            break
+        text = chunk['text'] or ""
+        if max_chars is not None and size + len(text) > max_chars:
+            text = text[:max(max_chars - size, 0)]
+            if text:
+                parts.append(text)
+                kept.append({**chunk, 'text': text})
+            break
+        parts.append(text)
+        kept.append(chunk)
+        size += len(text) + len(separator)
+    return separator.join(parts), kept
+
+
+def _pypdf2_version():
+    return load('PyPDF2').__version__
+
+
+def _unstructured_version():
+    try:
+        return load('unstructured.__version__').__version__
+    except ImportError:
+        return 'unknown'
+
+
+class Extractor(NamedTuple):
+    """
+    A PDF text extraction backend.
+    :param name: Name of the backend, also used in the parse cache key.
+    :param iter_chunks: Callable taking the file and yielding dicts with `page` and `text`.
+    :param version: Callable returning the backend version, used in the parse cache key.
+    """
+    name: str
+    iter_chunks: Callable[[object], Iterator[Dict]]
+    version: Callable[[], str]
+
+
+# Registered backends, tried in registration order: cheapest first.
+EXTRACTORS: Dict[str, Extractor] = {}
+
+# Text quality thresholds below which the next backend is tried.
+MIN_CHARS_PER_PAGE = int(os.getenv("RESUMOID_MIN_CHARS_PER_PAGE", "200"))
+MIN_ALPHA_RATIO = 0.6
+MAX_GARBLED_RATIO = 0.02
+
+
+def register_extractor(name: str, iter_chunks: Callable[[object], Iterator[Dict]], version: Callable[[], str]):
+    """
+    Registers a PDF extraction backend after the existing ones.
+    :param name: Name of the backend.
+    :param iter_chunks: Callable taking the file and yielding dicts with `page` and `text`.
+    :param version: Callable returning the backend version.
+    :return: None
+    """
+    EXTRACTORS[name] = Extractor(name, iter_chunks, version)
+
+
+def text_quality_ok(text: str, elements: List[Dict]) -> bool:
+    """
+    Heuristically checks whether a text layer is usable: enough characters per page (scanned PDFs have next to
+    none) and no sign of a broken font encoding ("(cid:12)" sequences, replacement characters, mostly symbols).
+    :param text: Extracted text.
+    :param elements: Extracted pages or elements.
+    :return: Boolean
+    """
+    pages = len({element['page'] for element in elements}) or 1
+    visible = [c for c in text if not c.isspace()]
+    if len(visible) < MIN_CHARS_PER_PAGE * pages:
+        return False
+    garbled = text.count('\ufffd') + text.count('(cid:') * 6
+    if garbled / len(visible) > MAX_GARBLED_RATIO:
+        return False
+    return sum(c.isalnum() for c in visible) / len(visible) >= MIN_ALPHA_RATIO
+
+
+@traced("extract_pdf")
+def extract_pdf(file, max_pages: Optional[int] = MAX_PAGES, max_chars: Optional[int] = MAX_CHARS,
+                backends: Optional[List[str]] = None) -> Dict:
+    """
+    Extracts the text of a PDF with the cheapest backend whose output passes text_quality_ok, falling back to the
+    heavier ones otherwise. Every backend's output is cached, so repeated calls stay cheap.
+    :param file: Streamlit UploadedFile, binary file object or path.
+    :param max_pages: Maximum number of pages read.
+    :param max_chars: Maximum number of characters returned.
+    :param backends: Names of the backends to try, defaults to all registered ones.
+    :return: Dict with `text`, `elements` and the `backend` that served it.
+    """
+    best = None
+    error = None
+    for name in backends or list(EXTRACTORS):
+        extractor = EXTRACTORS[name]
+        try:
+            with span(f"pdf {extractor.name}"):
+                entry = resume_cache.get_or_parse(
+                    file, extractor.name, f"{extractor.version()}:{max_pages}:{max_chars}",
+                    lambda: collect_text(extractor.iter_chunks(file), max_pages, max_chars))
+        except Exception as e:
+            logger.warning("PDF extractor %s failed: %s", extractor.name, e)
+            error = e
+            continue
+        entry = {**entry, 'backend': extractor.name}
+        if text_quality_ok(entry['text'], entry['elements']):
+            best = entry
+            break
+        if best is None or len(entry['text'].strip()) > len(best['text'].strip()):
+            best = entry
+
+    if best is None:
+        raise error
+    set_attribute('backend', best['backend'])
+    set_attribute('chars', len(best['text']))
+    logger.info("Extracted %s with %s (%d characters)", getattr(file, 'name', file), best['backend'],
+                len(best['text']))
+    return best
+
+
+def read_pdf(file, max_pages: Optional[int] = MAX_PAGES, max_chars: Optional[int] = MAX_CHARS):
+    """
+    Reads a resume in PDF file and extract text from it. Parsed resumes are cached by content hash.
+    :param file: File object
+    :param max_pages: Maximum number of pages read.
+    :param max_chars: Maximum number of characters returned.
+    :return: String
+    """
+    return extract_pdf(file, max_pages, max_chars, backends=['pypdf2'])['text']
+
+
+def read_pdf_unstructured(file, max_pages: Optional[int] = MAX_PAGES, max_chars: Optional[int] = MAX_CHARS):
+    """
+    Reads a resume in PDF file using the unstructured element partitioning. Parsed resumes are cached by
+    content hash, so the slow partitioning only runs once per distinct PDF.
+    :param file: File object
+    :param max_pages: Maximum number of pages read.
+    :param max_chars: Maximum number of characters returned.
+    :return: String
+    """
+    return extract_pdf(file, max_pages, max_chars, backends=['unstructured'])['text']
+
+
+register_extractor('pypdf2', iter_pdf_pages, _pypdf2_version)
+register_extractor('unstructured', iter_unstructured_elements, _unstructured_version)
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextvars import copy_context
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from tracing import span
+
+
+class Stage(NamedTuple):
+    """
+    A single step of the analysis pipeline.
+    :param name: Name under which the result is reported.
+    :param func: Callable invoked with the results of `depends_on` as keyword arguments.
+    :param depends_on: Names of the stages whose results this stage needs.
+    """
+    name: str
+    func: Callable
+    depends_on: Tuple[str, ...] = ()
+
+
+def _run_stage(stage: Stage, kwargs: Dict):
+    with span(f"stage {stage.name}"):
+        return stage.func(**kwargs)
+
+
+def run_stages(stages: List[Stage], max_workers: int = None, on_idle: Optional[Callable[[], None]] = None,
+               idle_interval: float = 0.05) -> Iterator[Tuple[str, object]]:
+    """
+    Runs the stages on a thread pool. Every stage starts as soon as the stages it depends on have finished, so
+    independent LLM calls overlap and the total latency is close to the slowest chain instead of the sum.
+    Results are yielded on the calling thread in completion order, which keeps Streamlit rendering on the
+    script thread. Each stage runs in a span, in a copy of the caller's context, so context variables such as
+    the LLM priority and the current trace carry over to the stage threads.
+    :param stages: Stages to run.
+    :param max_workers: Size of the thread pool. Defaults to one thread per stage.
+    :param on_idle: Called on the calling thread every `idle_interval` seconds while no stage finishes, e.g. to
+        draw token streams returned by earlier stages (see streaming.StreamRenderer).
+    :param idle_interval: Seconds between two on_idle calls.
+    :return: Iterator of (stage name, result) tuples.
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        missing = set(stage.depends_on) - names
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {', '.join(sorted(missing))}")
+
+    pending = list(stages)
+    results: Dict[str, object] = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1) as executor:
+        while pending or running:
+            for stage in [s for s in pending if all(dep in results for dep in s.depends_on)]:
+                kwargs = {dep: results[dep] for dep in stage.depends_on}
+                running[executor.submit(copy_context().run, _run_stage, stage, kwargs)] = stage.name
+                pending.remove(stage)
+
+            if not running:
+                raise ValueError("Stage dependencies contain a cycle: " + ", ".join(s.name for s in pending))
+
+            done, _ = wait(running, timeout=idle_interval if on_idle else None, return_when=FIRST_COMPLETED)
+            if not done:
+                on_idle()
+            for future in done:
+                name = running.pop(future)
+                # Re-raises the exception of a failed stage on the calling thread.
+                results[name] = future.result()
+                yield name, results[name]
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from skills import normalize_role, role_skills
+
+# Location of the persisted role profiles. Can be overridden through the environment.
+ROLE_CACHE_DIR = os.getenv("RESUMOID_ROLE_CACHE_DIR", os.path.join(".cache", "roles"))
+# Bump when the profile contents change, so older profiles are rebuilt.
+PROFILE_VERSION = "3"
+
+# Words in a job description that place the role at a seniority level, most senior first.
+SENIORITY_LEVELS = {
+    'lead': ['principal', 'staff', 'lead', 'head', 'director', 'architect'],
+    'senior': ['senior', 'sr', 'experienced', 'expert'],
+    'junior': ['junior', 'jr', 'entry level', 'entry-level', 'graduate', 'fresher', 'associate'],
+    'intern': ['intern', 'internship', 'trainee'],
+}
+_YEARS = re.compile(r'(\d+)\s*\+?\s*(?:-\s*\d+\s*)?(?:years|yrs)')
+
+
+class RoleProfile(NamedTuple):
+    role: str
+    job_description: str
+    required_skills: List[str]
+    seniority: str
+    seniority_signals: List[str]
+    min_years: Optional[int]
+    prompt_prefix: str
+
+
+def seniority_signals(job_description: str) -> Tuple[str, List[str], Optional[int]]:
+    """
+    Reads the seniority of a role from its title words and the years of experience it asks for.
+    :param job_description: Job role or description.
+    :return: Seniority level, the words it was read from and the minimum years of experience.
+    """
+    padded = f" {normalize_role(job_description)} "
+    signals = []
+    level = None
+    for name, words in SENIORITY_LEVELS.items():
+        found = [word for word in words if f" {word} " in padded]
+        signals.extend(found)
+        if found and level is None:
+            level = name
+
+    years = [int(match) for match in _YEARS.findall(job_description.lower())]
+    min_years = min(years) if years else None
+    if min_years is not None:
+        signals.append(f"{min_years}+ years")
+        if level is None:
+            level = 'senior' if min_years >= 5 else 'mid' if min_years >= 2 else 'junior'
+    return level or 'mid', signals, min_years
+
+
+def build_prompt_prefix(job_description: str, required_skills: List[str], seniority: str,
+                        signals: List[str]) -> str:
+    """
+    Builds the role part shared by every prompt for this role. It goes first in the prompts so that it is the
+    same leading text for every candidate.
+    :param job_description: Job role or description.
+    :param required_skills: Skills the role requires.
+    :param seniority: Seniority level.
+    :param signals: Words the seniority was read from.
+    :return: String
+    """
+    seniority_line = f"{seniority} ({', '.join(signals)})" if signals else seniority
+    return (f"You are an HR of a company who is hiring for the {job_description} role.\n"
+            f"ROLE PROFILE\n"
+            f"Required skills: {', '.join(required_skills) or 'not specified'}\n"
+            f"Seniority: {seniority_line}\n")
+
+
+def build_role_profile(job_description: str, llm=None) -> RoleProfile:
+    """
+    Derives the role profile of a job description.
+    :param job_description: Job role or description.
+    :param llm: Optional chat model used for the skills of roles the skill taxonomy does not know.
+    :return: RoleProfile
+    """
+    required_skills = list(role_skills(job_description, llm))
+    seniority, signals, min_years = seniority_signals(job_description)
+    return RoleProfile(
+        role=normalize_role(job_description),
+        job_description=job_description.strip(),
+        required_skills=required_skills,
+        seniority=seniority,
+        seniority_signals=signals,
+        min_years=min_years,
+        prompt_prefix=build_prompt_prefix(job_description.strip(), required_skills, seniority, signals),
+    )
+
+
+_profiles: Dict[str, RoleProfile] = {}
+# Guards _profiles and _role_locks only. Building a profile can take an LLM call, so it happens under the lock of
+# its role instead, and profiles of other roles are still served meanwhile.
+_lock = threading.Lock()
+_role_locks: Dict[str, threading.Lock] = {}
+
+
+def _path(role: str) -> str:
+    key = hashlib.sha256(f"{role}\0{PROFILE_VERSION}".encode()).hexdigest()
+    return os.path.join(ROLE_CACHE_DIR, key + '.json')
+
+
+def _role_lock(role: str) -> threading.Lock:
+    with _lock:
+        return _role_locks.setdefault(role, threading.Lock())
+
+
+def get_role_profile(job_description: str, llm=None) -> RoleProfile:
+    """
+    Returns the role profile of a job description, built once per normalized job description. Profiles are kept
+    in memory and persisted to disk, so every resume screened for a role, in any session, shares one profile.
+    A profile without required skills that was built without an LLM is not kept, so the next call with an LLM
+    can still ask it for the skills.
+    :param job_description: Job role or description.
+    :param llm: Optional chat model used for the skills of roles the skill taxonomy does not know.
+    :return: RoleProfile
+    """
+    role = normalize_role(job_description)
+    with _lock:
+        profile = _profiles.get(role)
+    if profile is not None:
+        return profile
+
+    with _role_lock(role):
+        with _lock:
+            profile = _profiles.get(role)
+        if profile is not None:
+            return profile
+
+        path = _path(role)
+        try:
+            with open(path, encoding='utf-8') as f:
+                profile = RoleProfile(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            profile = build_role_profile(job_description, llm)
+            if not profile.required_skills and llm is None:
+                return profile
+            os.makedirs(ROLE_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(profile._asdict(), f)
+            os.replace(tmp_path, path)
+
+        with _lock:
+            _profiles[role] = profile
+        return profile
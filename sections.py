@@ -0,0 +1,132 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable
+
+from tokens import count_tokens, truncate_tokens
+
+# Heading aliases of each resume section, matched against whole lines.
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me'],
+    'education': ['education', 'academic background', 'academics', 'academic qualifications', 'qualifications',
+                  'education and training'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'internships', 'internship', 'relevant experience'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies', 'technologies', 'tools',
+               'skills and tools', 'tech stack'],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects', 'side projects'],
+    'certifications': ['certifications', 'certificates', 'courses', 'training', 'licenses and certifications'],
+    'achievements': ['achievements', 'awards', 'honors', 'honours', 'accomplishments', 'publications'],
+}
+# Aliases that are also ordinary short lines ("Tools", "Training" under a job). They only start a section when the
+# line is set like a heading: upper case or ending with a colon.
+WEAK_HEADINGS = {'profile', 'tools', 'technologies', 'training', 'courses'}
+
+# Sections each prompt needs and the token budget of the resume part of that prompt.
+SCORING_SECTIONS = ('summary', 'experience', 'education', 'skills', 'projects')
+SCORING_BUDGET = 2000
+FEEDBACK_SECTIONS = ('summary', 'experience', 'education', 'skills', 'projects', 'certifications', 'achievements')
+FEEDBACK_BUDGET = 2500
+# Sections by how much they tell about a candidate, most first. Over budget, the last ones are cut first. The
+# header comes right after the experience: besides the contact details, it holds whatever sits under headings this
+# module does not know ("Professional Background"), which is often the work history.
+SECTION_PRIORITY = ('experience', 'header', 'skills', 'projects', 'education', 'summary', 'certifications',
+                    'achievements')
+
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_CLEANUP = re.compile(r'[^a-z& ]+')
+_SPACES = re.compile(r'[ \t\u00a0]+')
+
+
+@lru_cache(maxsize=256)
+def compress_text(text: str) -> str:
+    """
+    Drops what costs tokens without telling the model anything: runs of spaces, blank lines and repeated lines
+    (page headers and footers of multi-page PDFs).
+    :param text: Section or resume text.
+    :return: String
+    """
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = _SPACES.sub(' ', line).strip()
+        key = line.lower()
+        if not line or (key in seen and len(key) > 3):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _heading(line: str):
+    words = _HEADING_CLEANUP.sub(' ', line.lower().replace('&', ' and ')).split()
+    if not words or len(words) > 5:
+        return None
+    key = ' '.join(words)
+    if key in WEAK_HEADINGS and not (line.strip().isupper() or line.strip().endswith(':')):
+        return None
+    return _HEADING_LOOKUP.get(key)
+
+
+@lru_cache(maxsize=64)
+def segment_resume(text: str) -> Dict[str, str]:
+    """
+    Splits a resume into sections on lines that look like section headings. Everything before the first
+    recognised heading (name, contact details and any section under an unknown heading) is returned as 'header'.
+    After that, an unknown heading and its text stay in the section before it. Results are memoized, so every
+    prompt built from the same resume shares one segmentation.
+    :param text: Resume text.
+    :return: Dict of section name to section text, in resume order.
+    """
+    sections = {}
+    current = 'header'
+    lines = []
+    for line in text.splitlines():
+        section = _heading(line)
+        if section is None:
+            lines.append(line)
+            continue
+        if lines:
+            sections[current] = (sections.get(current, '') + '\n' + '\n'.join(lines)).strip()
+        current = section
+        lines = []
+    if lines:
+        sections[current] = (sections.get(current, '') + '\n' + '\n'.join(lines)).strip()
+    return sections
+
+
+def _allocate(counts: Dict[str, int], max_tokens: int) -> Dict[str, int]:
+    # Every section keeps a small share of the budget, the rest goes to the sections in priority order.
+    floor = max_tokens // (4 * len(counts))
+    allowance = {name: min(count, floor) for name, count in counts.items()}
+    remaining = max_tokens - sum(allowance.values())
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    for name in sorted(counts, key=lambda name: rank.get(name, len(rank))):
+        extra = min(counts[name] - allowance[name], remaining)
+        allowance[name] += extra
+        remaining -= extra
+    return allowance
+
+
+def relevant_text(resume: str, names: Iterable[str], max_tokens: int) -> str:
+    """
+    Builds the part of the resume a prompt needs: the header followed by the requested sections, in the given
+    order, under a token budget. Sections are compressed first; when the budget is still exceeded the least telling
+    sections (see SECTION_PRIORITY) are cut before the others. Resumes without recognisable headings fall back to
+    the whole text cut to the budget.
+    :param resume: Resume text.
+    :param names: Section names, in the order they should appear.
+    :param max_tokens: Token budget of the returned text.
+    :return: String
+    """
+    sections = segment_resume(resume)
+    chosen = [(name, compress_text(sections[name])) for name in names if sections.get(name)]
+    if not chosen:
+        return truncate_tokens(compress_text(resume), max_tokens)
+    if sections.get('header'):
+        chosen.insert(0, ('header', compress_text(sections['header'])))
+
+    counts = {name: count_tokens(text) for name, text in chosen}
+    if sum(counts.values()) > max_tokens:
+        allowance = _allocate(counts, max_tokens)
+        chosen = [(name, truncate_tokens(text, allowance[name])) for name, text in chosen]
+    return '\n\n'.join(text if name == 'header' else f"{name.upper()}\n{text}" for name, text in chosen)
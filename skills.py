@@ -0,0 +1,267 @@
+import re
+import threading
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+# Canonical skill names and the spellings they show up under in resumes and job descriptions.
+SKILL_ALIASES = {
+    'Python': ['python', 'python3'],
+    'Java': ['java'],
+    'JavaScript': ['javascript', 'js', 'es6'],
+    'TypeScript': ['typescript'],
+    'C++': ['c++', 'cpp'],
+    'C#': ['c#', 'csharp', '.net', 'dotnet'],
+    'Go': ['golang', 'go lang'],
+    'Rust': ['rust'],
+    'Kotlin': ['kotlin'],
+    'Swift': ['swift programming', 'swift language'],
+    'R': ['r programming', 'rstudio'],
+    'SQL': ['sql', 'mysql', 'postgresql', 'postgres', 'sqlite', 't-sql', 'pl/sql'],
+    'NoSQL': ['nosql', 'mongodb', 'mongo', 'cassandra', 'dynamodb', 'couchbase'],
+    'Redis': ['redis'],
+    'Spark': ['pyspark', 'apache spark', 'spark sql'],
+    'Hadoop': ['hadoop', 'hdfs', 'hive'],
+    'Kafka': ['kafka', 'apache kafka'],
+    'Airflow': ['airflow', 'apache airflow'],
+    'dbt': ['dbt'],
+    'Snowflake': ['snowflake'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'Scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'TensorFlow': ['tensorflow', 'keras', 'tensorflow lite'],
+    'PyTorch': ['pytorch', 'torch'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'Deep Learning': ['deep learning', 'neural networks', 'dl'],
+    'NLP': ['nlp', 'natural language processing', 'transformers', 'llm', 'llms'],
+    'Computer Vision': ['computer vision', 'opencv', 'object detection', 'image classification'],
+    'Statistics': ['statistics', 'statistical analysis', 'hypothesis testing', 'a/b testing', 'ab testing'],
+    'MLOps': ['mlops', 'mlflow', 'kubeflow', 'sagemaker', 'model deployment'],
+    'Tableau': ['tableau'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Excel': ['ms excel', 'microsoft excel', 'spreadsheets'],
+    'Data Visualization': ['data visualization', 'matplotlib', 'seaborn', 'plotly'],
+    'AWS': ['aws', 'amazon web services', 'ec2', 's3', 'aws lambda'],
+    'GCP': ['gcp', 'google cloud', 'bigquery'],
+    'Azure': ['azure', 'microsoft azure'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes', 'k8s', 'eks', 'gke', 'aks'],
+    'Terraform': ['terraform', 'infrastructure as code', 'iac'],
+    'CI/CD': ['ci/cd', 'cicd', 'jenkins', 'github actions', 'gitlab ci', 'circleci'],
+    'Linux': ['linux', 'unix', 'bash', 'shell scripting'],
+    'Git': ['git', 'github', 'gitlab', 'bitbucket'],
+    'REST APIs': ['rest api', 'rest apis', 'restful', 'api design'],
+    'GraphQL': ['graphql'],
+    'Microservices': ['microservices', 'microservice', 'service oriented architecture'],
+    'Spring Boot': ['spring boot', 'spring framework', 'spring mvc'],
+    'Django': ['django'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Node.js': ['node.js', 'nodejs', 'express.js', 'expressjs'],
+    'React': ['react', 'react.js', 'reactjs'],
+    'React Native': ['react native'],
+    'Angular': ['angular', 'angularjs'],
+    'Vue': ['vue', 'vue.js', 'vuejs'],
+    'HTML/CSS': ['html', 'css', 'html5', 'css3', 'sass', 'tailwind'],
+    'Android': ['android', 'android sdk', 'jetpack compose'],
+    'iOS': ['ios', 'swiftui', 'uikit', 'xcode'],
+    'System Design': ['system design', 'distributed systems', 'scalability'],
+    'Testing': ['unit testing', 'testing', 'pytest', 'junit', 'selenium', 'cypress', 'test automation'],
+    'Agile': ['agile', 'scrum', 'kanban', 'jira'],
+    'Product Management': ['product management', 'roadmap', 'roadmapping', 'product strategy'],
+    'Stakeholder Management': ['stakeholder management', 'stakeholders'],
+    'Communication': ['communication', 'public speaking'],
+    'Leadership': ['leadership', 'mentoring', 'mentored', 'team lead'],
+    'Data Modeling': ['data modeling', 'data modelling', 'dimensional modeling', 'data warehouse', 'etl', 'elt'],
+}
+
+# Skill names that are also common words ("excel at", "a swift rollout", "go live", "REST of"). In lower case they
+# only count through the qualified aliases above; spelt exactly like this they count on their own.
+CASE_SENSITIVE_ALIASES = {
+    'Excel': 'Excel',
+    'Swift': 'Swift',
+    'Go': 'Go',
+    'Spark': 'Spark',
+    'R': 'R',
+    'REST': 'REST APIs',
+    'Spring': 'Spring Boot',
+    'Express': 'Node.js',
+    'Node': 'Node.js',
+    'Lambda': 'AWS',
+    'TF': 'TensorFlow',
+    'TS': 'TypeScript',
+}
+
+# Skills expected for common roles, keyed on words that identify the role in a job description.
+ROLE_PROFILES = {
+    'data scientist': ['Python', 'SQL', 'Statistics', 'Machine Learning', 'Pandas', 'Scikit-learn',
+                       'Data Visualization', 'Deep Learning', 'Communication'],
+    'machine learning engineer': ['Python', 'Machine Learning', 'Deep Learning', 'PyTorch', 'TensorFlow', 'MLOps',
+                                  'Docker', 'Kubernetes', 'AWS', 'SQL', 'Git'],
+    'ml engineer': ['Python', 'Machine Learning', 'Deep Learning', 'PyTorch', 'TensorFlow', 'MLOps', 'Docker',
+                    'Kubernetes', 'AWS', 'SQL', 'Git'],
+    'data analyst': ['SQL', 'Excel', 'Python', 'Statistics', 'Tableau', 'Power BI', 'Data Visualization',
+                     'Communication'],
+    'data engineer': ['Python', 'SQL', 'Spark', 'Kafka', 'Airflow', 'Data Modeling', 'AWS', 'Docker', 'NoSQL'],
+    'backend': ['Java', 'Python', 'SQL', 'REST APIs', 'Microservices', 'Docker', 'Git', 'System Design', 'Redis',
+                'CI/CD'],
+    'frontend': ['JavaScript', 'TypeScript', 'React', 'HTML/CSS', 'REST APIs', 'Git', 'Testing'],
+    'full stack': ['JavaScript', 'TypeScript', 'React', 'Node.js', 'HTML/CSS', 'SQL', 'REST APIs', 'Git',
+                   'Docker'],
+    'devops': ['Linux', 'Docker', 'Kubernetes', 'Terraform', 'CI/CD', 'AWS', 'Git', 'Python'],
+    'site reliability': ['Linux', 'Docker', 'Kubernetes', 'Terraform', 'CI/CD', 'AWS', 'Python', 'System Design'],
+    'cloud': ['AWS', 'Azure', 'GCP', 'Terraform', 'Docker', 'Kubernetes', 'Linux', 'CI/CD'],
+    'android': ['Kotlin', 'Java', 'Android', 'REST APIs', 'Git', 'Testing'],
+    'ios': ['Swift', 'iOS', 'REST APIs', 'Git', 'Testing'],
+    'mobile': ['Kotlin', 'Swift', 'Android', 'iOS', 'React Native', 'REST APIs', 'Git'],
+    'qa': ['Testing', 'Python', 'Java', 'CI/CD', 'Git', 'Agile'],
+    'test': ['Testing', 'Python', 'Java', 'CI/CD', 'Git', 'Agile'],
+    'product manager': ['Product Management', 'Stakeholder Management', 'Agile', 'Communication', 'SQL',
+                        'Leadership', 'Data Visualization'],
+    'software engineer': ['Python', 'Java', 'SQL', 'Git', 'REST APIs', 'System Design', 'Testing', 'Docker',
+                          'CI/CD'],
+    'software developer': ['Python', 'Java', 'SQL', 'Git', 'REST APIs', 'System Design', 'Testing', 'Docker',
+                           'CI/CD'],
+}
+
+_TOKEN = re.compile(r"[a-z0-9+#./-]*[a-z0-9+#]")
+# Tokens with a slash that are skill names themselves (ci/cd, pl/sql, a/b). Any other slash separates skills, as in
+# "Python/Java/SQL".
+_SLASH_TOKENS = frozenset(token for skill, aliases in SKILL_ALIASES.items() for alias in [skill, *aliases]
+                          for token in _TOKEN.findall(alias.lower()) if '/' in token)
+# A case-sensitive alias standing on its own: not part of a longer name ("Go-to", "R&D", "TSX"). A slash
+# separates it from the next skill ("Swift/Kotlin").
+_CASE_SENSITIVE = re.compile(
+    r"(?<![\w+#&.-])(" + "|".join(sorted(map(re.escape, CASE_SENSITIVE_ALIASES), key=len, reverse=True))
+    + r")(?![\w+#&-])")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower cases and splits text into tokens, keeping characters that are part of skill names (c++, c#, node.js).
+    Slashes split tokens, except in the skill names that contain one.
+    :param text: Text
+    :return: List of tokens.
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if '/' in token and token not in _SLASH_TOKENS:
+            tokens.extend(_TOKEN.findall(token.replace('/', ' ')))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _build_index() -> Tuple[Dict[Tuple[str, ...], str], int]:
+    index = {}
+    for skill, aliases in SKILL_ALIASES.items():
+        for alias in [skill, *aliases]:
+            if alias in CASE_SENSITIVE_ALIASES:
+                continue
+            index[tuple(tokenize(alias))] = skill
+    return index, max(len(key) for key in index)
+
+
+_ALIAS_INDEX, _MAX_NGRAM = _build_index()
+_CASE_INSENSITIVE_NAMES = {alias.lower(): skill for alias, skill in CASE_SENSITIVE_ALIASES.items()}
+
+
+def extract_skills(text: str) -> FrozenSet[str]:
+    """
+    Finds the known skills mentioned in a text by looking up every 1 to n-gram of its tokens in the alias index,
+    plus the case-sensitive aliases spelt exactly as listed.
+    :param text: Resume or job description text.
+    :return: Canonical skill names.
+    """
+    tokens = tokenize(text)
+    found = {CASE_SENSITIVE_ALIASES[alias] for alias in _CASE_SENSITIVE.findall(text)}
+    for n in range(1, _MAX_NGRAM + 1):
+        for i in range(len(tokens) - n + 1):
+            skill = _ALIAS_INDEX.get(tuple(tokens[i:i + n]))
+            if skill:
+                found.add(skill)
+    return frozenset(found)
+
+
+def canonical_skill(name: str) -> str:
+    """
+    Maps a skill name to its canonical spelling, or returns it unchanged when it is not in the taxonomy.
+    :param name: Skill name.
+    :return: String
+    """
+    name = name.strip()
+    # A name on its own is a skill whatever its case, so the case-sensitive aliases apply in any case here.
+    return _ALIAS_INDEX.get(tuple(tokenize(name))) or _CASE_INSENSITIVE_NAMES.get(name.lower(), name)
+
+
+def normalize_role(job_description: str) -> str:
+    """
+    Normalizes a job role or description so trivially different spellings share a role profile.
+    :param job_description: Job role or description.
+    :return: String
+    """
+    return ' '.join(tokenize(job_description))
+
+
+# Skills the LLM listed for roles the taxonomy does not know, keyed on the normalized role only: the chat model
+# objects are not hashable, and the answer does not depend on which client asked.
+_llm_skills: Dict[str, Tuple[str, ...]] = {}
+_llm_skills_lock = threading.Lock()
+
+
+def _llm_role_skills(role: str, llm) -> Tuple[str, ...]:
+    with _llm_skills_lock:
+        skills = _llm_skills.get(role)
+    if skills is not None:
+        return skills
+    # Asked outside the lock, so a slow answer for one role does not hold up the others.
+    output = llm.predict(
+        f"List the 10 to 15 most important skills for a {role} role. Return only the skill names as a comma "
+        f"separated list.")
+    skills = tuple(dict.fromkeys(canonical_skill(skill) for skill in output.split(',') if skill.strip()))
+    with _llm_skills_lock:
+        return _llm_skills.setdefault(role, skills)
+
+
+def role_skills(job_description: str, llm=None) -> Tuple[str, ...]:
+    """
+    Returns the skills expected for a role: the profiles whose keywords appear in the job description plus the
+    skills named in it. When neither gives anything and an LLM is passed, the LLM lists the skills instead; that
+    answer is memoized per normalized role, so it is asked once per distinct role rather than once per resume.
+    :param job_description: Job role or description.
+    :param llm: Optional chat model used for roles the taxonomy does not know.
+    :return: Canonical skill names.
+    """
+    role = normalize_role(job_description)
+    padded = f" {role} "
+    skills = [skill for keyword, profile in ROLE_PROFILES.items() if f" {keyword} " in padded for skill in profile]
+    skills.extend(sorted(extract_skills(job_description)))
+    if not skills and llm is not None:
+        return _llm_role_skills(role, llm)
+    return tuple(dict.fromkeys(skills))
+
+
+class SkillMatch(NamedTuple):
+    score: int
+    matched: List[str]
+    missing: List[str]
+    resume_skills: List[str]
+
+
+def match_skills(resume: str, job_description: str, llm=None, required: Optional[Tuple[str, ...]] = None) -> SkillMatch:
+    """
+    Scores the overlap between the skills in a resume and the skills a role requires, on a scale of 1 to 10.
+    :param resume: Resume text.
+    :param job_description: Job role or description.
+    :param llm: Optional chat model used by role_skills for unknown roles.
+    :param required: Required skills, when already known.
+    :return: SkillMatch
+    """
+    required = required if required is not None else role_skills(job_description, llm)
+    resume_skills = extract_skills(resume)
+    lowered = resume.lower()
+    # Skills outside the taxonomy (from an LLM profile) are matched on their plain name.
+    matched = [skill for skill in required
+               if skill in resume_skills or (skill not in SKILL_ALIASES and skill.lower() in lowered)]
+    missing = [skill for skill in required if skill not in matched]
+    score = round(10 * len(matched) / len(required)) if required else 1
+    return SkillMatch(score=min(max(score, 1), 10), matched=matched, missing=missing,
+                      resume_skills=sorted(resume_skills))
@@ -0,0 +1,188 @@
+import os
+import queue
+import threading
+import time
+from contextvars import copy_context
+from typing import Callable, Iterator, List, Optional
+
+from lazy_imports import load
+from tracing import span
+
+_DONE = object()
+# Seconds between two redraws of a streaming placeholder. Every redraw sends the whole text so far to the browser,
+# so drawing each token would send a long completion quadratically often. Can be overridden through the environment.
+RENDER_INTERVAL = float(os.getenv("RESUMOID_STREAM_RENDER_INTERVAL", "0.1"))
+
+
+class TokenStream:
+    """
+    Streams the completion of a prompt token by token. The request starts immediately on a background thread and
+    the tokens are buffered, so a stream can be created off the script thread and consumed later on it without
+    delaying the LLM call. Iterating yields the tokens, `poll()` takes the tokens received so far without waiting
+    and `result()` waits for the completion and returns it, passed through `parse` when given.
+    """
+
+    def __init__(self, llm, prompt: str, parse: Optional[Callable[[str], object]] = None):
+        self.llm = llm
+        self.prompt = prompt
+        self.parse = parse
+        self.text = ""
+        self.received = 0
+        self._tokens = queue.Queue()
+        self._done = threading.Event()
+        self._error = None
+        # The producer thread keeps the caller's context: its trace span and LLM priority.
+        threading.Thread(target=copy_context().run, args=(self._produce,), daemon=True).start()
+
+    def _produce(self):
+        dumps = load('langchain.load.dump').dumps
+        messages = [load('langchain.schema.messages').HumanMessage(content=self.prompt)]
+        cache = load('langchain').llm_cache
+        llm_string = self.llm._get_llm_string() if cache is not None else None
+        try:
+            with span("token stream"):
+                cached = cache.lookup(dumps(messages), llm_string) if cache is not None else None
+                if cached:
+                    self._tokens.put(cached[0].text)
+                else:
+                    for chunk in self.llm.stream(messages):
+                        self._tokens.put(chunk.content)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._tokens.put(_DONE)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._done.is_set():
+            yield self.text
+            return
+        while True:
+            token = self._tokens.get()
+            if token is _DONE:
+                break
+            self._append(token)
+            yield token
+        self._finish()
+        if self._error is not None:
+            raise self._error
+
+    def poll(self) -> bool:
+        """
+        Appends the tokens received so far to `text`, without waiting for more.
+        :return: True once the completion is complete (or failed).
+        """
+        while not self._done.is_set():
+            try:
+                token = self._tokens.get_nowait()
+            except queue.Empty:
+                return False
+            if token is _DONE:
+                self._finish()
+            else:
+                self._append(token)
+        return True
+
+    def _append(self, token: str):
+        self.text += token
+        self.received += 1
+
+    def _finish(self):
+        self._done.set()
+        if self._error is None:
+            self._cache_result()
+
+    def _cache_result(self):
+        cache = load('langchain').llm_cache
+        if cache is None:
+            return
+        messages = load('langchain.schema.messages')
+        generation = load('langchain.schema.output').ChatGeneration(message=messages.AIMessage(content=self.text))
+        cache.update(load('langchain.load.dump').dumps([messages.HumanMessage(content=self.prompt)]),
+                     self.llm._get_llm_string(), [generation])
+
+    def result(self):
+        """
+        Waits for the completion and returns it, parsed when a parser was given.
+        :return: Completion text or parsed output.
+        """
+        if not self._done.is_set():
+            for _ in self:
+                pass
+        if self._error is not None:
+            raise self._error
+        return self.parse(self.text) if self.parse else self.text
+
+
+class StreamRenderer:
+    """
+    Draws token streams into their placeholders from the script thread without blocking it, so the other stages
+    of an analysis are still drawn the moment they finish while a completion streams in. Pass `refresh` as the
+    `on_idle` of run_stages, `add` the streams as their stages return them, and call `finish` after the loop.
+    Placeholders are redrawn at most once per RENDER_INTERVAL.
+    """
+
+    def __init__(self, interval: float = RENDER_INTERVAL):
+        self.interval = interval
+        self._streams: List[List] = []
+
+    def add(self, placeholder, stream: TokenStream, markdown: bool = True,
+            on_done: Optional[Callable[[object], None]] = None):
+        """
+        :param placeholder: Streamlit placeholder (st.empty()).
+        :param stream: TokenStream to draw.
+        :param markdown: Render the partial text as markdown. Structured outputs are not meant to be read raw, so
+            with False only the progress is shown until the output is parsed.
+        :param on_done: Called with `stream.result()` once the completion is complete, e.g. to draw parsed output.
+        :return: None
+        """
+        self._streams.append([placeholder, stream, markdown, on_done, 0.0])
+        self.refresh()
+
+    def refresh(self):
+        """
+        Draws what the streams received since the last redraw, without waiting for more tokens.
+        :return: None
+        """
+        now = time.monotonic()
+        for entry in list(self._streams):
+            placeholder, stream, markdown, on_done, drawn_at = entry
+            if stream.poll():
+                self._streams.remove(entry)
+                if markdown:
+                    placeholder.markdown(stream.text)
+                else:
+                    placeholder.empty()
+                # Raises the error of a failed stream on the script thread.
+                result = stream.result()
+                if on_done is not None:
+                    on_done(result)
+            elif now - drawn_at >= self.interval:
+                entry[4] = now
+                if markdown:
+                    placeholder.markdown(stream.text + "▌")
+                else:
+                    placeholder.caption(f"Generating... {stream.received} tokens received")
+
+    def finish(self):
+        """
+        Draws the streams until all of them are complete.
+        :return: None
+        """
+        while self._streams:
+            self.refresh()
+            if self._streams:
+                time.sleep(self.interval / 2)
+
+
+def render_stream(placeholder, stream: TokenStream, markdown: bool = True) -> str:
+    """
+    Draws a token stream into a Streamlit placeholder as it arrives, blocking until it is complete.
+    :param placeholder: Streamlit placeholder (st.empty()).
+    :param stream: TokenStream to consume.
+    :param markdown: Render the partial text as markdown, see StreamRenderer.add.
+    :return: The complete text.
+    """
+    renderer = StreamRenderer()
+    renderer.add(placeholder, stream, markdown)
+    renderer.finish()
+    return stream.text
@@ -0,0 +1,28 @@
+import pytest
+
+from experience_scoring import score_quantification
+
+
+@pytest.mark.parametrize("statement", [
+    "Served 2000 users",
+    "Handled 2048 requests per second",
+    "Processed 1999 orders",
+    "Reduced latency by 40% across services",
+    "Cut AWS costs by $12k a year",
+    "Sped up the build 3x",
+    "Led a team of 5 engineers",
+    "Mentored 4+ interns",
+])
+def test_quantified(statement):
+    assert score_quantification([statement]).score == 10
+
+
+@pytest.mark.parametrize("statement", [
+    "Software Engineer, 2019 - 2021",
+    "Worked on the checkout (06/2020 - 03/2022)",
+    "Worked at Acme from 2018 to 2020",
+    "3 years of backend experience",
+    "Jan 2021 - Present",
+])
+def test_not_quantified(statement):
+    assert score_quantification([statement]).score == 1
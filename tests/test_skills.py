@@ -0,0 +1,19 @@
+from skills import extract_skills, tokenize
+
+
+def test_slash_separated_skills():
+    assert extract_skills('Languages: Python/Java/SQL, AWS/GCP') == {'Python', 'Java', 'SQL', 'AWS', 'GCP'}
+    assert extract_skills('Docker/Kubernetes') == {'Docker', 'Kubernetes'}
+    assert extract_skills('Swift/Kotlin') == {'Swift', 'Kotlin'}
+
+
+def test_slash_skill_names_stay_whole():
+    assert tokenize('CI/CD, PL/SQL and A/B testing') == ['ci/cd', 'pl/sql', 'and', 'a/b', 'testing']
+    assert {'CI/CD', 'SQL', 'Statistics'} <= extract_skills('CI/CD, PL/SQL and A/B testing')
+
+
+def test_common_words_are_not_skills():
+    text = ("Moved shipping containers, built dashboards for the sales team and gave a presentation; "
+            "the spark of the project. I excel at a swift rollout, the rest of the team helped.")
+    assert extract_skills(text) == frozenset()
+    assert extract_skills('Built pipelines with Spark, PySpark and Docker containers') == {'Spark', 'Docker'}
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from lazy_imports import load
+
+logger = logging.getLogger(__name__)
+
+
+class ModelInfo(NamedTuple):
+    """
+    Context window and list price of a chat model.
+    :param name: Model name.
+    :param context: Context window in tokens, prompt and completion together.
+    :param prompt_price: USD per 1K prompt tokens.
+    :param completion_price: USD per 1K completion tokens.
+    """
+    name: str
+    context: int
+    prompt_price: float
+    completion_price: float
+
+
+MODELS: Dict[str, ModelInfo] = {model.name: model for model in (
+    ModelInfo('gpt-3.5-turbo', 4096, 0.0015, 0.002),
+    ModelInfo('gpt-3.5-turbo-16k', 16385, 0.003, 0.004),
+    ModelInfo('gpt-4', 8192, 0.03, 0.06),
+    ModelInfo('gpt-4-32k', 32768, 0.06, 0.12),
+)}
+# Models that give the same answers with a different context window. A request may be sent to any model of its
+# family whose context fits it.
+MODEL_FAMILIES = (
+    ('gpt-3.5-turbo', 'gpt-3.5-turbo-16k'),
+    ('gpt-4', 'gpt-4-32k'),
+)
+
+# Completion tokens kept free in the context window of a request that does not set max_tokens. Can be overridden
+# through the environment.
+COMPLETION_RESERVE = int(os.getenv("RESUMOID_COMPLETION_RESERVE", "1000"))
+# Tokens a chat message adds on top of its content, and the tokens priming the reply.
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+# Characters per token of the estimate used when tiktoken is not available.
+CHARS_PER_TOKEN = 4
+DEFAULT_MODEL = 'gpt-3.5-turbo'
+
+
+# Encoding of each model, None when only the estimate is available.
+_encodings: Dict[str, object] = {}
+_encoding_lock = threading.Lock()
+_MISSING = object()
+
+
+def _encoding(model: str):
+    encoding = _encodings.get(model, _MISSING)
+    if encoding is not _MISSING:
+        return encoding
+    # Concurrent first calls would each try to load (or download) the encoding.
+    with _encoding_lock:
+        if model not in _encodings:
+            _encodings[model] = _load_encoding(model)
+        return _encodings[model]
+
+
+def _load_encoding(model: str):
+    try:
+        tiktoken = load('tiktoken')
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        # tiktoken downloads the encoding on first use; offline, fall back to the estimate for good.
+        logger.warning("tiktoken encoding for %s unavailable, estimating tokens instead (%s)", model,
+                       type(e).__name__)
+        return None
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Counts the tokens of a text with the model's tokenizer, or estimates them (about four characters per token)
+    when tiktoken or its encoding is not available.
+    :param text: Text
+    :param model: Model name.
+    :return: Integer
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: Iterable[Dict], model: str = DEFAULT_MODEL) -> int:
+    """
+    Counts the prompt tokens of a chat completion request.
+    :param messages: OpenAI message dicts.
+    :param model: Model name.
+    :return: Integer
+    """
+    return sum(count_tokens(message.get('content') or '', model) + MESSAGE_OVERHEAD
+               for message in messages) + REPLY_OVERHEAD
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """
+    Cuts a text to at most `max_tokens` tokens, at the end of a line when the cut falls inside one.
+    :param text: Text
+    :param max_tokens: Token budget.
+    :param model: Model name.
+    :return: String
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        cut = text[:max(max_tokens, 0) * CHARS_PER_TOKEN]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max(max_tokens, 0)])
+    return cut.rsplit('\n', 1)[0] if '\n' in cut else cut
+
+
+def fit_model(model: str, prompt_tokens: int, max_tokens: Optional[int] = None) -> str:
+    """
+    Picks the cheapest model of the model's family whose context window holds the prompt and the completion. When
+    none does, the one with the largest window is returned and the provider truncates the completion.
+    :param model: Model the client was created for.
+    :param prompt_tokens: Prompt tokens of the request.
+    :param max_tokens: max_tokens of the request, COMPLETION_RESERVE when not set.
+    :return: Model name.
+    """
+    family = next((family for family in MODEL_FAMILIES if model in family), (model,))
+    candidates = [MODELS[name] for name in family if name in MODELS]
+    if not candidates:
+        return model
+    needed = prompt_tokens + (max_tokens or COMPLETION_RESERVE)
+    fitting = [candidate for candidate in candidates if candidate.context >= needed]
+    if not fitting:
+        return max(candidates, key=lambda candidate: candidate.context).name
+    return min(fitting, key=lambda candidate: (candidate.prompt_price, candidate.context)).name
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estimates the price of a request at list prices.
+    :param model: Model name.
+    :param prompt_tokens: Prompt tokens.
+    :param completion_tokens: Completion tokens.
+    :return: USD, or None for a model without a known price.
+    """
+    info = MODELS.get(model)
+    if info is None:
+        return None
+    return round((prompt_tokens * info.prompt_price + completion_tokens * info.completion_price) / 1000, 6)
@@ -0,0 +1,296 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# File the finished traces are appended to, and its format: 'jsonl' writes one span per line, 'otlp' one
+# OpenTelemetry ExportTraceServiceRequest (OTLP/JSON) per trace and line, as the collector's file exporter does.
+# Tracing is always on in memory; nothing is written unless a path is set.
+TRACE_PATH = os.getenv("RESUMOID_TRACE_PATH")
+TRACE_FORMAT = os.getenv("RESUMOID_TRACE_FORMAT", "jsonl")
+SERVICE_NAME = "resumoid"
+
+OK = 'ok'
+ERROR = 'error'
+
+_current: ContextVar[Optional['Span']] = ContextVar("resumoid_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Trace:
+    """
+    The spans of one request, e.g. one resume analysis. Spans are added as they finish.
+    """
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List['Span'] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: 'Span'):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        :return: The finished spans as dicts, in start order.
+        """
+        with self._lock:
+            return [span.to_dict() for span in sorted(self.spans, key=lambda span: span.start)]
+
+
+class Span:
+    """
+    A timed operation with attributes (model, tokens, cache hits, ...) and point in time events (retries). A span
+    without a parent starts a new trace, which is exported when that span ends.
+    """
+
+    def __init__(self, name: str, parent: Optional['Span'] = None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.trace = parent.trace if parent else Trace()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes)
+        self.events: List[Dict] = []
+        self.status = OK
+        self.error = None
+        self.start = time.time()
+        self.end = None
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({'name': name, 'time': time.time(), 'attributes': attributes})
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent.span_id if self.parent else None,
+            'name': self.name,
+            'start': self.start,
+            'end': self.end,
+            'duration': self.duration,
+            'status': self.status,
+            'error': self.error,
+            'attributes': dict(self.attributes),
+            'events': list(self.events),
+        }
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attribute(key: str, value):
+    """
+    Sets an attribute on the current span, if there is one.
+    :param key: Attribute name.
+    :param value: String, number or boolean.
+    :return: None
+    """
+    span = _current.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+def add_event(name: str, **attributes):
+    """
+    Records an event, e.g. a retry, on the current span, if there is one.
+    :param name: Event name.
+    :return: None
+    """
+    span = _current.get()
+    if span is not None:
+        span.add_event(name, **attributes)
+
+
+def start_span(name: str, **attributes) -> Span:
+    """
+    Starts a span under the current one and makes it current. Prefer the `span` context manager; this is for
+    callbacks where the start and the end are separate calls.
+    :param name: Span name.
+    :return: Span
+    """
+    span = Span(name, _current.get(), **attributes)
+    span._token = _current.set(span)
+    return span
+
+
+def end_span(span: Span, error: Optional[BaseException] = None):
+    """
+    Ends a span started with start_span and restores its parent as the current span.
+    :param span: Span to end.
+    :param error: Exception the operation failed with.
+    :return: None
+    """
+    span.end = time.time()
+    if error is not None:
+        span.status = ERROR
+        span.error = f"{type(error).__name__}: {error}"
+    try:
+        _current.reset(span._token)
+    except ValueError:
+        # Ended from another context than the one it was started in.
+        _current.set(span.parent)
+    span.trace.add(span)
+    if span.parent is None:
+        export(span.trace)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Times the block as a span, child of the current span.
+    :param name: Span name.
+    :return: Context manager yielding the Span.
+    """
+    current = start_span(name, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        end_span(current, e)
+        raise
+    end_span(current)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator running every call of the function in a span.
+    :param name: Span name.
+    :return: Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(spans: List[Dict]) -> Dict:
+    """
+    Converts span dicts to an OTLP/JSON ExportTraceServiceRequest.
+    :param spans: Spans as returned by Trace.to_dicts.
+    :return: Dict
+    """
+    return {'resourceSpans': [{
+        'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+        'scopeSpans': [{
+            'scope': {'name': SERVICE_NAME},
+            'spans': [{
+                'traceId': span['trace_id'],
+                'spanId': span['span_id'],
+                'parentSpanId': span['parent_id'] or '',
+                'name': span['name'],
+                'kind': 1,
+                'startTimeUnixNano': str(int(span['start'] * 1e9)),
+                'endTimeUnixNano': str(int(span['end'] * 1e9)),
+                'attributes': _otlp_attributes(span['attributes']),
+                'events': [{'name': event['name'], 'timeUnixNano': str(int(event['time'] * 1e9)),
+                            'attributes': _otlp_attributes(event['attributes'])} for event in span['events']],
+                # OTLP status codes: 1 ok, 2 error.
+                'status': {'code': 2, 'message': span['error']} if span['status'] == ERROR else {'code': 1},
+            } for span in spans],
+        }],
+    }]}
+
+
+def export(trace: Trace, path: Optional[str] = None, fmt: Optional[str] = None):
+    """
+    Appends a finished trace to the trace file. Does nothing unless a path is given or RESUMOID_TRACE_PATH is
+    set. Spans ending after their root span (e.g. a stream nobody consumed) are not exported.
+    :param trace: Trace to export.
+    :param path: File to append to, defaults to TRACE_PATH.
+    :param fmt: 'jsonl' or 'otlp', defaults to TRACE_FORMAT.
+    :return: None
+    """
+    path = path or TRACE_PATH
+    if not path:
+        return
+    fmt = fmt or TRACE_FORMAT
+    spans = trace.to_dicts()
+    if fmt == 'otlp':
+        lines = [json.dumps(to_otlp(spans))]
+    else:
+        lines = [json.dumps(span) for span in spans]
+    try:
+        with _export_lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+    except OSError as e:
+        logger.warning("Could not write trace to %s: %s", path, e)
+
+
+def _depths(spans: List[Dict]) -> Dict[str, int]:
+    parents = {span['span_id']: span['parent_id'] for span in spans}
+    depths = {}
+    for span_id in parents:
+        depth, parent = 0, parents[span_id]
+        while parent in parents:
+            depth, parent = depth + 1, parents[parent]
+        depths[span_id] = depth
+    return depths
+
+
+def render_trace(container, spans: List[Dict]):
+    """
+    Draws the waterfall of a trace and a table of its spans, for the debug panel.
+    :param container: Streamlit container (st.sidebar, st.expander, ...).
+    :param spans: Spans as returned by Trace.to_dicts.
+    :return: None
+    """
+    if not spans:
+        container.caption("No trace recorded yet.")
+        return
+    from charts import render_waterfall
+
+    depths = _depths(spans)
+    origin = min(span['start'] for span in spans)
+    container.image(render_waterfall(spans, depths))
+    rows = []
+    for span in spans:
+        attributes = span['attributes']
+        rows.append({
+            'span': "  " * depths[span['span_id']] + span['name'],
+            'start ms': round((span['start'] - origin) * 1000),
+            'duration ms': round(span['duration'] * 1000),
+            'status': span['status'],
+            'prompt tokens': attributes.get('prompt_tokens'),
+            'completion tokens': attributes.get('completion_tokens'),
+            'cache hit': attributes.get('cache_hit'),
+            'retries': sum(event['name'] == 'retry' for event in span['events']),
+        })
+    container.dataframe(rows, use_container_width=True)
@@ -1,143 +1,59 @@
-import os
-import PyPDF2
-import matplotlib.pyplot as plt
+import io
+
 import streamlit as st
 from dotenv import load_dotenv
-from models2 import *
-from models3 import resume_output_parser
-from langchain.llms import OpenAI
-from langchain.document_loaders import UnstructuredPDFLoader
-from langchain.chat_models import ChatOpenAI
-from langchain.output_parsers import PydanticOutputParser, OutputFixingParser
-from langchain.prompts import PromptTemplate
+from models import Resume, ResumeScores, Suggestion
+from charts import create_chart, create_chart_overall
+from jobs import DONE, FAILED, PENDING, RUNNING, job_queue
+from llm_clients import get_llm, preload
+from output_repair import parse_score_lines, repairing_parser
+from pdf_cache import file_bytes
+from pdf_reader import extract_pdf
+from pipeline import Stage
+from role_profile import get_role_profile
+from sections import FEEDBACK_BUDGET, FEEDBACK_SECTIONS, SCORING_BUDGET, SCORING_SECTIONS, relevant_text
+from skills import match_skills
+from streaming import TokenStream
+from tracing import render_trace
 
 load_dotenv()
 
-# Defining LLM
-llm = ChatOpenAI(model="gpt-3.5-turbo-16k")
-
-
-def read_pdf(file):
-    """
-    Reads a resume in PDF file and extract text from it.
-    :param file: File object
-    :return: String
-    """
-    reader = PyPDF2.PdfReader(file)
-    num_pages = len(reader.pages)
-    text = ""
-    for i in range(num_pages):
-        page = reader.pages[i]
-        text += page.extract_text()
-    return text
-
-
-def read_pdf_unstructured(file):
-    tmp_location = os.path.join('resumes', file.name)
-    with open(tmp_location, 'wb') as out:
-        out.write(file.getbuffer())
-    loader = UnstructuredPDFLoader(tmp_location, mode='elements')
-    docs = loader.load()
-    text = ""
-    for doc in docs:
-        text += doc.page_content
-    return text
-
-
-def create_chart_overall(value: int):
-    """
-    Return matplotlib.pyplot figure.
-    :param value: Integer value.
-    :return:
-    """
-    fig, ax = plt.subplots(figsize=(3, 3))
-
-    value = value * 10
-    sizes = [100 - value, value]
-
-    # Define colors (blue for the score, silver for the remaining)
-    colors = ['silver', 'blue']
-
-    # Define explode parameters to separate the score section slightly
-    explode = (0, 0.1)
-
-    # Create a pie chart with shadows for a 3D effect
-    ax.pie(sizes, explode=explode, colors=colors, startangle=90, shadow=True)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/100', horizontalalignment='center', verticalalignment='center')
-
-    # Equal aspect ratio ensures that pie is drawn as a circle
-    ax.axis('equal')
-
-    return fig
-
-
-def create_chart(value: int):
-    """
-    Return matplotlib.pyplot figure.
-    :param value: Intger value.
-    :return:
-    """
-    fig, ax = plt.subplots()
-
-    sizes = [10 - value, value]
-
-    # Create a pie chart
-    ax.pie(sizes, colors=['red', 'green'], startangle=90)
-
-    # Draw a white circle in the center
-    centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-    ax.add_artist(centre_circle)
-    ax.text(0, 0, f'{value}/10', horizontalalignment='center', verticalalignment='center')
-
-    return fig
+# Model of every prompt. The client is created on first use (see llm_clients.get_llm), so importing this
+# module does not load langchain.
+MODEL = "gpt-3.5-turbo"
 
 
 def extract_info(resume: str):
     """
-    Extracts sections from the resume
-    :param resume:
-    :return:
+    Extracts sections from the resume in a single LLM round-trip.
+    :param resume: Resume text.
+    :return: Resume
     """
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=Resume), llm=llm)
+    llm = get_llm(MODEL)
+    parser = repairing_parser(Resume, llm)
     format_instructions = parser.get_format_instructions()
-    resume_text = llm.predict(
+    output = llm.predict(
         f"Given a resume {resume} \n Extract all the relevant sections including Education, Experience, Personal "
         f"Details, projects and skills. For skills identify all the skills mentioned in the resume.  \n "
         f"{format_instructions}")
+    resume_info = parser.parse(output)
+    return resume_info
 
-    print("INITIAL EXTRACTION")
-    print(resume_text)
-    # resume_info = parser.parse(resume_text)
-    # print("PYDANTIC OUTPUT")
-    # print(resume_info)
-    format_instructions = resume_output_parser.get_format_instructions()
-    prompt = PromptTemplate(
-        template="Given a resume {resume} \n Extract all the relevant sections.  \n {format_instructions}",
-        input_variables=["resume"],
-        partial_variables={"format_instructions": format_instructions}
-    )
-
-    _input = prompt.format_prompt(resume=resume)
-    print(_input.text)
-    # model = OpenAI('gpt-3.5-turbo-16k')
-    output = llm.predict(_input.to_string())
-    print("INITIAL OUTPUT (STRUCTURED OUTPUT PARSER)")
-    print(output)
-    extracted_resume = resume_output_parser.parse(output)
-    print("STRUCTURED OUTPUT PARSER OUTPUT")
-    print(extracted_resume)
-    return extracted_resume
-
-
-def description_evaluation(resume, job_description):
+
+def description_evaluation(resume, job_description, stream=False):
+    """
+    Gives markdown feedback on the resume for the job description.
+    :param resume: Resume text.
+    :param job_description: Job role.
+    :param stream: Return a TokenStream instead of waiting for the whole completion.
+    :return: String or TokenStream
+    """
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume, FEEDBACK_SECTIONS, FEEDBACK_BUDGET)
     prompt_template = f'''You are an Resume Expert. Your job is to give feedback on the resume based on the provided job description.
     Be specific about the points.
 
-    Resume: {resume}
+    Resume: {resume_sections}
 
     Job Description: {job_description}
 
@@ -157,46 +73,40 @@ def description_evaluation(resume, job_description):
     ONLY QUOTE THE INFORMATION PROVIDED IN THE RESUME. DO NOT MAKE UP INFORMATION WHICH IS NOT EXPLICITLY PROVIDED IN RESUME.
     RETURN THE RESPONSE IN MARKDOWN FORMAT IN BULLET POINTS.
     '''
+    llm = get_llm(MODEL)
+    if stream:
+        return TokenStream(llm, prompt_template)
     output = llm.predict(prompt_template)
     return output
 
-def rate_skills(resume, job_description):
+def rate_skills(resume, job_description, role_profile=None):
     """
-    Experimentation for improving skills scoring.
-    :param resume:
-    :param job_description:
-    :return:
+    Scores the candidate's skills against the role with the local skill taxonomy. Only roles the taxonomy does
+    not know cost an LLM call, made once per distinct role.
+    :param resume: Resume text.
+    :param job_description: Job role or description.
+    :param role_profile: RoleProfile of the job description, built when not given.
+    :return: SkillMatch
     """
-    prompt_template = f'''You are an Resume Expert. You have been provided with a resume of a candidate and the role for which the candidate is applying for.
-
-    Resume: {resume}
-
-    Job Description: {job_description}
-
-    You have to accomplish two jobs mentioned below: 
-    
-    TASK1 - Based on the {job_description} give all the skills which are ideal for the role and expected a well qualified person to have.
-    
-    TASK2 - Extract all the skills from the resume above irrespective of anything or job role. 
-    
-    TASK3 - Compare the skills set of the candidate with that of an ideal candidate of the job role. Score the resume on a scale of 1 to 10 (1 being lowers 
-    and 10 being highest).
-    
-    Return the score only in integer format.
-    '''
-    output = llm.predict(prompt_template)
-    return output
+    role_profile = role_profile or get_role_profile(job_description, get_llm(MODEL))
+    return match_skills(resume, job_description, required=tuple(role_profile.required_skills))
 
 
-def llm_scoring(llm, resume_text, job_description):
-    # Define the prompt
-    prompt = f"""
-    You are an HR of a company who is hiring for {job_description} role in your company. For the role you have to 
-    evaluate a resume strictly based on the hiring role. Also, provide a score between 1 to 10 (where 1 is the 
-    lowest and 10 is the highest), and provide feedback for each category and for overall resume using the HINTS for each category: 
+def llm_scoring(llm, resume_text, job_description, role_profile=None):
+    role_profile = role_profile or get_role_profile(job_description, llm)
+    # Only the sections this prompt needs, under a token budget.
+    resume_sections = relevant_text(resume_text, SCORING_SECTIONS, SCORING_BUDGET)
+    # The ResumeScores schema is part of the prompt, so the first response parses as is.
+    parser = repairing_parser(ResumeScores, llm, fallbacks=[parse_score_lines])
+    format_instructions = parser.get_format_instructions()
+    # Define the prompt. The role profile goes first, it is the same for every candidate of the role.
+    prompt = role_profile.prompt_prefix + f"""
+    For the role you have to evaluate a resume strictly based on the hiring role. Also, provide a score between 1 
+    to 10 (where 1 is the lowest and 10 is the highest), and provide feedback for each category and for overall 
+    resume using the HINTS for each category: 
 
     RESUME
-    {resume_text}
+    {resume_sections}
 
     CATEGORIES:
     1. Relevant Experience
@@ -204,39 +114,33 @@ def llm_scoring(llm, resume_text, job_description):
     2. Education
     HINTS - Does the hiring role require higher studies or advance degrees, Top college, professional degrees.
     3. Skills
-    HINTS - Compare the skills required for {job_description} with the skills mentioned in the resume.
+    HINTS - Compare the required skills of the role with the skills mentioned in the resume.
     4. Projects
-    HINTS - Alignment and relevancy of projects with {job_description}. Low score for bad relation and high for high relevancy.
+    HINTS - Alignment and relevancy of projects with the hiring role. Low score for bad relation and high for high relevancy.
 
 
 
     Here are some rules for the scores
-    - Relevant Experience should be high only when the current job is same as {job_description}.
+    - Relevant Experience should be high only when the current job is same as the hiring role and matches its seniority.
     - Education Experience should be high only when the candidate is from top colleges.
 
 
-    Take a deep breath and provide the scores and feedback to the candidate in the following format:
+    Take a deep breath and provide the scores and feedback to the candidate as JSON in the following format:
 
-    Relevant Experience: {{score_experience}}, Feedback: {{feedback_experience}}
-    Education: {{score_education}}, Feedback: {{feedback_education}}
-    Skills: {{score_skills}}, Feedback: {{feedback_skills}}
-    Projects: {{score_projects}}, Feedback: {{feedback_projects}}
-    Overall Score: {{score_overall}}, Feedback: {{feedback_overall}}
+    {format_instructions}
     """
     # Ask the LLM to score the resume and provide feedback
     response = llm.predict(prompt)
 
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=ResumeScores), llm=llm)
-    format_instructions = parser.get_format_instructions()
-
+    # The score lines are still understood, for responses cached before the prompt asked for JSON.
     resume_scores = parser.parse(response)
 
     return resume_scores
 
 
-def suggest_improvements(llm, experience):
-    # Define the prompt
-    prompt = f""" Given below is work experience from a resume for the job role
+def suggest_improvements(llm, experience, stream=False, role_profile=None):
+    # Define the prompt, behind the role profile when the role is known.
+    prompt = (role_profile.prompt_prefix if role_profile else "") + f""" Given below is work experience from a resume for the job role
     
     {experience}
     Please evaluate and provide 
@@ -249,12 +153,18 @@ def suggest_improvements(llm, experience):
     Select any 4 to 10 work mentioned in the experience and reframe it for better accepting chances of the resume.
 
     """
+    parser = repairing_parser(Suggestion, llm)
+    format_instructions = parser.get_format_instructions()
+    # Without the schema in the prompt the output never parses and every call ends in the LLM fallback.
+    prompt += f"{format_instructions}\n"
+
+    if stream:
+        # The suggestions are parsed once the stream completes.
+        return TokenStream(llm, prompt, parse=parser.parse)
+
     # Ask the LLM to score the resume and provide feedback
     response = llm.predict(prompt)
 
-    parser = OutputFixingParser.from_llm(parser=PydanticOutputParser(pydantic_object=Suggestion), llm=llm)
-    format_instructions = parser.get_format_instructions()
-
     suggestions = parser.parse(response)
 
     return suggestions
@@ -290,6 +200,205 @@ color_cell_js = """
    """
 
 
+def render_candidate_details(container, resume_info):
+    """
+    Renders the personal details extracted from the resume.
+    :param container: Streamlit placeholder to draw into.
+    :param resume_info: Resume returned by extract_info.
+    :return: None
+    """
+    details = resume_info.personal_details
+    container.markdown(f"**Name:** {details.name}  \n"
+                       f"**Email:** {details.email}  \n"
+                       f"**Contact Number:** {details.contact_num}")
+
+
+def render_skills(container, skill_match):
+    """
+    Renders the skills score with the matched and missing skills.
+    :param container: Streamlit placeholder to draw into.
+    :param skill_match: SkillMatch returned by rate_skills.
+    :return: None
+    """
+    with container.container():
+        st.image(create_chart(skill_match.score))
+        st.markdown(f"**Matched skills:** {', '.join(skill_match.matched) or '-'}  \n"
+                    f"**Missing skills:** {', '.join(skill_match.missing) or '-'}")
+
+
+def render_scores(overall_container, columns, resume_scores):
+    """
+    Renders the overall relevance score and the per category evaluation.
+    :param overall_container: Streamlit placeholder for the overall score.
+    :param columns: The four evaluation columns.
+    :param resume_scores: ResumeScores returned by llm_scoring.
+    :return: None
+    """
+    with overall_container.container():
+        st.image(create_chart_overall(resume_scores.overall_score))
+        st.markdown(resume_scores.overall_feedback)
+
+    col1, col2, col3, col4 = columns
+    # Column 1
+    col1.markdown("### Experience \n\n\n")
+    col1.image(create_chart(resume_scores.experience_score))
+    col1.markdown(resume_scores.experience_feedback)
+
+    # Column 2
+    col2.markdown("### Education \n\n\n")
+    col2.image(create_chart(resume_scores.education_score))
+    col2.markdown(resume_scores.education_feedback)
+
+    # Column 3
+    col3.markdown("### Skills \n\n\n\n")
+    col3.image(create_chart(resume_scores.skills_score))
+    col3.markdown(resume_scores.skills_feedback)
+
+    # Column 4
+    col4.markdown("### Projects \n\n\n\n")
+    col4.image(create_chart(resume_scores.projects_score))
+    col4.markdown(resume_scores.projects_feedback)
+
+
+# Labels of the analysis stages in the progress panel, in pipeline order.
+STAGE_LABELS = {
+    "parse": "Reading the PDF",
+    "resume_info": "Extracting candidate details",
+    "role_profile": "Building the role profile",
+    "resume_scores": "Scoring the resume",
+    "skills_scoring": "Rating skills",
+}
+# Seconds between two redraws of a running job.
+POLL_INTERVAL = 1.0
+
+
+def parse_resume(data: bytes) -> str:
+    """
+    Extracts the resume text, using the PyPDF2 text layer and only falling back to the unstructured loader when
+    it looks unusable.
+    :param data: PDF bytes.
+    :return: String
+    """
+    # The backend that served the text is recorded on the extract_pdf span.
+    return extract_pdf(io.BytesIO(data))['text']
+
+
+def analysis_stages(data: bytes, job_description: str):
+    """
+    Builds the pipeline of one analysis. The LLM calls only depend on the resume text and the role profile, so
+    they run concurrently once the PDF has been read.
+    :param data: PDF bytes.
+    :param job_description: Job role.
+    :return: List of Stage
+    """
+    llm = get_llm(MODEL)
+    return [
+        Stage("parse", lambda: parse_resume(data)),
+        Stage("resume_info", lambda parse: extract_info(parse), depends_on=("parse",)),
+        Stage("role_profile", lambda: get_role_profile(job_description, llm)),
+        Stage("resume_scores", lambda parse, role_profile: llm_scoring(llm=llm, resume_text=parse,
+                                                                       job_description=job_description,
+                                                                       role_profile=role_profile),
+              depends_on=("parse", "role_profile")),
+        Stage("skills_scoring", lambda parse, role_profile: rate_skills(parse, job_description, role_profile),
+              depends_on=("parse", "role_profile")),
+    ]
+
+
+def render_progress(container, job):
+    """
+    Renders the progress of an analysis job stage by stage.
+    :param container: Streamlit placeholder to draw into.
+    :param job: Job state returned by job_queue.get.
+    :return: None
+    """
+    icons = {PENDING: "⏳", RUNNING: "🔄", DONE: "✅", FAILED: "❌"}
+    with container.container():
+        st.progress(job['progress'], text=f"Analysis {job['status']}")
+        st.markdown("  \n".join(f"{icons[status]} {STAGE_LABELS.get(name, name)}"
+                                for name, status in job['stages'].items()))
+        if job['error']:
+            st.error(f"The analysis failed: {job['error']}")
+
+
+def render_job(job_id, show_trace, polling):
+    """
+    Draws the progress and the finished stages of an analysis job. Runs as a fragment redrawn every POLL_INTERVAL
+    while the job is running, and reruns the whole page once it finishes, which stops the timer.
+    :param job_id: Id returned by job_queue.submit.
+    :param show_trace: Draw the trace of the analysis.
+    :param polling: Whether the fragment is being redrawn on a timer.
+    :return: None
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        del st.session_state["job_id"]
+        st.warning("The previous analysis has expired, please submit again.")
+        return
+    job_description = st.session_state.job_role
+    results = job['results']
+
+    progress_section = st.empty()
+    render_progress(progress_section, job)
+
+    st.divider()
+
+    st.markdown("### Candidate Details")
+    details_section = st.empty()
+
+    st.divider()
+
+    ocol1, ocol2, ocol3 = st.columns(3)
+    ocol2.markdown("### Relevance Score \n\n\n\n")
+    overall_section = ocol2.empty()
+
+    st.divider()
+
+    st.markdown("### Evaluation")
+
+    st.text(f"Here is the evaluation of your resume for the {job_description} role.")
+
+    evaluation_columns = st.columns(4)
+
+    st.divider()
+
+    st.markdown("### Detailed Comments")
+    st.markdown("### Rating skills")
+    skills_section = st.empty()
+
+    if "resume_info" in results:
+        render_candidate_details(details_section, results["resume_info"])
+    if "resume_scores" in results:
+        render_scores(overall_section, evaluation_columns, results["resume_scores"])
+    if "skills_scoring" in results:
+        render_skills(skills_section, results["skills_scoring"])
+
+    if show_trace:
+        render_trace(st.expander("Trace of the analysis", expanded=True), job['trace'])
+
+    # feedback_jobdesc = description_evaluation(resume_text, job_description)
+    # st.markdown(feedback_jobdesc)
+
+    # st.markdown("### Suggestions")
+    # output = suggest_improvements(llm, resume_info.experience)
+    #
+    # original_tasks = output.original_task
+    # improvised_tasks = output.reframed
+    #
+    # col4, col5 = st.columns(2)
+    # col4.markdown("#### Your Points")
+    # col5.markdown("#### Suggested Improvement")
+    #
+    # for task, suggestion in zip(original_tasks, improvised_tasks):
+    #     x1, x2 = st.columns(2)
+    #     x1.markdown(f"- :red[{task}]")
+    #     x2.markdown(f"- :green[{suggestion}]")
+    #     st.markdown("---------------")
+
+    if polling and job['status'] not in (PENDING, RUNNING):
+        st.rerun()
+
+
 def main():
     st.set_page_config(layout="wide")
     st.title("Welcome to Resumoid 🤖")
@@ -306,101 +415,28 @@ def main():
     job_description = st.text_input("Enter the role for which you are applying")
 
     submit = st.button("Submit")
+    preload()
 
+    # The analysis runs on the job queue. The session only keeps the job id, and render_job redraws the finished
+    # stages while it runs.
     if resume_pdf and job_description and submit:
-        resume_text = read_pdf_unstructured(resume_pdf)
-        print("Loaded using Unstructured PDF Loader!")
-        # except:
-        #     resume_text = read_pdf(resume_pdf)
-        resume_info = extract_info(resume_text)
-        gpt4_model = ChatOpenAI(model='gpt-3.5-turbo-16k')
-        resume_scores = llm_scoring(llm=gpt4_model, resume_text=resume_text, job_description=job_description)
-
-        st.divider()
-
-        st.markdown("### Candidate Details")
-
-        # st.text(resume_info)
-        # st.write(resume_info)
-        # print(resume_info)
-        # name, phone, email
-
-        # name = resume_info.personal_details.name
-        # st.markdown("**Name:** " + resume_info.personal_details.name)
-        # st.markdown("**Name:** " + name)
-        # st.markdown("**Email:** " + resume_info.personal_details.email)
-        # st.markdown("**Contact Number:** " + resume_info.personal_details.contact_num)
-        # st.markdown("**University:** " + resume_info.education[0].university)
-        # st.markdown("**Current Job Role:** " + resume_info.experience[0].company_name)
-        # st.markdown("**Company:** " + resume_info.experience[0].job_role)
-        st.markdown(resume_info['Personal Details'])
-
-        st.divider()
-
-        ocol1, ocol2, ocol3 = st.columns(3)
-
-        ocol2.markdown("### Relevance Score \n\n\n\n")
-        ocol2.pyplot(create_chart_overall(resume_scores.overall_score))
-        ocol2.markdown(resume_scores.overall_feedback)
-
-        st.divider()
-
-        st.markdown("### Evaluation")
-
-        st.text(f"Here is the evaluation of your resume for the {job_description} role.")
-
-        col1, col2, col3, col4 = st.columns(4)
-        # Column 1
-        col1.markdown("### Experience \n\n\n")
-        col1.pyplot(create_chart(resume_scores.experience_score))
-        col1.markdown(resume_scores.experience_feedback)
-
-        # Column 2
-        col2.markdown("### Education \n\n\n")
-        col2.pyplot(create_chart(resume_scores.education_score))
-        col2.markdown(resume_scores.education_feedback)
-
-        # Column 3
-        col3.markdown("### Skills \n\n\n\n")
-        col3.pyplot(create_chart(resume_scores.skills_score))
-        col3.markdown(resume_scores.skills_feedback)
-
-        # Column 4
-        col4.markdown("### Projects \n\n\n\n")
-        col4.pyplot(create_chart(resume_scores.projects_score))
-        col4.markdown(resume_scores.projects_feedback)
-
-        st.divider()
-
-        st.markdown("### Detailed Comments")
-        st.markdown("### Rating skills")
-        skills_scoring = rate_skills(resume_text, job_description)
-        st.markdown(skills_scoring)
-        # col4.pyplot(create_chart(int(skills_scoring)))
-        # feedback_jobdesc = description_evaluation(resume_text, job_description)
-        # st.markdown(feedback_jobdesc)
-
-        # st.markdown("### Suggestions")
-        # output = suggest_improvements(llm, resume_info['Experience'])
-        #
-        # original_tasks = output.original_task
-        # improvised_tasks = output.reframed
-        #
-        # col4, col5 = st.columns(2)
-        # col4.markdown("#### Your Points")
-        # col5.markdown("#### Suggested Improvement")
-        #
-        # for task, suggestion in zip(original_tasks, improvised_tasks):
-        #     x1, x2 = st.columns(2)
-        #     x1.markdown(f"- :red[{task}]")
-        #     x2.markdown(f"- :green[{suggestion}]")
-        #     st.markdown("---------------")
-
-        st.divider()
-
-        st.success(""" Chat feature coming soon! \n
-
-        Reach out to me at satvik@buildfastwithai.com""")
+        st.session_state.job_id = job_queue.submit(analysis_stages(file_bytes(resume_pdf), job_description))
+        st.session_state.job_role = job_description
+
+    job_id = st.session_state.get("job_id")
+    if job_id is None:
+        return
+    show_trace = st.sidebar.checkbox("Show trace")
+    job = job_queue.get(job_id)
+    # Only a running job is redrawn on a timer; the rest of the page is not rerun while it polls.
+    polling = job is not None and job['status'] in (PENDING, RUNNING)
+    st.fragment(run_every=POLL_INTERVAL if polling else None)(render_job)(job_id, show_trace, polling)
+
+    st.divider()
+
+    st.success(""" Chat feature coming soon! \n
+
+    Reach out to me at satvik@buildfastwithai.com""")
 
 
 if __name__ == '__main__':